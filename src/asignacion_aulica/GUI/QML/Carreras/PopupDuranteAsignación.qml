@@ -17,6 +17,28 @@ Popup {
     margins: 1
     anchors.centerIn: Overlay.overlay
 
+    // Último progreso informado por la asignación
+    property string día: ""
+    property real penalización: 0
+    property real cotaInferior: 0
+    property real segundos: 0
+    property bool cancelando: false
+
+    onAboutToShow: {
+        día = ""
+        cancelando = false
+    }
+
+    Connections {
+        target: ProxyGestorDeDatos
+        function onProgresoAsignarAulas(día, penalización, cotaInferior, segundos) {
+            popup.día = día
+            popup.penalización = penalización
+            popup.cotaInferior = cotaInferior
+            popup.segundos = segundos
+        }
+    }
+
     ColumnLayout {
         spacing: 20
 
@@ -30,7 +52,24 @@ Popup {
             fillMode: Image.PreserveAspectFit
         }
 
-    }
+        Label {
+            Layout.alignment: Qt.AlignHCenter
+            visible: popup.día.length > 0
+            text: "Resolviendo " + popup.día
+                  + " (" + popup.segundos.toFixed(1) + " s)"
+                  + "\nPenalización: " + popup.penalización.toFixed(2)
+                  + " (cota: " + popup.cotaInferior.toFixed(2) + ")"
+            font.pointSize: FontSize.medium
+        }
 
-    // TODO: Cancel button maybe?
+        BotónRedondeadoConTexto {
+            Layout.alignment: Qt.AlignHCenter
+            text: popup.cancelando ? "Cancelando..." : "Cancelar"
+            enabled: !popup.cancelando
+            onClicked: {
+                popup.cancelando = true
+                ProxyGestorDeDatos.cancelarAsignarAulas()
+            }
+        }
+    }
 }
@@ -1,11 +1,20 @@
-import logging, time
+from pathlib import Path
+import logging
 from PyQt6.QtCore import QObject, QThreadPool, pyqtBoundSignal, pyqtSignal, pyqtSlot, QRunnable, QUrl
 
+from asignacion_aulica import assets
+from asignacion_aulica.gestor_de_datos.días_y_horarios import Día
 from asignacion_aulica.gestor_de_datos.gestor import GestorDeDatos
+from asignacion_aulica.lógica_de_asignación.cache import CacheDeSoluciones
+from asignacion_aulica.lógica_de_asignación.configuración import ConfiguraciónDelSolver
 from asignacion_aulica.lógica_de_asignación.postprocesamiento import InfoPostAsignación
+from asignacion_aulica.lógica_de_asignación.progreso import InfoDeProgreso, ProgresoDeLaAsignación
 
 logger = logging.getLogger(__name__)
 
+MÁXIMO_DE_MOTIVOS_A_MOSTRAR: int = 5
+'''Cantidad máxima de motivos de días sin asignar que se muestran al final de la asignación.'''
+
 class ProxyGestorDeDatos(QObject):
     '''
     Bindings para poder llamar a métodos del gestor de datos desde QML.
@@ -14,11 +23,18 @@ class ProxyGestorDeDatos(QObject):
     # Se emite con un string que dice los días sin asignar.
     finAsignarAulas: pyqtSignal = pyqtSignal(str)
 
+    # Se emite durante la asignación cada vez que se encuentra una solución
+    # mejor, con el nombre del día que se está resolviendo, la penalización de
+    # la mejor solución, su cota inferior, y los segundos transcurridos.
+    progresoAsignarAulas: pyqtSignal = pyqtSignal(str, float, float, float)
+
     def __init__(self, gestor: GestorDeDatos):
         super().__init__()
         self.gestor: GestorDeDatos = gestor
 
         self.threadpool = QThreadPool()
+        self.progreso: ProgresoDeLaAsignación|None = None
+        self.cache = CacheDeSoluciones(Path(assets.APP_DATA_PATH) / 'cache_de_asignaciones')
 
     @pyqtSlot(int)
     def ordenarAulas(self, i_edificio: int|None):
@@ -31,12 +47,25 @@ class ProxyGestorDeDatos(QObject):
     @pyqtSlot()
     def asignarAulas(self):
         '''
-        Ejecuta la asignación en un hilo y emite la señal finAsignarAulas
-        cuando termina.
+        Ejecuta la asignación en un hilo, emite la señal progresoAsignarAulas
+        mientras resuelve, y emite la señal finAsignarAulas cuando termina.
         '''
-        worker = _Asignador(self.gestor, self.finAsignarAulas)
+        self.progreso = ProgresoDeLaAsignación(self._emitir_progreso)
+        worker = _Asignador(self.gestor, self.finAsignarAulas, self.progreso, self.cache)
         self.threadpool.start(worker)
 
+    @pyqtSlot()
+    def cancelarAsignarAulas(self):
+        '''
+        Cancela la asignación que se está ejecutando. Los días que se estaban
+        resolviendo se quedan con la mejor solución encontrada hasta ahora.
+        '''
+        if self.progreso:
+            self.progreso.cancelar()
+
+    def _emitir_progreso(self, info: InfoDeProgreso):
+        self.progresoAsignarAulas.emit(info.día.name, info.penalización, info.cota_inferior, info.segundos)
+
     @pyqtSlot(str, result=str)
     def importarClasesDeExcel(self, url_path: str) -> str:
         '''
@@ -103,10 +132,18 @@ class _Asignador(QRunnable):
     Objeto QT encargado de ejecutar la asignación de aulas en un hilo.
     '''
 
-    def __init__(self, gestor: GestorDeDatos, señal_fin: pyqtBoundSignal):
+    def __init__(
+        self,
+        gestor: GestorDeDatos,
+        señal_fin: pyqtBoundSignal,
+        progreso: ProgresoDeLaAsignación,
+        cache: CacheDeSoluciones
+    ):
         super().__init__()
         self.gestor: GestorDeDatos = gestor
         self.señal_fin: pyqtBoundSignal = señal_fin
+        self.progreso: ProgresoDeLaAsignación = progreso
+        self.cache: CacheDeSoluciones = cache
 
     @pyqtSlot()
     def run(self):
@@ -116,11 +153,31 @@ class _Asignador(QRunnable):
         if posible_error:
             mensaje_final = posible_error
         else:
-            # TODO: Sacar este sleep
-            time.sleep(0.8) # Para que parezca como que tarda un poquito
-            result: InfoPostAsignación = self.gestor.asignar_aulas()
+            configuración = ConfiguraciónDelSolver(
+                hilos=len(Día),
+                tiempo_máximo_en_segundos=60,
+                aceptar_factible=True,
+                reparar_pistas=True
+            )
+            result: InfoPostAsignación = self.gestor.asignar_aulas(
+                configuración,
+                solo_cambios=True,
+                progreso=self.progreso,
+                cache=self.cache
+            )
             if result.días_sin_asignar:
                 str_días_sin_asignar = ', '.join(map(lambda d: d.name, result.días_sin_asignar))
                 mensaje_final = 'No se puedieron asignar aulas para las clases de los días ' + str_días_sin_asignar
+                motivos = [
+                    motivo
+                    for día in result.días_sin_asignar
+                    for motivo in result.motivos_de_días_sin_asignar.get(día, [])
+                ]
+                if motivos:
+                    mensaje_final += ':\n' + '\n'.join(motivos[:MÁXIMO_DE_MOTIVOS_A_MOSTRAR])
+            if result.clases_sin_asignar:
+                mensaje_final = (mensaje_final + f'\nQuedaron {len(result.clases_sin_asignar)} clases sin aula.').strip()
+            if result.cancelada:
+                mensaje_final = ('Se canceló la asignación. ' + mensaje_final).strip()
         
         self.señal_fin.emit(mensaje_final)
@@ -40,6 +40,19 @@ EQUIVALENTE_24_HORAS: time = time.max
 '24:00' no puede parsearse como time, lo tratamos como si fuera `time.max`.
 '''
 
+MINUTOS_POR_DÍA: int = 24 * 60
+
+def time_to_minutos(horario: time) -> int:
+    '''
+    Transformar time a la cantidad de minutos desde las 00:00.
+
+    `EQUIVALENTE_24_HORAS` se transforma en `MINUTOS_POR_DÍA`.
+    '''
+    if horario == EQUIVALENTE_24_HORAS:
+        return MINUTOS_POR_DÍA
+
+    return horario.hour * 60 + horario.minute
+
 def parse_string_horario_to_time(value: str) -> time:
     '''
     Transformar string con formato HH:MM a time.
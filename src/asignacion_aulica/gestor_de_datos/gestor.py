@@ -11,6 +11,9 @@ from asignacion_aulica.excel.importar_clases import importar_clases_de_excel
 from asignacion_aulica.excel.exportar_clases import exportar_datos_de_clases_a_excel
 from asignacion_aulica.lógica_de_asignación.postprocesamiento import InfoPostAsignación
 from asignacion_aulica.lógica_de_asignación.asignación import asignar
+from asignacion_aulica.lógica_de_asignación.cache import CacheDeSoluciones
+from asignacion_aulica.lógica_de_asignación.configuración import ConfiguraciónDelSolver
+from asignacion_aulica.lógica_de_asignación.progreso import ProgresoDeLaAsignación
 from asignacion_aulica.gestor_de_datos.días_y_horarios import RangoHorario, Día
 from asignacion_aulica.gestor_de_datos.entidades import (
     Aula,
@@ -64,6 +67,10 @@ class GestorDeDatos:
         self._carreras: list[Carrera] = []
         self._equipamientos: Counter[str] = Counter()
 
+        # Firmas de los días asignados en la última asignación, para poder
+        # resolver sólo los días que cambiaron.
+        self._firmas_de_la_última_asignación: dict[Día, str] = {}
+
     def get_edificios(self) -> list[str]:
         '''
         :return: Los nombres de todos los edificios en la base de datos,
@@ -760,23 +767,55 @@ class GestorDeDatos:
         
         return None
 
-    def asignar_aulas(self) -> InfoPostAsignación:
+    def asignar_aulas(
+        self,
+        configuración: ConfiguraciónDelSolver|None = None,
+        solo_cambios: bool = False,
+        progreso: ProgresoDeLaAsignación|None = None,
+        cache: CacheDeSoluciones|None = None
+    ) -> InfoPostAsignación:
         '''
         Asignar aulas a todas las clases que no tengan una asignación forzada.
 
+        :param configuración: Opciones de la asignación y del solucionador, o
+        `None` para usar las opciones por defecto.
+        :param solo_cambios: Si sólo resolver los días que cambiaron desde la
+        última asignación. Los demás días conservan las aulas asignadas.
+        :param progreso: Objeto para seguir el progreso de la asignación y
+        poder cancelarla.
+        :param cache: Cache de soluciones de problemas ya resueltos, o `None`
+        para no usar cache.
         :return: Info sobre el resultado de la asignación.
         '''
         logger.info('Asignando aulas...')
-        result = asignar(self._edificios, self._carreras)
+        result = asignar(
+            self._edificios,
+            self._carreras,
+            configuración,
+            self._firmas_de_la_última_asignación if solo_cambios else None,
+            progreso,
+            cache
+        )
+        self._firmas_de_la_última_asignación = result.firmas
+        if result.días_sin_cambios:
+            logger.info('Días sin cambios desde la última asignación: %s', result.días_sin_cambios)
+        if result.cancelada:
+            logger.info('Se canceló la asignación.')
+        if result.gap_de_optimalidad > 0:
+            logger.info('La asignación puede no ser óptima, gap de optimalidad: %.2f%%', 100 * result.gap_de_optimalidad)
+        for día, motivos in result.motivos_de_días_sin_asignar.items():
+            logger.info('Motivos por los que no se pudo asignar el %s: %s', día.name, motivos)
         if result.todo_ok():
             logger.info('... Asignación ok')
         else:
             logger.info(
                 '''... Asignación no ok.
                 Días sin asignar: %s
+                Clases sin aula: %d
                 Clases con aula chica: %d
                 Clases fuera de su edificio preferido: %d''',
                 result.días_sin_asignar,
+                len(result.clases_sin_asignar),
                 len(result.clases_con_aula_chica),
                 len(result.clases_fuera_de_su_edificio_preferido)
             )
@@ -10,9 +10,14 @@ Se define un modelo (CpModel) con los siguientes componentes:
   que indica si esa clase está asignada a ese aula.
 
   Los booleanos están codificados como 0 (False) o 1 (True) porque así lo pide
-  la interfaz de ortools. Algunas celdas contienen constantes (asignaciones
-  fijas) y otras contienen variables del modelo (asignaciones a ser resueltas
-  por ortools).
+  la interfaz de ortools. Las celdas prohibidas por las restricciones son
+  constantes 0 y no se guardan; sólo las demás contienen variables del modelo
+  (asignaciones a ser resueltas por ortools). Ver `MatrizDeAsignaciones`.
+
+  Las aulas intercambiables entre sí (ver `aulas_intercambiables`) comparten
+  una sola columna, que puede tener tantas clases superpuestas como aulas hay
+  en el grupo. Después de resolver, las clases de cada grupo se reparten entre
+  sus aulas con `repartir_aulas_intercambiables`.
 
 - Restricciones: Cada restricción es una condición booleana que se tiene que
   cumplir para que la asignación de aulas sea correcta.
@@ -20,26 +25,70 @@ Se define un modelo (CpModel) con los siguientes componentes:
 - Penalizaciones: Son un puntaje que se asigna a las situaciones que preferimos
   evitar si es posible, aunque no generen una asignación de aulas incorrecta.
 
+En la asignación parcial (ver `ConfiguraciónDelSolver.asignación_parcial`),
+cada clase tiene además una variable que indica que quedó sin aula, con una
+penalización que domina a todas las demás. Así el modelo siempre tiene
+solución, y sólo quedan sin aula las clases que no se pueden asignar.
+
 Luego se usa el solver para encontrar una combinación de variables que cumpla
 con todas las restricciones y que tenga la menor penalización posible.
+
+Alternativamente, cada problema se puede resolver con la heurística de
+`heurística.py`, que respeta las mismas restricciones y usa las mismas
+penalizaciones, o con la búsqueda en vecindarios de
+`búsqueda_en_vecindarios.py`, que resuelve con este mismo modelo ventanas
+chicas del problema (ver `ConfiguraciónDelSolver.motor`).
 '''
+from concurrent.futures import ThreadPoolExecutor
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, replace
+from ortools.sat.python.cp_model_helper import LinearExpr
 from ortools.sat.python import cp_model
+from typing import Any
+import logging, os, time
 import numpy as np
-import logging
 
+from asignacion_aulica.lógica_de_asignación.búsqueda_en_vecindarios import buscar_en_vecindarios
+from asignacion_aulica.lógica_de_asignación.cache import CacheDeSoluciones, clave_del_problema
+from asignacion_aulica.lógica_de_asignación.configuración import ConfiguraciónDelSolver, MotorDeAsignación
+from asignacion_aulica.lógica_de_asignación.diagnóstico import ConflictoDeAsignación, diagnosticar_infactibilidad
 from asignacion_aulica.lógica_de_asignación.excepciones import AsignaciónImposibleException
+from asignacion_aulica.lógica_de_asignación.heurística import asignar_con_heurística
+from asignacion_aulica.lógica_de_asignación.matriz_de_asignaciones import MatrizDeAsignaciones
+from asignacion_aulica.lógica_de_asignación.métricas import MétricasDeLaAsignación, MétricasDeUnProblema, medir
 from asignacion_aulica.lógica_de_asignación.postprocesamiento import InfoPostAsignación
-from asignacion_aulica.lógica_de_asignación.preferencias import obtener_penalización
-from asignacion_aulica.gestor_de_datos.entidades import Aula, Edificios, Carreras
+from asignacion_aulica.lógica_de_asignación.progreso import ProgresoDeLaAsignación
+from asignacion_aulica.lógica_de_asignación.preferencias import (
+    obtener_cotas_superiores,
+    obtener_penalizaciones,
+    penalización_de_clases_sin_aula,
+    sumar_penalizaciones
+)
+from asignacion_aulica.gestor_de_datos.entidades import Aula, Clase, Edificios, Carreras
 from asignacion_aulica.gestor_de_datos.días_y_horarios import Día
 from asignacion_aulica.lógica_de_asignación import restricciones
 from asignacion_aulica.lógica_de_asignación.preprocesamiento import (
-    AulasPreprocesadas, ClasesPreprocesadas, ClasesPreprocesadasPorDía, preprocesar_clases
+    AulasPreprocesadas,
+    ClasesPreprocesadas,
+    ClasesPreprocesadasPorDía,
+    aulas_intercambiables,
+    firma_del_problema,
+    componentes_independientes,
+    motivos_de_infactibilidad,
+    preprocesar_clases,
+    subconjunto_de_clases
 )
 
 logger = logging.getLogger(__name__)
 
-def asignar(edificios: Edificios, carreras: Carreras) -> InfoPostAsignación:
+def asignar(
+    edificios: Edificios,
+    carreras: Carreras,
+    configuración: ConfiguraciónDelSolver|None = None,
+    firmas_anteriores: dict[Día, str]|None = None,
+    progreso: ProgresoDeLaAsignación|None = None,
+    cache: CacheDeSoluciones|None = None
+) -> InfoPostAsignación:
     '''
     Asignar aula a todas las clases presenciales que no tienen una asignación
     fijada.
@@ -51,121 +100,889 @@ def asignar(edificios: Edificios, carreras: Carreras) -> InfoPostAsignación:
     A las clases con `no_cambiar_asignación == True` no se les modifica nada,
     pero se tiene en cuenta el aula que tienen asignada para evitar
     superposiciones.
+
+    Las clases de cada día se separan en problemas de asignación independientes
+    entre sí, que se pueden resolver en paralelo. El solucionador de ortools
+    libera el GIL mientras resuelve, por eso alcanza con usar hilos en vez de
+    procesos.
+
+    Si se usa la asignación anterior, el aula que tiene asignada cada clase al
+    llamar a esta función se le pasa al solucionador como pista de la
+    solución. Cuando se modifican pocas clases desde la última asignación, esto
+    hace que se llegue al óptimo mucho más rápido.
+
+    Si se pasan las firmas de la asignación anterior, sólo se resuelven los
+    días cuya firma cambió (ver `firma_del_problema`). En los demás días las
+    clases conservan las aulas que tienen asignadas.
+
+    Antes de construir los modelos se verifica cada día con
+    `motivos_de_infactibilidad`, para descartar en milisegundos los días en
+    los que la asignación es imposible. Los motivos por los que no se pudo
+    asignar cada día se devuelven en
+    `InfoPostAsignación.motivos_de_días_sin_asignar`.
+
+    En la asignación parcial no se descarta ningún día: las clases que no se
+    pueden asignar quedan sin aula (con `aula_asignada = None`), se asignan
+    las demás, y las que quedaron sin aula se devuelven en
+    `InfoPostAsignación.clases_sin_asignar`.
+
+    Si la configuración lo indica, en los días imposibles se busca además un
+    conjunto chico de clases y aulas en conflicto (ver `diagnóstico.py`), que
+    se devuelve en `InfoPostAsignación.conflictos` y se agrega a los motivos.
     
     :param edificios: Los edificios disponibles.
     :param carreras: Las carreras que existen.
+    :param configuración: Opciones de la asignación y del solucionador. Si es
+    `None` se usan los valores por defecto de `ConfiguraciónDelSolver`.
+    :param firmas_anteriores: Las firmas de los días asignados en la
+    asignación anterior, obtenidas de `InfoPostAsignación.firmas`.
+    :param progreso: Objeto para informar el progreso de la asignación y
+    poder cancelarla desde otro hilo. Si se cancela, los problemas que se
+    estaban resolviendo se quedan con la mejor solución encontrada, y los días
+    que no se llegaron a resolver quedan sin asignar.
+    :param cache: Cache de soluciones de problemas ya resueltos. Los problemas
+    que están en el cache no se vuelven a resolver.
+
+    Las métricas de tiempo y tamaño de cada etapa se devuelven en
+    `InfoPostAsignación.métricas`, y también se loggean en formato JSON.
     
     :return: Info sobre el resultado de la asignación.
+    :raise ValueError: Si la cantidad de hilos es menor a 1.
     '''
+    configuración = configuración or ConfiguraciónDelSolver()
+    progreso = progreso or ProgresoDeLaAsignación()
+    if configuración.hilos < 1:
+        raise ValueError(f'La cantidad de hilos tiene que ser al menos 1, no {configuración.hilos}.')
+    configuración = replace(configuración, workers_por_problema=workers_por_problema(configuración))
+
+    métricas = MétricasDeLaAsignación()
+    inicio = time.perf_counter()
+
     # Preprocesar los datos
-    aulas_preprocesadas: AulasPreprocesadas = AulasPreprocesadas(edificios)
-    clases_preprocesadas: ClasesPreprocesadasPorDía = preprocesar_clases(carreras, aulas_preprocesadas)
+    with medir(métricas.tiempos, 'preprocesamiento'):
+        aulas_preprocesadas: AulasPreprocesadas = AulasPreprocesadas(edificios)
+        clases_preprocesadas: ClasesPreprocesadasPorDía = preprocesar_clases(carreras, aulas_preprocesadas)
 
-    # Asignar las aulas de cada día
-    días_sin_asignar: list[Día] = []
+    # Encontrar los días que no cambiaron desde la asignación anterior
+    firmas_anteriores = firmas_anteriores or {}
+    with medir(métricas.tiempos, 'firmas'):
+        días_sin_cambios: list[Día] = [
+            día for día in Día
+            if día in firmas_anteriores
+            and firmas_anteriores[día] == firma_del_problema(clases_preprocesadas[día], aulas_preprocesadas, día)
+        ]
+
+    # Descartar los días en los que se puede ver que la asignación es
+    # imposible sin construir el modelo, y separar los demás en problemas
+    # independientes
+    motivos_de_días_sin_asignar: dict[Día, list[str]] = {}
+    conflictos: dict[Día, ConflictoDeAsignación] = {}
+    problemas_por_día: list[list[ClasesPreprocesadas]] = []
+    permitidas_por_día: list[list[np.ndarray]] = []
+    cotas_por_día: list[list[int]|None] = []
     for día in Día:
-        clases_del_día = clases_preprocesadas[día]
-        try:
-            asignaciones: list[int] = resolver_problema_de_asignación(clases_del_día, aulas_preprocesadas)
-        except AsignaciónImposibleException as exc:
-            logger.error('Falló la asignación para el día %s: %s', día.name, exc)
-            días_sin_asignar.append(día)
-        else:
-            # Si no hubo excepciones, asignar las aulas a las clases que se pasaron por argumento
-            for clase, i_aula_asignada in zip(clases_del_día.clases, asignaciones):
-                aula_asignada: Aula = aulas_preprocesadas.aulas[i_aula_asignada].aula_original
-                clase.aula_asignada = aula_asignada
+        if día in días_sin_cambios:
+            problemas_por_día.append([])
+            permitidas_por_día.append([])
+            cotas_por_día.append(None)
+            continue
+
+        with medir(métricas.tiempos, 'verificación'):
+            aulas_permitidas = ~restricciones.aulas_prohibidas(clases_preprocesadas[día], aulas_preprocesadas)
+            motivos = (
+                [] if configuración.asignación_parcial
+                else motivos_de_infactibilidad(clases_preprocesadas[día], aulas_preprocesadas, aulas_permitidas)
+            )
+        if motivos:
+            if configuración.diagnosticar_infactibilidad:
+                with medir(métricas.tiempos, 'diagnóstico'):
+                    conflicto = diagnosticar_infactibilidad(clases_preprocesadas[día], aulas_preprocesadas, configuración)
+                if conflicto is not None:
+                    conflictos[día] = conflicto
+                    motivos.append(conflicto.mensaje())
+            motivos_de_días_sin_asignar[día] = motivos
+            problemas_por_día.append([])
+            permitidas_por_día.append([])
+            cotas_por_día.append(None)
+            continue
+
+        # La matriz de aulas permitidas se calcula una sola vez por día, y cada
+        # problema usa las filas de sus clases
+        with medir(métricas.tiempos, 'separación_en_problemas'):
+            componentes = componentes_independientes(clases_preprocesadas[día], aulas_preprocesadas, aulas_permitidas)
+            problemas_por_día.append([subconjunto_de_clases(clases_preprocesadas[día], componente) for componente in componentes])
+            permitidas_por_día.append([aulas_permitidas[componente] for componente in componentes])
+
+        # Todos los problemas del día normalizan las penalizaciones con las
+        # cotas del día entero, así que separarlo no cambia la solución óptima
+        with medir(métricas.tiempos, 'cotas_superiores'):
+            cotas_por_día.append(obtener_cotas_superiores(
+                clases_preprocesadas[día], aulas_preprocesadas, MatrizDeAsignaciones(aulas_permitidas, None)
+            ))
+
+    # Resolver todos los problemas
+    with medir(métricas.tiempos, 'resolución'), ThreadPoolExecutor(max_workers=configuración.hilos) as executor:
+        soluciones_futuras = [
+            [
+                executor.submit(
+                    resolver_problema_de_asignación,
+                    problema,
+                    aulas_preprocesadas,
+                    configuración,
+                    progreso,
+                    cache,
+                    aulas_permitidas=permitidas,
+                    cotas_superiores=cotas_del_día
+                )
+                for problema, permitidas in zip(problemas_del_día, permitidas_del_día)
+            ]
+            for problemas_del_día, permitidas_del_día, cotas_del_día in zip(problemas_por_día, permitidas_por_día, cotas_por_día)
+        ]
+
+    # Asignar las aulas de cada día, siempre en el mismo orden para que el
+    # resultado no dependa de cuál problema terminó primero. Si falla alguno de
+    # los problemas de un día, no se asigna nada en ese día.
+    días_sin_asignar: list[Día] = []
+    días_subóptimos: list[Día] = []
+    clases_sin_asignar: list[Clase] = []
+    días_con_clases_sin_aula: set[Día] = set()
+    soluciones_asignadas: list[SoluciónDeUnProblema] = []
+    with medir(métricas.tiempos, 'asignación'):
+        for día, problemas_del_día, soluciones_futuras_del_día in zip(Día, problemas_por_día, soluciones_futuras):
+            if día in motivos_de_días_sin_asignar:
+                logger.error('La asignación para el día %s es imposible: %s', día.name, motivos_de_días_sin_asignar[día])
+                días_sin_asignar.append(día)
+                continue
+
+            try:
+                soluciones_del_día: list[SoluciónDeUnProblema] = [futuro.result() for futuro in soluciones_futuras_del_día]
+            except AsignaciónImposibleException as exc:
+                logger.error('Falló la asignación para el día %s: %s', día.name, exc)
+                días_sin_asignar.append(día)
+                motivos_de_días_sin_asignar[día] = [str(exc)]
+                if exc.conflicto is not None:
+                    conflictos[día] = exc.conflicto
+                    motivos_de_días_sin_asignar[día].append(exc.conflicto.mensaje())
+            else:
+                # Si no hubo excepciones, asignar las aulas a las clases que se pasaron por argumento
+                for problema, solución in zip(problemas_del_día, soluciones_del_día):
+                    for clase, i_aula_asignada in zip(problema.clases, solución.aulas_asignadas):
+                        if i_aula_asignada is None:
+                            clase.aula_asignada = None
+                            clases_sin_asignar.append(clase)
+                            días_con_clases_sin_aula.add(día)
+                            continue
+                        aula_asignada: Aula = aulas_preprocesadas.aulas[i_aula_asignada].aula_original
+                        clase.aula_asignada = aula_asignada
+                soluciones_asignadas.extend(soluciones_del_día)
+                if not all(solución.óptima for solución in soluciones_del_día):
+                    días_subóptimos.append(día)
+
+            # Guardar las métricas de los problemas que se llegaron a resolver
+            métricas.problemas.extend(
+                futuro.result().métricas
+                for futuro in soluciones_futuras_del_día
+                if futuro.exception() is None and futuro.result().métricas is not None
+            )
     
+    # Calcular las firmas de los días asignados, con las aulas ya asignadas. Los
+    # días en los que no se llegó al óptimo o que tienen clases sin aula no
+    # tienen firma, para que se vuelvan a resolver (y se vuelvan a informar las
+    # clases sin aula) en la próxima asignación.
+    with medir(métricas.tiempos, 'firmas'):
+        firmas: dict[Día, str] = {
+            día: firmas_anteriores[día] if día in días_sin_cambios
+                 else firma_del_problema(clases_preprocesadas[día], aulas_preprocesadas, día)
+            for día in Día
+            if día not in días_sin_asignar and día not in días_subóptimos and día not in días_con_clases_sin_aula
+        }
+
     # Postprocesar los datos
-    reporte = InfoPostAsignación(edificios, carreras, días_sin_asignar)
+    with medir(métricas.tiempos, 'postprocesamiento'):
+        reporte = InfoPostAsignación(
+            edificios,
+            carreras,
+            días_sin_asignar,
+            días_sin_cambios,
+            firmas,
+            gap_de_optimalidad(soluciones_asignadas),
+            progreso.cancelada(),
+            métricas,
+            motivos_de_días_sin_asignar,
+            conflictos,
+            clases_sin_asignar
+        )
+
+    if clases_sin_asignar:
+        logger.warning('Quedaron %d clases sin aula en la asignación parcial.', len(clases_sin_asignar))
+
+    métricas.tiempos['total'] = time.perf_counter() - inicio
+    logger.info('Métricas de la asignación: %s', métricas.a_json())
     
     return reporte
 
+@dataclass
+class SoluciónDeUnProblema:
+    '''
+    El resultado de resolver un problema de asignación.
+    '''
+    # El índice del aula asignada a cada clase, o `None` si la clase quedó sin
+    # aula en la asignación parcial.
+    aulas_asignadas: list[int|None]
+
+    # Si el solver demostró que la solución es óptima (dentro del gap relativo
+    # configurado).
+    óptima: bool = True
+
+    # El valor de la penalización total de la solución.
+    penalización: float = 0.0
+
+    # La cota inferior de la penalización que encontró el solver. Si la
+    # solución es óptima es igual a la penalización.
+    cota_inferior: float = 0.0
+
+    # Las métricas de la resolución, o `None` si el problema no tenía clases.
+    métricas: MétricasDeUnProblema|None = None
+
 def resolver_problema_de_asignación(
     clases: ClasesPreprocesadas,
-    aulas: AulasPreprocesadas
-) -> list[int]:
+    aulas: AulasPreprocesadas,
+    configuración: ConfiguraciónDelSolver|None = None,
+    progreso: ProgresoDeLaAsignación|None = None,
+    cache: CacheDeSoluciones|None = None,
+    aulas_sugeridas: Sequence[int|None]|None = None,
+    aulas_permitidas: np.ndarray|None = None,
+    cotas_superiores: Sequence[int]|None = None
+) -> SoluciónDeUnProblema:
     '''
     Asignar aulas a todas las clases en un problema de asignación.
 
+    Si el problema se resuelve con el solucionador y está en el cache, se
+    devuelve la solución guardada sin construir el modelo. Las soluciones
+    óptimas del solucionador se guardan en el cache.
+
+    Si la configuración lo indica, el problema se resuelve con la heurística o
+    con la búsqueda en vecindarios en vez de con el solucionador, o con la
+    heurística sólo si el solucionador no encuentra ninguna solución.
+
     :param clases: Los datos de las clases de el problema de asignación.
     :pram aulas: Los datos de las aulas disponibles.
+    :param configuración: Opciones del solucionador. Si es `None` se usan los
+    valores por defecto de `ConfiguraciónDelSolver`.
+    :param progreso: Objeto para informar el progreso y poder cancelar.
+    :param cache: Cache de soluciones, o `None` para no usar cache.
+    :param aulas_sugeridas: El índice del aula que se le pasa al solucionador
+    como pista para cada clase (o `None` para no dar pista de esa clase). Si
+    se pasa, reemplaza a las demás pistas.
+    :param aulas_permitidas: La matriz de aulas permitidas del problema, si ya
+    se calculó (ver `restricciones.aulas_prohibidas`). Si es `None`, se
+    calcula.
+    :param cotas_superiores: Las cotas superiores con las que se normaliza
+    cada penalización (ver `obtener_penalizaciones`), o `None` para usar las
+    de este problema.
 
-    :return: Una lista con el índice del aula asignada a cada clase.
-    :raise AsignaciónImposibleException: Si el CpModel no se puede resolver. 
+    :return: La solución, con el índice del aula asignada a cada clase.
+    :raise AsignaciónImposibleException: Si el CpModel no se puede resolver
+    (con el conflicto encontrado, si la configuración pide diagnosticarlo);
+    si no se llegó al óptimo y la configuración no acepta soluciones factibles;
+    si se canceló la asignación antes de encontrar una solución; o si la
+    heurística no encontró una solución.
     '''
+    configuración = configuración or ConfiguraciónDelSolver()
+    progreso = progreso or ProgresoDeLaAsignación()
     if len(clases.clases) == 0:
-        return []
-    elif len(aulas.aulas) == 0:
+        return SoluciónDeUnProblema([])
+    elif len(aulas.aulas) == 0 and not configuración.asignación_parcial:
         raise AsignaciónImposibleException('No hay ningún aula.')
+    elif progreso.cancelada():
+        raise AsignaciónImposibleException('Se canceló la asignación.')
+
+    día = clases.clases[0].día
+    métricas = MétricasDeUnProblema(día, clases=len(clases.clases), aulas=len(aulas.aulas))
+    usar_búsqueda_en_vecindarios = (
+        # Los problemas que entran en una ventana se resuelven enteros
+        configuración.motor == MotorDeAsignación.BÚSQUEDA_EN_VECINDARIOS
+        and len(clases.clases) > configuración.máximo_de_clases_por_ventana
+    )
+
+    # En el cache sólo se guardan soluciones del solucionador, así que no se
+    # usa con los demás motores
+    usar_solucionador = configuración.motor != MotorDeAsignación.HEURÍSTICA and not usar_búsqueda_en_vecindarios
+    if cache is not None and usar_solucionador:
+        with medir(métricas.tiempos, 'cache'):
+            clave = clave_del_problema(clases, aulas, configuración, cotas_superiores)
+            guardada = cache.obtener(clave)
+        if guardada is not None and len(guardada['aulas_asignadas']) == len(clases.clases):
+            logger.info('Usando la solución guardada en el cache para el día %s.', día.name)
+            métricas.desde_cache = True
+            return SoluciónDeUnProblema(
+                aulas_asignadas=guardada['aulas_asignadas'],
+                óptima=True,
+                penalización=guardada['penalización'],
+                cota_inferior=guardada['cota_inferior'],
+                métricas=métricas
+            )
+
+    if aulas_permitidas is None:
+        with medir(métricas.tiempos, 'aulas_prohibidas'):
+            aulas_permitidas = ~restricciones.aulas_prohibidas(clases, aulas)
+
+    if configuración.motor == MotorDeAsignación.HEURÍSTICA:
+        return resolver_con_heurística(clases, aulas, métricas, configuración.asignación_parcial, aulas_permitidas, cotas_superiores)
+    elif usar_búsqueda_en_vecindarios:
+        return resolver_con_búsqueda_en_vecindarios(clases, aulas, configuración, progreso, métricas, aulas_permitidas, cotas_superiores)
 
     # Crear modelo, variables, restricciones, y penalizaciones
     modelo = cp_model.CpModel()
-    asignaciones = crear_matriz_de_asignaciones(clases, aulas, modelo)
+    with medir(métricas.tiempos, 'aulas_intercambiables'):
+        grupos = aulas_intercambiables(clases, aulas) if configuración.agrupar_aulas_intercambiables else {}
+    with medir(métricas.tiempos, 'matriz_de_asignaciones'):
+        sin_aula = [
+            modelo.new_bool_var(f'clase_{i_clase}_sin_aula')
+            for i_clase in range(len(clases.clases))
+        ] if configuración.asignación_parcial else None
+        asignaciones = crear_matriz_de_asignaciones(clases, aulas, modelo, grupos, sin_aula, aulas_permitidas)
+    métricas.aulas_agrupadas = sum(len(grupo) - 1 for grupo in grupos.values())
+    métricas.variables_de_asignación = len(asignaciones)
+    métricas.celdas_prohibidas = asignaciones.forma[0] * asignaciones.forma[1] - len(asignaciones)
+
+    with medir(métricas.tiempos, 'restricciones'):
+        for restricción in restricciones.todas_las_restricciones_con_variables:
+            cantidad_de_grupos = 0
+            for grupo in restricción(clases, aulas, asignaciones):
+                modelo.add_at_most_one(grupo)
+                cantidad_de_grupos += 1
+            métricas.restricciones_por_regla[restricción.__name__] = cantidad_de_grupos
 
-    for predicado in restricciones.restricciones_con_variables(clases, aulas, asignaciones):
-        modelo.add(predicado)
+        if grupos:
+            cantidad_de_grupos = 0
+            for variables, cantidad_de_aulas in restricciones.no_superar_las_aulas_intercambiables(clases, aulas, asignaciones):
+                modelo.add(LinearExpr.sum(variables) <= cantidad_de_aulas)
+                cantidad_de_grupos += 1
+            métricas.restricciones_por_regla[restricciones.no_superar_las_aulas_intercambiables.__name__] = cantidad_de_grupos
     
-    penalización = obtener_penalización(clases, aulas, modelo, asignaciones)
-    modelo.minimize(penalización)
+    with medir(métricas.tiempos, 'penalizaciones'):
+        penalizaciones = obtener_penalizaciones(clases, aulas, modelo, asignaciones, métricas.variables_por_penalización, cotas_superiores)
+        if sin_aula is not None:
+            penalizaciones.insert(0, penalización_de_clases_sin_aula(sin_aula))
+
+    if aulas_sugeridas is not None:
+        with medir(métricas.tiempos, 'pistas'):
+            agregar_pistas(clases, aulas, modelo, asignaciones, grupos, aulas_sugeridas)
+    elif configuración.pistas_de_la_heurística:
+        with medir(métricas.tiempos, 'pistas'):
+            try:
+                aulas_de_la_heurística, _, _ = asignar_con_heurística(clases, aulas, configuración.asignación_parcial, aulas_permitidas, cotas_superiores)
+            except AsignaciónImposibleException:
+                aulas_de_la_heurística = None
+            if aulas_de_la_heurística is not None or configuración.usar_asignación_anterior:
+                agregar_pistas(clases, aulas, modelo, asignaciones, grupos, aulas_de_la_heurística)
+    elif configuración.usar_asignación_anterior:
+        with medir(métricas.tiempos, 'pistas'):
+            agregar_pistas(clases, aulas, modelo, asignaciones, grupos)
 
     # Resolver (setear log_search_progress para loggear el proceso)
+    solver = crear_solver(configuración)
+
+    logger.info('Resolviendo el modelo para el día %s.', día.name)
+    with medir(métricas.tiempos, 'resolución'), progreso.resolviendo(solver):
+        if progreso.cancelada():
+            # Si se canceló después de registrar el solver pero antes de que
+            # empiece a resolver, `stop_search` no lo detiene
+            status = cp_model.UNKNOWN
+        elif configuración.lexicográfico:
+            status, penalización, cota_inferior = resolver_por_etapas(
+                modelo, solver, penalizaciones, configuración, progreso, día, métricas
+            )
+        else:
+            penalización_total = sumar_penalizaciones(penalizaciones)
+            if not isinstance(penalización_total, (int, float)):
+                # Si todas las penalizaciones son constantes (0), sólo hay que
+                # encontrar una solución que cumpla las restricciones
+                modelo.minimize(penalización_total)
+            status = solver.solve(modelo, progreso.callback(día))
+            métricas.sumar_estadísticas_del_solver(solver)
+            penalización, cota_inferior = solver.objective_value, solver.best_objective_bound
+    métricas.status = solver.status_name(status)
+
+    if status not in estados_aceptados(configuración, progreso):
+        if configuración.usar_heurística_si_falla and status == cp_model.UNKNOWN:
+            logger.warning('El solucionador no encontró una solución para el día %s, se usa la heurística.', día.name)
+            return resolver_con_heurística(clases, aulas, métricas, configuración.asignación_parcial, aulas_permitidas, cotas_superiores)
+
+        conflicto = None
+        if configuración.diagnosticar_infactibilidad and status == cp_model.INFEASIBLE:
+            with medir(métricas.tiempos, 'diagnóstico'):
+                conflicto = diagnosticar_infactibilidad(clases, aulas, configuración)
+        raise AsignaciónImposibleException(
+            f'El solucionador de restricciones terminó con status {solver.status_name(status)}.',
+            conflicto
+        )
+    
+    aulas_asignadas: list[int|None] = asignaciones.aulas_asignadas(solver)
+    if sin_aula is not None:
+        for i_clase, variable in enumerate(sin_aula):
+            if solver.boolean_value(variable):
+                aulas_asignadas[i_clase] = None
+        métricas.clases_sin_aula = aulas_asignadas.count(None)
+
+    with medir(métricas.tiempos, 'repartir_aulas_intercambiables'):
+        aulas_asignadas = repartir_aulas_intercambiables(clases, aulas, grupos, aulas_asignadas)
+
+    solución = SoluciónDeUnProblema(
+        aulas_asignadas=aulas_asignadas,
+        óptima=(status == cp_model.OPTIMAL),
+        penalización=penalización,
+        cota_inferior=cota_inferior,
+        métricas=métricas
+    )
+    métricas.gap = gap_de_optimalidad([solución])
+
+    # Sólo se guardan las soluciones óptimas, para que usar el cache no
+    # cambie el resultado de la asignación.
+    if cache is not None and solución.óptima and not progreso.cancelada():
+        cache.guardar(clave, solución.aulas_asignadas, solución.penalización, solución.cota_inferior, modelo)
+
+    return solución
+
+def resolver_con_heurística(
+    clases: ClasesPreprocesadas,
+    aulas: AulasPreprocesadas,
+    métricas: MétricasDeUnProblema,
+    asignación_parcial: bool = False,
+    aulas_permitidas: np.ndarray|None = None,
+    cotas_superiores: Sequence[int]|None = None
+) -> SoluciónDeUnProblema:
+    '''
+    Asignar aulas a todas las clases de un problema de asignación con la
+    heurística (ver `asignar_con_heurística`).
+
+    La solución es óptima sólo si a cada clase se le asignó el aula de menor
+    costo.
+
+    :param clases: Los datos de las clases de el problema de asignación.
+    :pram aulas: Los datos de las aulas disponibles.
+    :param métricas: Las métricas del problema, a las que se agrega el tiempo
+    de la heurística.
+    :param asignación_parcial: Si dejar sin aula a las clases que la
+    heurística no puede asignar, en vez de fallar.
+    :param aulas_permitidas: La matriz de aulas permitidas, si ya se calculó.
+    :param cotas_superiores: Las cotas superiores con las que se normaliza
+    cada penalización, o `None` para usar las de este problema.
+
+    :return: La solución, con el índice del aula asignada a cada clase.
+    :raise AsignaciónImposibleException: Si la heurística no encontró una
+    solución.
+    '''
+    with medir(métricas.tiempos, 'heurística'):
+        aulas_asignadas, penalización, cota_inferior = asignar_con_heurística(clases, aulas, asignación_parcial, aulas_permitidas, cotas_superiores)
+    métricas.status = 'HEURÍSTICA'
+    métricas.clases_sin_aula = aulas_asignadas.count(None)
+
+    solución = SoluciónDeUnProblema(
+        aulas_asignadas=aulas_asignadas,
+        óptima=(penalización <= cota_inferior),
+        penalización=penalización,
+        cota_inferior=cota_inferior,
+        métricas=métricas
+    )
+    métricas.gap = gap_de_optimalidad([solución])
+    return solución
+
+def resolver_con_búsqueda_en_vecindarios(
+    clases: ClasesPreprocesadas,
+    aulas: AulasPreprocesadas,
+    configuración: ConfiguraciónDelSolver,
+    progreso: ProgresoDeLaAsignación,
+    métricas: MétricasDeUnProblema,
+    aulas_permitidas: np.ndarray|None = None,
+    cotas_superiores: list[int]|None = None
+) -> SoluciónDeUnProblema:
+    '''
+    Asignar aulas a todas las clases de un problema de asignación con la
+    búsqueda en vecindarios (ver `buscar_en_vecindarios`).
+
+    Cada ventana se resuelve con `resolver_problema_de_asignación`, usando el
+    solucionador con la misma configuración, salvo que el tiempo máximo es el
+    de la ventana, se aceptan soluciones factibles, y se minimiza la suma
+    ponderada de las penalizaciones normalizadas con las cotas del problema
+    entero, que es el costo con el que la búsqueda compara las ventanas. Las
+    estadísticas del solver de todas las ventanas se suman a las métricas del
+    problema.
+
+    La solución es óptima sólo si a cada clase se le asignó el aula de menor
+    costo.
+
+    :param clases: Los datos de las clases de el problema de asignación.
+    :pram aulas: Los datos de las aulas disponibles.
+    :param configuración: Opciones de la búsqueda y del solucionador.
+    :param progreso: Objeto para informar el progreso y poder cancelar.
+    :param métricas: Las métricas del problema.
+    :param aulas_permitidas: La matriz de aulas permitidas, si ya se calculó.
+    :param cotas_superiores: Las cotas superiores con las que se normaliza
+    cada penalización, o `None` para usar las de este problema.
+
+    :return: La solución, con el índice del aula asignada a cada clase.
+    :raise AsignaciónImposibleException: Si no se encontró una asignación
+    inicial sin conflictos.
+    '''
+    configuración_de_las_ventanas = replace(
+        configuración,
+        motor=MotorDeAsignación.CP_SAT,
+        aceptar_factible=True,
+        lexicográfico=False,
+        usar_heurística_si_falla=False,
+        diagnosticar_infactibilidad=False
+    )
+
+    def resolver_ventana(
+        ventana: ClasesPreprocesadas,
+        aulas_sugeridas: list[int|None],
+        tiempo_máximo: float,
+        cotas_superiores: list[int]
+    ) -> list[int|None]:
+        solución = resolver_problema_de_asignación(
+            ventana,
+            aulas,
+            replace(configuración_de_las_ventanas, tiempo_máximo_en_segundos=tiempo_máximo),
+            progreso,
+            aulas_sugeridas=aulas_sugeridas,
+            cotas_superiores=cotas_superiores
+        )
+        if solución.métricas is not None:
+            métricas.sumar_estadísticas(solución.métricas)
+        return solución.aulas_asignadas
+
+    with medir(métricas.tiempos, 'búsqueda_en_vecindarios'):
+        aulas_asignadas, penalización, cota_inferior = buscar_en_vecindarios(
+            clases, aulas, resolver_ventana, configuración, progreso, métricas, aulas_permitidas, cotas_superiores
+        )
+    métricas.status = 'BÚSQUEDA_EN_VECINDARIOS'
+    métricas.clases_sin_aula = aulas_asignadas.count(None)
+
+    solución = SoluciónDeUnProblema(
+        aulas_asignadas=aulas_asignadas,
+        óptima=(penalización <= cota_inferior),
+        penalización=penalización,
+        cota_inferior=cota_inferior,
+        métricas=métricas
+    )
+    métricas.gap = gap_de_optimalidad([solución])
+    return solución
+
+def resolver_por_etapas(
+    modelo: cp_model.CpModel,
+    solver: cp_model.CpSolver,
+    penalizaciones: list[tuple[float, LinearExpr|int]],
+    configuración: ConfiguraciónDelSolver,
+    progreso: ProgresoDeLaAsignación,
+    día: Día,
+    métricas: MétricasDeUnProblema|None = None
+) -> tuple[Any, float, float]:
+    '''
+    Resolver el modelo lexicográficamente, minimizando una penalización por
+    etapa en orden de importancia.
+
+    Después de cada etapa se agrega una restricción para que la penalización
+    de esa etapa no supere el valor encontrado, y se usa la solución como
+    pista para la etapa siguiente. Así cada etapa tiene un objetivo entero más
+    simple que la suma ponderada, y las prioridades entre penalizaciones se
+    respetan exactamente.
+
+    Si la configuración tiene un tiempo máximo, se reparte entre las etapas:
+    cada etapa puede usar el tiempo que no usaron las anteriores. Si se
+    termina el tiempo o se cancela la asignación, las etapas que faltan no se
+    resuelven.
+
+    :param modelo: El modelo, con las variables y restricciones.
+    :param solver: El solver configurado.
+    :param penalizaciones: Las penalizaciones con sus pesos normalizados, de la
+    más importante a la menos importante.
+    :param configuración: Opciones del solucionador.
+    :param progreso: Objeto para informar el progreso y poder cancelar.
+    :param día: El día del problema.
+    :param métricas: Si se pasa, se le suman las estadísticas del solver de
+    cada etapa.
+
+    :return: Tupla con el status final, la penalización total (ponderada como
+    en `sumar_penalizaciones`) y una estimación de su cota inferior. El status
+    final es OPTIMAL si todas las etapas fueron óptimas, o el status de la
+    primera etapa que no lo fue.
+    '''
+    inicio = time.monotonic()
+    status_final = cp_model.OPTIMAL
+    cotas: list[float] = []
+    hubo_alguna_solución = False
+
+    for peso_normalizado, penalización in penalizaciones:
+        if isinstance(penalización, int):
+            # Es una constante, no hay nada que optimizar
+            cotas.append(penalización)
+            continue
+
+        if progreso.cancelada() and hubo_alguna_solución:
+            # Las etapas que faltan quedan sin optimizar (y su cota inferior
+            # es 0)
+            status_final = cp_model.FEASIBLE
+            break
+
+        if configuración.tiempo_máximo_en_segundos is not None:
+            tiempo_restante = configuración.tiempo_máximo_en_segundos - (time.monotonic() - inicio)
+            if tiempo_restante <= 0 and hubo_alguna_solución:
+                # Se terminó el tiempo, igual que si se cancelara
+                status_final = cp_model.FEASIBLE
+                break
+            solver.parameters.max_time_in_seconds = max(0.0, tiempo_restante)
+
+        modelo.minimize(penalización)
+        status = solver.solve(modelo, progreso.callback(día))
+        if métricas is not None:
+            métricas.sumar_estadísticas_del_solver(solver)
+        if status not in estados_aceptados(configuración, progreso):
+            return status, 0.0, 0.0
+        elif status != cp_model.OPTIMAL:
+            status_final = status
+        hubo_alguna_solución = True
+
+        # Fijar el valor de esta etapa y sugerir la solución a la siguiente
+        valor = round(solver.objective_value)
+        cotas.append(solver.best_objective_bound)
+        modelo.add(penalización <= valor)
+        _sugerir_solución(modelo, solver)
+
+    if not hubo_alguna_solución:
+        # Todas las penalizaciones son constantes, sólo hay que encontrar una
+        # solución que cumpla las restricciones
+        status = solver.solve(modelo, progreso.callback(día))
+        if métricas is not None:
+            métricas.sumar_estadísticas_del_solver(solver)
+        if status not in estados_aceptados(configuración, progreso):
+            return status, 0.0, 0.0
+
+    penalización_total = sum(
+        peso_normalizado * solver.value(penalización)
+        for peso_normalizado, penalización in penalizaciones
+    )
+    cota_total = sum(
+        peso_normalizado * cota
+        for (peso_normalizado, _), cota in zip(penalizaciones, cotas)
+    )
+
+    return status_final, penalización_total, cota_total
+
+def estados_aceptados(
+    configuración: ConfiguraciónDelSolver,
+    progreso: ProgresoDeLaAsignación
+) -> tuple[Any, ...]:
+    '''
+    :return: Los status del solver con los que se acepta la solución. Si se
+    canceló la asignación se aceptan soluciones factibles, para quedarse con
+    la mejor solución encontrada.
+    '''
+    if configuración.aceptar_factible or progreso.cancelada():
+        return (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    else:
+        return (cp_model.OPTIMAL,)
+
+def _sugerir_solución(modelo: cp_model.CpModel, solver: cp_model.CpSolver):
+    '''
+    Reemplazar las pistas del modelo por la última solución del solver, para
+    todas las variables del modelo.
+    '''
+    modelo.clear_hints()
+    for índice in range(len(modelo.proto.variables)):
+        variable = modelo.get_int_var_from_proto_index(índice)
+        modelo.add_hint(variable, solver.value(variable))
+
+def workers_por_problema(configuración: ConfiguraciónDelSolver) -> int:
+    '''
+    :return: La cantidad de workers de CP-SAT para cada problema. Si la
+    configuración no la fija (es 0) y se resuelven varios problemas al mismo
+    tiempo, se reparten los procesadores entre los hilos, para que los
+    solvers no compitan por la CPU.
+    '''
+    if configuración.workers_por_problema != 0 or configuración.hilos == 1:
+        return configuración.workers_por_problema
+
+    return max(1, (os.cpu_count() or 1) // configuración.hilos)
+
+def crear_solver(configuración: ConfiguraciónDelSolver) -> cp_model.CpSolver:
+    '''
+    Crear un CpSolver con los parámetros de la configuración.
+    '''
     solver = cp_model.CpSolver()
     solver.parameters.log_search_progress = False #True
     solver.parameters.log_to_stdout = False
     solver.log_callback = logger.debug
+    solver.parameters.repair_hint = configuración.reparar_pistas
+    solver.parameters.num_workers = configuración.workers_por_problema
+    solver.parameters.relative_gap_limit = configuración.gap_relativo_máximo
+    if configuración.tiempo_máximo_en_segundos is not None:
+        solver.parameters.max_time_in_seconds = configuración.tiempo_máximo_en_segundos
 
-    logger.info('Resolviendo el modelo para el día %s.', clases.clases[0].día.name)
-    status = solver.solve(modelo)
-    # TODO: ¿qué hacer si da FEASIBLE?¿en qué condiciones ocurre?¿aceptamos la solución suboptima o tiramos excepción?
-    if status != cp_model.OPTIMAL:
-        raise AsignaciónImposibleException(f'El solucionador de restricciones terminó con status {solver.status_name(status)}.')
-    
-    # Armar lista con las asignaciones
-    asignaciones_finales = np.vectorize(solver.value)(asignaciones)
-    aulas_asignadas = list(asignaciones_finales.argmax(axis=1))
+    return solver
 
-    return aulas_asignadas
+def gap_de_optimalidad(soluciones: Iterable[SoluciónDeUnProblema]) -> float:
+    '''
+    Calcular el gap de optimalidad relativo de un conjunto de soluciones,
+    tomando la suma de sus penalizaciones y de sus cotas inferiores.
+
+    Se usa la misma definición que CP-SAT para `relative_gap_limit`:
+    `|penalización - cota| / max(1, |penalización|)`.
+
+    :return: El gap relativo, que es 0 si todas las soluciones son óptimas.
+    '''
+    penalización_total = 0.0
+    cota_total = 0.0
+    for solución in soluciones:
+        penalización_total += solución.penalización
+        cota_total += solución.cota_inferior
+
+    return abs(penalización_total - cota_total) / max(1.0, abs(penalización_total))
 
 def crear_matriz_de_asignaciones(
     clases: ClasesPreprocesadas,
     aulas: AulasPreprocesadas,
-    modelo: cp_model.CpModel
-) -> np.ndarray:
+    modelo: cp_model.CpModel,
+    grupos: dict[int, list[int]]|None = None,
+    sin_aula: Sequence[cp_model.IntVar]|None = None,
+    aulas_permitidas: np.ndarray|None = None
+) -> MatrizDeAsignaciones:
     '''
-    Genera una matriz con las variables de asignación.
+    Genera la matriz con las variables de asignación.
 
     Las filas de la matriz representan clases y las columnas representan aulas.
     Cada elemento de la matriz es un booleano que indica si ese aula está
     asignada a esa clase. El booleano puede ser una constante 0, o puede ser una
     variable booleana del modelo.
 
-    Algunos elementos de la matriz se inicializan con las constantes 0 que se
-    pueden deducir de las restricciones. Luego se agregan variables al modelo
-    para completar los elementos restantes.
+    Sólo se agregan variables al modelo en los elementos que no están
+    prohibidos por las restricciones; los demás son constantes 0 que no se
+    guardan.
 
     También se agregan restricciones para que cada clase se asigne exactamente a
-    un aula.
+    un aula, o que quede sin aula si se pasan las variables `sin_aula`.
+
+    De cada grupo de aulas intercambiables sólo el representante tiene
+    variables, y su columna representa a todas las aulas del grupo.
     
     :param clases: Los datos de las clases del problema de asignación.
     :pram aulas: Los datos de las aulas disponibles.
     :param modelo: El CpModel al que agregar variables.
+    :param grupos: Los grupos de aulas intercambiables, obtenidos con
+    `aulas_intercambiables`, o `None` para no agrupar aulas.
+    :param sin_aula: Para la asignación parcial, la variable que indica si
+    cada clase queda sin aula. Si es `None`, todas las clases tienen aula.
+    :param aulas_permitidas: La matriz de aulas permitidas, si ya se calculó
+    (ver `restricciones.aulas_prohibidas`). No se modifica.
 
     :return: La matriz con las variables de asignación.
     '''
-    asignaciones = np.empty(shape=(len(clases.clases), len(aulas.aulas)), dtype=object)
+    if aulas_permitidas is None:
+        permitidas = ~restricciones.aulas_prohibidas(clases, aulas)
+    else:
+        permitidas = aulas_permitidas.copy()
+    aulas_por_columna = np.ones(len(aulas.aulas), dtype=np.intp)
+    for representante, grupo in (grupos or {}).items():
+        permitidas[:, grupo[1:]] = False
+        aulas_por_columna[grupo[1:]] = 0
+        aulas_por_columna[representante] = len(grupo)
 
-    # Popular con constantes
-    for índices in restricciones.aulas_prohibidas(clases, aulas):
-        asignaciones[*índices] = 0
-    
-    # Rellenar los elementos vacíos con variables
-    for i_clase, i_aula in np.ndindex(asignaciones.shape):
-        if asignaciones[i_clase, i_aula] is None:
-            asignaciones[i_clase, i_aula] = modelo.new_bool_var(f'clase_{i_clase}_asignada_al_aula_{i_aula}')
+    asignaciones = MatrizDeAsignaciones(permitidas, modelo, aulas_por_columna)
     
-    # Asegurar que cada clase se asigna a exactamente un aula
-    for clase in asignaciones:
-        modelo.add_exactly_one(clase)
+    # Asegurar que cada clase se asigna a exactamente un aula (o a ninguna,
+    # en la asignación parcial)
+    for i_clase in range(len(clases.clases)):
+        variables = asignaciones.variables_de_fila(i_clase)
+        if sin_aula is not None:
+            variables.append(sin_aula[i_clase])
+        modelo.add_exactly_one(variables)
     
     return asignaciones
+
+def agregar_pistas(
+    clases: ClasesPreprocesadas,
+    aulas: AulasPreprocesadas,
+    modelo: cp_model.CpModel,
+    asignaciones: MatrizDeAsignaciones,
+    grupos: dict[int, list[int]]|None = None,
+    aulas_sugeridas: Sequence[int|None]|None = None
+):
+    '''
+    Agrega al modelo pistas de la solución a partir de las aulas que tienen
+    asignadas las clases actualmente, o de las aulas sugeridas.
+
+    Para cada clase que tiene un aula asignada se sugiere esa aula, y que no
+    está en ninguna de las demás. Las clases sin aula asignada no reciben
+    pistas. Si el aula asignada es parte de un grupo de aulas intercambiables,
+    se sugiere la columna del grupo.
+
+    :param clases: Los datos de las clases del problema de asignación.
+    :pram aulas: Los datos de las aulas disponibles.
+    :param modelo: El CpModel al que agregar las pistas.
+    :param asignaciones: Las variables de asignación.
+    :param grupos: Los grupos de aulas intercambiables de la matriz.
+    :param aulas_sugeridas: El índice del aula sugerida para cada clase (por
+    ejemplo, la solución de la heurística). Si es `None`, se sugieren las aulas
+    asignadas actualmente.
+    '''
+    representantes: dict[int, int] = {
+        i_aula: representante
+        for representante, grupo in (grupos or {}).items()
+        for i_aula in grupo
+    }
+
+    if aulas_sugeridas is None:
+        aulas_sugeridas = [aulas.índice_o_none(clase.aula_asignada) for clase in clases.clases]
+
+    for i_clase, i_aula_sugerida in enumerate(aulas_sugeridas):
+        if i_aula_sugerida is None:
+            continue
+
+        i_aula_sugerida = representantes.get(i_aula_sugerida, i_aula_sugerida)
+        for celda in asignaciones.celdas_de_fila(i_clase):
+            modelo.add_hint(asignaciones.variables[celda], bool(asignaciones.columnas[celda] == i_aula_sugerida))
+
+def repartir_aulas_intercambiables(
+    clases: ClasesPreprocesadas,
+    aulas: AulasPreprocesadas,
+    grupos: dict[int, list[int]],
+    aulas_asignadas: list[int|None]
+) -> list[int|None]:
+    '''
+    Convertir las asignaciones a grupos de aulas intercambiables en
+    asignaciones a aulas concretas.
+
+    Las clases de cada grupo se recorren en orden de inicio, y a cada una se le
+    asigna un aula del grupo que esté libre en ese momento, prefiriendo el aula
+    que tenía asignada antes. Como los horarios son intervalos y el modelo
+    garantiza que nunca hay más clases superpuestas que aulas en el grupo,
+    siempre hay alguna aula libre.
+
+    :param clases: Los datos de las clases del problema de asignación.
+    :pram aulas: Los datos de las aulas disponibles.
+    :param grupos: Los grupos de aulas intercambiables, con el representante
+    de cada grupo como clave.
+    :param aulas_asignadas: El índice de la columna asignada a cada clase, o
+    `None` si la clase quedó sin aula.
+    :return: El índice del aula asignada a cada clase, o `None` si la clase
+    quedó sin aula.
+    '''
+    asignadas = list(aulas_asignadas)
+    inicios, fines = clases.inicios.tolist(), clases.fines.tolist()
+
+    for representante, grupo in grupos.items():
+        clases_del_grupo = [i_clase for i_clase, i_aula in enumerate(asignadas) if i_aula == representante]
+        clases_del_grupo.sort(key=lambda i_clase: (inicios[i_clase], fines[i_clase]))
+
+        # El minuto a partir del cual está libre cada aula del grupo
+        libre_desde: dict[int, int] = dict.fromkeys(grupo, -1)
+        for i_clase in clases_del_grupo:
+            libres = [i_aula for i_aula in grupo if libre_desde[i_aula] <= inicios[i_clase]]
+            i_aula_anterior = aulas.índice_o_none(clases.clases[i_clase].aula_asignada)
+            i_aula = i_aula_anterior if i_aula_anterior in libres else libres[0]
+
+            asignadas[i_clase] = i_aula
+            libre_desde[i_aula] = fines[i_clase]
+
+    return asignadas
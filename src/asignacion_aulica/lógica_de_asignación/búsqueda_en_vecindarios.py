@@ -0,0 +1,356 @@
+'''
+En este módulo se define la búsqueda en vecindarios (large neighborhood search),
+que resuelve un problema de asignación muy grande mejorando de a partes una
+asignación inicial.
+
+La asignación inicial es la anterior, si cumple con las restricciones, o la de
+la heurística (ver `heurística.py`). Después se repite:
+1. Liberar una ventana de clases (ver `vecindarios.py`): las clases de una
+   franja horaria, las que están en un mismo edificio, o las de una misma
+   carrera, hasta `ConfiguraciónDelSolver.máximo_de_clases_por_ventana`.
+2. Volver a resolver la ventana con CP-SAT, con las demás clases fijas en su
+   aula y la asignación actual como pista, con un tiempo máximo por ventana.
+3. Quedarse con la nueva asignación de la ventana sólo si baja la
+   penalización total.
+
+Cada ventana es un modelo chico, así que la memoria y el tiempo de cada paso
+están acotados aunque el problema tenga miles de clases. La búsqueda termina
+cuando se termina el tiempo total, cuando muchas ventanas seguidas no mejoran
+la penalización, o cuando ya se probaron todas las ventanas sin mejoras.
+
+La penalización se calcula con `preferencias.costos_por_celda`, así que es
+comparable con la de las demás formas de resolver. Las ventanas se resuelven
+normalizando las penalizaciones con las cotas superiores del problema entero,
+así que minimizan el mismo costo con el que se decide si se acepta la ventana.
+'''
+from collections.abc import Callable, Iterator, Sequence
+from typing import TypeAlias
+import logging, random, time
+import numpy as np
+
+from asignacion_aulica.lógica_de_asignación.configuración import ConfiguraciónDelSolver
+from asignacion_aulica.lógica_de_asignación.excepciones import AsignaciónImposibleException
+from asignacion_aulica.lógica_de_asignación.heurística import asignar_con_heurística
+from asignacion_aulica.lógica_de_asignación.matriz_de_asignaciones import MatrizDeAsignaciones
+from asignacion_aulica.lógica_de_asignación.métricas import MétricasDeUnProblema
+from asignacion_aulica.lógica_de_asignación.preferencias import (
+    PESO_DE_CLASE_SIN_AULA,
+    costos_por_celda,
+    obtener_cotas_superiores
+)
+from asignacion_aulica.lógica_de_asignación.preprocesamiento import AulasPreprocesadas, ClasesPreprocesadas
+from asignacion_aulica.lógica_de_asignación.progreso import ProgresoDeLaAsignación
+from asignacion_aulica.lógica_de_asignación.vecindarios import (
+    clases_en_conflicto,
+    subproblema_con_clases_fijas,
+    vecinas_de_cada_clase,
+    vecindario
+)
+from asignacion_aulica.lógica_de_asignación import restricciones
+
+logger = logging.getLogger(__name__)
+
+ResolverVentana: TypeAlias = Callable[[ClasesPreprocesadas, list[int|None], float, list[int]], list[int|None]]
+'''
+Función que resuelve el problema de una ventana. Recibe el problema (con las
+clases fijas como aulas ocupadas), el aula actual de cada clase de la ventana
+para usar como pista, el tiempo máximo, y las cotas superiores del problema
+entero con las que se normalizan las penalizaciones (ver
+`preferencias.obtener_penalizaciones`). Devuelve el aula asignada a cada clase de la ventana, o lanza
+`AsignaciónImposibleException` si no encontró una solución.
+'''
+
+def buscar_en_vecindarios(
+    clases: ClasesPreprocesadas,
+    aulas: AulasPreprocesadas,
+    resolver_ventana: ResolverVentana,
+    configuración: ConfiguraciónDelSolver,
+    progreso: ProgresoDeLaAsignación,
+    métricas: MétricasDeUnProblema,
+    aulas_permitidas: np.ndarray|None = None,
+    cotas_superiores: list[int]|None = None
+) -> tuple[list[int|None], float, float]:
+    '''
+    Asignar aulas a todas las clases de un problema de asignación con la
+    búsqueda en vecindarios.
+
+    Si la asignación inicial tiene conflictos (por ejemplo, clases que la
+    heurística dejó sin aula), antes de buscar mejoras se reparan con
+    vecindarios cada vez más grandes, de hasta
+    `ConfiguraciónDelSolver.máximo_de_clases_por_ventana` clases.
+
+    :param clases: Los datos de las clases del problema de asignación.
+    :param aulas: Los datos de las aulas disponibles.
+    :param resolver_ventana: La función con la que se resuelve cada ventana.
+    :param configuración: Opciones de la búsqueda.
+    :param progreso: Objeto para poder cancelar. Si se cancela, se devuelve la
+    mejor asignación encontrada.
+    :param métricas: Las métricas del problema, a las que se suma la cantidad
+    de ventanas resueltas.
+    :param aulas_permitidas: La matriz de aulas permitidas, si ya se calculó
+    (ver `restricciones.aulas_prohibidas`). Si es `None`, se calcula.
+    :param cotas_superiores: Las cotas superiores con las que se normaliza
+    cada penalización (ver `preferencias.obtener_penalizaciones`), o `None`
+    para usar las de este problema.
+
+    :return: Tupla con el índice del aula asignada a cada clase (o `None` si
+    quedó sin aula en la asignación parcial), la penalización de la solución
+    (ponderada como en `sumar_penalizaciones`), y una cota inferior de la
+    penalización óptima, que es la suma del menor costo posible de cada clase.
+    :raise AsignaciónImposibleException: Si no se pudieron reparar los
+    conflictos de la asignación inicial y no es una asignación parcial.
+    '''
+    inicio = time.monotonic()
+
+    def tiempo_restante() -> float|None:
+        if configuración.tiempo_máximo_en_segundos is None:
+            return None
+        return configuración.tiempo_máximo_en_segundos - (time.monotonic() - inicio)
+
+    # El costo de cada clase en cada aula permitida, y el de quedar sin aula
+    if aulas_permitidas is None:
+        aulas_permitidas = ~restricciones.aulas_prohibidas(clases, aulas)
+    celdas = MatrizDeAsignaciones(aulas_permitidas, None)
+    if cotas_superiores is None:
+        cotas_superiores = obtener_cotas_superiores(clases, aulas, celdas)
+    costos_de_las_celdas = costos_por_celda(clases, aulas, celdas, cotas_superiores)
+    costos: list[dict[int|None, float]] = [{None: float(PESO_DE_CLASE_SIN_AULA)} for _ in clases.clases]
+    for fila, columna, costo in zip(celdas.filas.tolist(), celdas.columnas.tolist(), costos_de_las_celdas.tolist()):
+        costos[fila][columna] = costo
+
+    costos_mínimos = np.full(celdas.forma[0], float(PESO_DE_CLASE_SIN_AULA))
+    np.minimum.at(costos_mínimos, celdas.filas, costos_de_las_celdas)
+
+    aulas_actuales = _asignación_inicial(clases, aulas, configuración, aulas_permitidas, cotas_superiores)
+    aulas_actuales = _reparar_conflictos(
+        clases, aulas, aulas_actuales, aulas_permitidas, resolver_ventana, configuración, progreso, cotas_superiores, tiempo_restante
+    )
+
+    # Las ventanas que se probaron sin mejoras desde la última mejora, que no
+    # hace falta volver a resolver
+    probadas: set[tuple[int, ...]] = set()
+    ventanas_sin_mejora = 0
+    terminar = False
+    aleatorio = random.Random(0)
+    for ventanas in _ciclos_de_ventanas(clases, aulas, aulas_actuales, configuración.máximo_de_clases_por_ventana, aleatorio):
+        ventanas = [ventana for ventana in ventanas if ventana not in probadas]
+        if not ventanas:
+            break
+
+        for ventana in ventanas:
+            restante = tiempo_restante()
+            terminar = (
+                progreso.cancelada()
+                or (restante is not None and restante <= 0)
+                or ventanas_sin_mejora >= configuración.ventanas_sin_mejora_máximas
+            )
+            if terminar:
+                break
+
+            problema = subproblema_con_clases_fijas(clases, aulas_actuales, ventana)
+            tiempo = configuración.tiempo_por_ventana_en_segundos if restante is None else min(configuración.tiempo_por_ventana_en_segundos, restante)
+            try:
+                aulas_nuevas = resolver_ventana(problema, [aulas_actuales[i_clase] for i_clase in ventana], tiempo, cotas_superiores)
+            except AsignaciónImposibleException as exc:
+                logger.debug('No se resolvió una ventana de %d clases: %s', len(ventana), exc)
+                ventanas_sin_mejora += 1
+                continue
+            métricas.ventanas += 1
+
+            costo_actual = sum(costos[i_clase][aulas_actuales[i_clase]] for i_clase in ventana)
+            costo_nuevo = sum(costos[i_clase][i_aula] for i_clase, i_aula in zip(ventana, aulas_nuevas))
+            if costo_nuevo < costo_actual - 1e-9:
+                for i_clase, i_aula in zip(ventana, aulas_nuevas):
+                    aulas_actuales[i_clase] = i_aula
+                logger.debug('Una ventana de %d clases bajó la penalización en %f.', len(ventana), costo_actual - costo_nuevo)
+                métricas.ventanas_con_mejora += 1
+                ventanas_sin_mejora = 0
+                probadas.clear()
+            else:
+                ventanas_sin_mejora += 1
+                probadas.add(ventana)
+
+        if terminar:
+            break
+
+    logger.info(
+        'La búsqueda en vecindarios resolvió %d ventanas, de las que %d mejoraron la penalización.',
+        métricas.ventanas, métricas.ventanas_con_mejora
+    )
+
+    costos_asignados = np.array([costos[i_clase][i_aula] for i_clase, i_aula in enumerate(aulas_actuales)], dtype=float)
+    return aulas_actuales, float(costos_asignados.sum()), float(costos_mínimos.sum())
+
+def _asignación_inicial(
+    clases: ClasesPreprocesadas,
+    aulas: AulasPreprocesadas,
+    configuración: ConfiguraciónDelSolver,
+    aulas_permitidas: np.ndarray,
+    cotas_superiores: list[int]
+) -> list[int|None]:
+    '''
+    :return: Las aulas asignadas actualmente, si la configuración lo indica y
+    no tienen conflictos, o si no la asignación parcial de la heurística.
+    '''
+    if configuración.usar_asignación_anterior:
+        aulas_anteriores = [aulas.índice_o_none(clase.aula_asignada) for clase in clases.clases]
+        if not clases_en_conflicto(clases, aulas, aulas_anteriores, aulas_permitidas):
+            return aulas_anteriores
+
+    aulas_de_la_heurística, _, _ = asignar_con_heurística(clases, aulas, True, aulas_permitidas, cotas_superiores)
+    return aulas_de_la_heurística
+
+def _reparar_conflictos(
+    clases: ClasesPreprocesadas,
+    aulas: AulasPreprocesadas,
+    aulas_actuales: list[int|None],
+    aulas_permitidas: np.ndarray,
+    resolver_ventana: ResolverVentana,
+    configuración: ConfiguraciónDelSolver,
+    progreso: ProgresoDeLaAsignación,
+    cotas_superiores: list[int],
+    tiempo_restante: Callable[[], float|None]
+) -> list[int|None]:
+    '''
+    Sacarles el aula a las clases en conflicto, y volver a resolverlas junto
+    con su vecindario.
+
+    Las clases en conflicto se reparan en orden de inicio, en grupos de hasta
+    `máximo_de_clases_por_ventana` clases. El vecindario de cada grupo se
+    agranda de a un radio mientras no se pueda resolver, hasta llegar al
+    máximo de clases por ventana. Cada intento tiene el tiempo máximo de una
+    ventana.
+
+    Las vecinas de cada clase se calculan una sola vez, con las clases en
+    conflicto sin aula, así que el costo de cada intento depende del tamaño
+    del vecindario y no del problema entero.
+
+    :return: La asignación sin conflictos. En la asignación parcial, las
+    clases que no se pudieron reparar quedan sin aula.
+    :raise AsignaciónImposibleException: Si quedaron clases sin reparar y no
+    es una asignación parcial.
+    '''
+    semillas = clases_en_conflicto(clases, aulas, aulas_actuales, aulas_permitidas)
+    if not semillas:
+        return aulas_actuales
+
+    # Sin aula, las clases en conflicto no ocupan un aula en los demás grupos
+    aulas_reparadas = list(aulas_actuales)
+    for i_clase in semillas:
+        aulas_reparadas[i_clase] = None
+    vecinas = vecinas_de_cada_clase(clases, aulas, aulas_reparadas, aulas_permitidas)
+
+    máximo = configuración.máximo_de_clases_por_ventana
+    semillas.sort(key=lambda i_clase: (clases.inicios[i_clase], clases.fines[i_clase]))
+    sin_reparar = 0
+    for i in range(0, len(semillas), máximo):
+        grupo = semillas[i:i + máximo]
+        if not _reparar_grupo(clases, aulas, aulas_reparadas, grupo, vecinas, resolver_ventana, configuración, progreso, cotas_superiores, tiempo_restante):
+            sin_reparar += len(grupo)
+
+    if sin_reparar:
+        logger.debug('No se pudieron reparar %d clases de la asignación inicial.', sin_reparar)
+        if not configuración.asignación_parcial:
+            raise AsignaciónImposibleException('No se pudieron reparar los conflictos de la asignación inicial.')
+
+    return aulas_reparadas
+
+def _reparar_grupo(
+    clases: ClasesPreprocesadas,
+    aulas: AulasPreprocesadas,
+    aulas_actuales: list[int|None],
+    grupo: list[int],
+    vecinas: dict[int, list[int]],
+    resolver_ventana: ResolverVentana,
+    configuración: ConfiguraciónDelSolver,
+    progreso: ProgresoDeLaAsignación,
+    cotas_superiores: list[int],
+    tiempo_restante: Callable[[], float|None]
+) -> bool:
+    '''
+    Resolver un grupo de clases en conflicto con vecindarios cada vez más
+    grandes, modificando `aulas_actuales` con el primero que se pueda
+    resolver. El último vecindario que se prueba es el que llega al máximo de
+    clases por ventana, completado con clases del siguiente radio.
+
+    :return: Si se pudo resolver el grupo.
+    '''
+    máximo = configuración.máximo_de_clases_por_ventana
+    liberadas: list[int] = []
+    radio = 1
+    while len(liberadas) < máximo:
+        restante = tiempo_restante()
+        if progreso.cancelada() or (restante is not None and restante <= 0):
+            return False
+
+        siguiente = vecindario(clases, aulas, aulas_actuales, grupo, radio, vecinas)
+        if len(siguiente) > máximo:
+            anteriores = set(liberadas or grupo)
+            nuevas = [i_clase for i_clase in siguiente if i_clase not in anteriores]
+            siguiente = sorted(anteriores.union(nuevas[:máximo - len(anteriores)]))
+        if siguiente == liberadas:
+            # El vecindario ya no crece
+            return False
+        liberadas = siguiente
+        radio += 1
+
+        problema = subproblema_con_clases_fijas(clases, aulas_actuales, liberadas)
+        tiempo = configuración.tiempo_por_ventana_en_segundos if restante is None else min(configuración.tiempo_por_ventana_en_segundos, restante)
+        try:
+            aulas_nuevas = resolver_ventana(problema, [aulas_actuales[i_clase] for i_clase in liberadas], tiempo, cotas_superiores)
+        except AsignaciónImposibleException as exc:
+            logger.debug('No se reparó un vecindario de %d clases: %s', len(liberadas), exc)
+            continue
+
+        for i_clase, i_aula in zip(liberadas, aulas_nuevas):
+            aulas_actuales[i_clase] = i_aula
+        return True
+
+    return False
+
+def _ciclos_de_ventanas(
+    clases: ClasesPreprocesadas,
+    aulas: AulasPreprocesadas,
+    aulas_actuales: Sequence[int|None],
+    máximo_de_clases: int,
+    aleatorio: random.Random
+) -> Iterator[list[tuple[int, ...]]]:
+    '''
+    Generar las ventanas de la búsqueda, de a un ciclo por vez.
+
+    En cada ciclo, las clases se agrupan por franja horaria (todas las clases
+    en orden de inicio), por el edificio del aula que tienen asignada, y por
+    carrera. Cada grupo se parte en ventanas de clases consecutivas en el
+    tiempo, con un desplazamiento aleatorio para que los cortes cambien de un
+    ciclo al otro, y las ventanas se mezclan.
+
+    :param aulas_actuales: El aula asignada actualmente a cada clase. Se lee
+    al principio de cada ciclo, así que se puede modificar entre ciclos.
+    :return: Las ventanas de cada ciclo, con los índices de las clases en
+    orden creciente.
+    '''
+    orden_por_inicio = np.lexsort((clases.fines, clases.inicios)).tolist()
+    edificio_de_cada_aula = np.zeros(len(aulas.aulas), dtype=np.int64)
+    for i_edificio, rango in enumerate(aulas.rangos_de_aulas.values()):
+        edificio_de_cada_aula[rango] = i_edificio
+
+    while True:
+        por_edificio: dict[int, list[int]] = {}
+        por_carrera: dict[int, list[int]] = {}
+        for i_clase in orden_por_inicio:
+            i_aula = aulas_actuales[i_clase]
+            if i_aula is not None:
+                por_edificio.setdefault(int(edificio_de_cada_aula[i_aula]), []).append(i_clase)
+            por_carrera.setdefault(id(clases.clases[i_clase].materia.carrera), []).append(i_clase)
+
+        ventanas: set[tuple[int, ...]] = set()
+        for grupo in (orden_por_inicio, *por_edificio.values(), *por_carrera.values()):
+            desplazamiento = aleatorio.randrange(máximo_de_clases) if len(grupo) > máximo_de_clases else 0
+            for i in range(desplazamiento - máximo_de_clases, len(grupo), máximo_de_clases):
+                ventana = grupo[max(0, i):i + máximo_de_clases]
+                if len(ventana) > 1:
+                    ventanas.add(tuple(sorted(ventana)))
+
+        ventanas_del_ciclo = sorted(ventanas)
+        aleatorio.shuffle(ventanas_del_ciclo)
+        yield ventanas_del_ciclo
@@ -0,0 +1,184 @@
+'''
+En este módulo se define un cache en disco de las soluciones de los problemas
+de asignación.
+
+Cada problema se identifica con una clave calculada a partir de sus datos de
+entrada ya preprocesados (horarios, cantidad de alumnos, equipamiento, aulas,
+aulas ocupadas, aulas dobles y preferencias), de los pesos de las
+penalizaciones y de las opciones del solver que cambian el resultado. Si un
+problema no cambió desde la última vez que se resolvió, se puede usar la
+solución guardada sin construir el modelo.
+
+Cada entrada se guarda en un archivo JSON con el nombre de su clave. Cuando hay
+más entradas que el máximo configurado se borran las que se usaron hace más
+tiempo, según la fecha de modificación de los archivos (que se actualiza cada
+vez que se lee una entrada).
+'''
+from ortools.sat.python import cp_model
+from collections.abc import Sequence
+from pathlib import Path
+import json, logging, os, threading
+
+from asignacion_aulica.lógica_de_asignación.configuración import ConfiguraciónDelSolver
+from asignacion_aulica.lógica_de_asignación.preferencias import todas_las_penalizaciones
+from asignacion_aulica.lógica_de_asignación.preprocesamiento import (
+    AulasPreprocesadas,
+    ClasesPreprocesadas,
+    firma_del_problema
+)
+
+logger = logging.getLogger(__name__)
+
+VERSIÓN_DEL_CACHE: int = 2
+'''
+Versión del formato de las entradas y de la clave. Cambiarla invalida todas las
+entradas guardadas.
+'''
+
+def clave_del_problema(
+    clases: ClasesPreprocesadas,
+    aulas: AulasPreprocesadas,
+    configuración: ConfiguraciónDelSolver,
+    cotas_superiores: Sequence[int]|None = None
+) -> str:
+    '''
+    Calcular la clave con la que se guarda la solución de un problema de
+    asignación en el cache.
+
+    La clave no depende de las aulas que tienen asignadas las clases, sólo de
+    los datos que cambian el resultado de la asignación.
+
+    :param clases: Los datos de las clases del problema, que tiene que tener
+    al menos una clase.
+    :param aulas: Los datos de las aulas disponibles.
+    :param configuración: Las opciones del solver.
+    :param cotas_superiores: Las cotas superiores con las que se normalizan
+    las penalizaciones del problema, si no son las del mismo problema.
+    :return: La clave, como un string hexadecimal.
+    '''
+    datos_adicionales = (
+        VERSIÓN_DEL_CACHE,
+        [(peso, penalización.__name__) for peso, penalización in todas_las_penalizaciones],
+        configuración.lexicográfico,
+        configuración.gap_relativo_máximo,
+        configuración.asignación_parcial,
+        configuración.agrupar_aulas_intercambiables,
+        None if cotas_superiores is None else list(cotas_superiores)
+    )
+    return firma_del_problema(
+        clases,
+        aulas,
+        clases.clases[0].día,
+        incluir_aulas_asignadas=False,
+        datos_adicionales=datos_adicionales
+    )
+
+class CacheDeSoluciones:
+    '''
+    Cache en disco de soluciones de problemas de asignación, con desalojo de
+    las entradas usadas menos recientemente.
+
+    Se puede usar desde varios hilos al mismo tiempo.
+    '''
+    def __init__(self, directorio: Path, máximo_de_entradas: int = 1000, guardar_modelos: bool = False):
+        '''
+        :param directorio: La carpeta donde guardar las entradas. Se crea si no
+        existe.
+        :param máximo_de_entradas: La cantidad máxima de soluciones guardadas.
+        :param guardar_modelos: Si también guardar el modelo serializado de
+        cada problema (para poder analizarlo después), además de la solución.
+        '''
+        self.directorio: Path = directorio
+        self.máximo_de_entradas: int = máximo_de_entradas
+        self.guardar_modelos: bool = guardar_modelos
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: str) -> dict|None:
+        '''
+        :param clave: La clave del problema, obtenida con `clave_del_problema`.
+        :return: Diccionario con los campos `aulas_asignadas`, `penalización` y
+        `cota_inferior` de la solución guardada, o `None` si no hay una
+        solución guardada con esa clave.
+        '''
+        path = self._path_de_la_solución(clave)
+        try:
+            with open(path, encoding='utf-8') as archivo:
+                datos = json.load(archivo)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+
+        if datos.get('versión') != VERSIÓN_DEL_CACHE:
+            return None
+        return datos
+
+    def guardar(
+        self,
+        clave: str,
+        aulas_asignadas: list[int|None],
+        penalización: float,
+        cota_inferior: float,
+        modelo: cp_model.CpModel|None = None
+    ):
+        '''
+        Guardar la solución de un problema, y desalojar entradas viejas si hace
+        falta. Los errores al escribir se loggean pero no se propagan, porque
+        el cache es sólo una optimización.
+
+        :param clave: La clave del problema, obtenida con `clave_del_problema`.
+        :param aulas_asignadas: El índice del aula asignada a cada clase, o
+        `None` para las clases que quedaron sin aula.
+        :param penalización: La penalización de la solución.
+        :param cota_inferior: La cota inferior de la penalización.
+        :param modelo: El modelo del problema, que sólo se guarda si se
+        configuró `guardar_modelos`.
+        '''
+        datos = {
+            'versión': VERSIÓN_DEL_CACHE,
+            'aulas_asignadas': [None if i_aula is None else int(i_aula) for i_aula in aulas_asignadas],
+            'penalización': float(penalización),
+            'cota_inferior': float(cota_inferior)
+        }
+        path = self._path_de_la_solución(clave)
+        try:
+            self.directorio.mkdir(parents=True, exist_ok=True)
+
+            # Escribir en un archivo temporal y después reemplazar, para que
+            # nunca se lea una entrada escrita a medias.
+            temporal = path.with_name(f'{path.name}.{threading.get_ident()}.tmp')
+            with open(temporal, 'w', encoding='utf-8') as archivo:
+                json.dump(datos, archivo)
+            os.replace(temporal, path)
+
+            if self.guardar_modelos and modelo is not None:
+                modelo.export_to_file(str(self.directorio / f'{clave}.pb'))
+        except OSError:
+            logger.exception('No se pudo guardar la solución en el cache.')
+            return
+
+        self._desalojar()
+
+    def _path_de_la_solución(self, clave: str) -> Path:
+        return self.directorio / f'{clave}.json'
+
+    def _desalojar(self):
+        '''
+        Borrar las entradas usadas menos recientemente hasta que queden como
+        máximo `máximo_de_entradas`.
+        '''
+        with self._lock:
+            entradas: list[tuple[float, Path]] = []
+            for path in self.directorio.glob('*.json'):
+                try:
+                    entradas.append((path.stat().st_mtime, path))
+                except FileNotFoundError:
+                    pass
+
+            sobrantes = len(entradas) - self.máximo_de_entradas
+            if sobrantes <= 0:
+                return
+
+            entradas.sort()
+            for _, path in entradas[:sobrantes]:
+                path.unlink(missing_ok=True)
+                path.with_suffix('.pb').unlink(missing_ok=True)
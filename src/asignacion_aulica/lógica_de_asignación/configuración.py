@@ -0,0 +1,110 @@
+'''
+En este módulo se definen las opciones que controlan cómo se resuelve la
+asignación de aulas.
+'''
+from dataclasses import dataclass
+from enum import Enum, auto
+
+class MotorDeAsignación(Enum):
+    '''
+    El algoritmo con el que se resuelven los problemas de asignación.
+    '''
+    # El solucionador de restricciones CP-SAT, que busca la solución óptima.
+    CP_SAT = auto()
+
+    # La heurística de `heurística.py`, que tarda milisegundos pero no
+    # garantiza encontrar la solución óptima, ni encontrar una solución.
+    HEURÍSTICA = auto()
+
+    # La búsqueda en vecindarios de `búsqueda_en_vecindarios.py`: parte de una
+    # asignación inicial y la mejora volviendo a resolver con CP-SAT ventanas
+    # chicas de clases. Sirve para días tan grandes que el modelo completo no
+    # llega a una buena solución a tiempo, pero no garantiza el óptimo. Los
+    # problemas que entran en una sola ventana se resuelven con CP-SAT.
+    BÚSQUEDA_EN_VECINDARIOS = auto()
+
+@dataclass
+class ConfiguraciónDelSolver:
+    '''
+    Opciones de la asignación y del solucionador de restricciones CP-SAT.
+
+    Los valores por defecto buscan siempre la solución óptima, sin límite de
+    tiempo.
+    '''
+
+    # Cantidad máxima de problemas de asignación que se resuelven al mismo
+    # tiempo. Con 1 se resuelven de a uno, en orden.
+    hilos: int = 1
+
+    # El algoritmo con el que se resuelve cada problema.
+    motor: MotorDeAsignación = MotorDeAsignación.CP_SAT
+
+    # Si usar la heurística cuando el solucionador no encuentra ninguna
+    # solución a tiempo (o se cancela la asignación antes de que la encuentre).
+    usar_heurística_si_falla: bool = False
+
+    # Si pasarle al solucionador la solución de la heurística como pista, en
+    # vez de las aulas asignadas actualmente. La heurística prefiere las aulas
+    # asignadas actualmente cuando no empeoran la penalización.
+    pistas_de_la_heurística: bool = False
+
+    # Si permitir que algunas clases queden sin aula cuando es imposible
+    # asignarles una, en vez de dejar sin asignar todo el día. Dejar una clase
+    # sin aula se penaliza más que todas las demás penalizaciones juntas, así
+    # que sólo pasa si no hay otra opción.
+    asignación_parcial: bool = False
+
+    # Si, cuando el solucionador demuestra que un problema no tiene solución,
+    # buscar un conjunto chico de clases y asignaciones manuales que lo hacen
+    # imposible (ver `diagnóstico.py`). Requiere resolver otro modelo, así que
+    # tarda más que informar sólo que falló.
+    diagnosticar_infactibilidad: bool = False
+
+    # Cantidad de workers que usa CP-SAT para resolver cada problema
+    # (parámetro `num_workers`). Con 0 lo decide ortools según la cantidad de
+    # procesadores, o, si hay más de un hilo, se reparten los procesadores
+    # entre los hilos.
+    workers_por_problema: int = 0
+
+    # Tiempo máximo para resolver cada problema (parámetro
+    # `max_time_in_seconds`), o `None` para no tener límite. En la búsqueda en
+    # vecindarios es el tiempo total de la búsqueda.
+    tiempo_máximo_en_segundos: float|None = None
+
+    # En la búsqueda en vecindarios, cantidad máxima de clases que se liberan
+    # en cada ventana.
+    máximo_de_clases_por_ventana: int = 150
+
+    # En la búsqueda en vecindarios, tiempo máximo para resolver cada ventana.
+    tiempo_por_ventana_en_segundos: float = 2.0
+
+    # La búsqueda en vecindarios termina cuando se resuelven esta cantidad de
+    # ventanas seguidas sin mejorar la penalización.
+    ventanas_sin_mejora_máximas: int = 10
+
+    # El solver se detiene cuando la diferencia relativa entre la mejor
+    # solución encontrada y la cota inferior del óptimo es menor a esto
+    # (parámetro `relative_gap_limit`). Con 0 busca el óptimo exacto.
+    gap_relativo_máximo: float = 0.0
+
+    # Si optimizar las penalizaciones de a una en orden de importancia
+    # (lexicográficamente), en vez de minimizar su suma ponderada.
+    lexicográfico: bool = False
+
+    # Si aceptar una solución factible cuando el solver no llega a demostrar
+    # que es óptima (por ejemplo, porque se terminó el tiempo). Si es `False`,
+    # en ese caso se considera que la asignación falló.
+    aceptar_factible: bool = False
+
+    # Si agrupar las aulas intercambiables entre sí (mismo edificio, capacidad,
+    # equipamiento y horarios) en una sola columna del modelo, lo que elimina
+    # soluciones simétricas y reduce la cantidad de variables.
+    agrupar_aulas_intercambiables: bool = True
+
+    # Si usar las aulas asignadas actualmente como pistas para el solver.
+    usar_asignación_anterior: bool = True
+
+    # Si el solver tiene que intentar reparar las pistas que no cumplen con las
+    # restricciones (por ejemplo, porque se cambió el horario de una clase), en
+    # vez de descartarlas.
+    reparar_pistas: bool = False
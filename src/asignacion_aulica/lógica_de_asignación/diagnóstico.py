@@ -0,0 +1,172 @@
+'''
+En este módulo se define el diagnóstico de los problemas de asignación que no
+tienen solución.
+
+Se arma un modelo con las mismas restricciones que el de `asignación.py`, pero
+donde la restricción de que cada clase tenga un aula, y la de que cada
+asignación manual ocupe su aula, sólo se cumplen si un literal de suposición
+(assumption) es verdadero. Si el solver demuestra que el modelo es imposible
+con todas las suposiciones, `sufficient_assumptions_for_infeasibility` devuelve
+un subconjunto de suposiciones que alcanza para que sea imposible, es decir,
+un conjunto chico de clases y asignaciones manuales en conflicto.
+
+El subconjunto no es necesariamente mínimo, así que se vuelve a resolver sólo
+con él mientras se siga achicando.
+'''
+from ortools.sat.python import cp_model
+from dataclasses import dataclass, field
+import logging
+import numpy as np
+
+from asignacion_aulica.gestor_de_datos.días_y_horarios import RangoHorario, time_to_minutos, time_to_string_horario
+from asignacion_aulica.gestor_de_datos.entidades import Aula, Clase
+from asignacion_aulica.lógica_de_asignación.configuración import ConfiguraciónDelSolver
+from asignacion_aulica.lógica_de_asignación.matriz_de_asignaciones import MatrizDeAsignaciones
+from asignacion_aulica.lógica_de_asignación.preprocesamiento import AulasPreprocesadas, ClasesPreprocesadas
+from asignacion_aulica.lógica_de_asignación import restricciones
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ConflictoDeAsignación:
+    '''
+    Un conjunto de clases y asignaciones manuales que hace imposible la
+    asignación: no hay forma de asignarle aula a todas esas clases sin
+    superponerlas entre sí o con las asignaciones manuales.
+    '''
+    # Las clases en conflicto.
+    clases: list[Clase] = field(default_factory=list)
+
+    # Las aulas que se le pueden asignar a alguna de las clases (abiertas y con
+    # el equipamiento necesario), sin contar las asignaciones manuales.
+    aulas: list[Aula] = field(default_factory=list)
+
+    # Las asignaciones manuales en conflicto, como tuplas (aula, horario).
+    aulas_ocupadas: list[tuple[Aula, RangoHorario]] = field(default_factory=list)
+
+    def mensaje(self) -> str:
+        ''':return: Una descripción del conflicto para mostrarle al usuario.'''
+        clases = ', '.join(
+            f'{clase.materia.nombre} ({_horario(clase.horario)})'
+            for clase in self.clases
+        )
+        aulas = ', '.join(aula.nombre for aula in self.aulas) or 'ninguna'
+        mensaje = f'Las clases de {clases} no se pueden asignar al mismo tiempo en las aulas permitidas para ellas ({aulas})'
+        if self.aulas_ocupadas:
+            ocupadas = ', '.join(f'{aula.nombre} ({_horario(horario)})' for aula, horario in self.aulas_ocupadas)
+            mensaje += f', teniendo en cuenta las asignaciones manuales en {ocupadas}'
+
+        return mensaje + '.'
+
+def diagnosticar_infactibilidad(
+    clases: ClasesPreprocesadas,
+    aulas: AulasPreprocesadas,
+    configuración: ConfiguraciónDelSolver|None = None
+) -> ConflictoDeAsignación|None:
+    '''
+    Buscar un conjunto chico de clases y asignaciones manuales que hace
+    imposible el problema de asignación.
+
+    No se agrupan las aulas intercambiables ni se agregan penalizaciones, porque
+    sólo importa si hay alguna solución.
+
+    :param clases: Los datos de las clases del problema de asignación.
+    :param aulas: Los datos de las aulas disponibles.
+    :param configuración: Opciones del solucionador; se usa el tiempo máximo
+    para cada resolución. Si es `None` se usan los valores por defecto.
+
+    :return: El conflicto encontrado, o `None` si el problema tiene solución o
+    no se llegó a demostrar que no la tiene.
+    '''
+    configuración = configuración or ConfiguraciónDelSolver()
+    modelo = cp_model.CpModel()
+
+    # Las aulas ocupadas se prohíben con suposiciones, así que no se cuentan
+    # entre las aulas prohibidas
+    prohibidas = np.zeros(shape=(len(clases.clases), len(aulas.aulas)), dtype=bool)
+    for restricción in restricciones.todas_las_restricciones_de_aulas_prohibidas:
+        if restricción is not restricciones.no_asignar_aulas_ocupadas:
+            prohibidas |= restricción(clases, aulas)
+    asignaciones = MatrizDeAsignaciones(~prohibidas, modelo)
+
+    for grupo in restricciones.restricciones_con_variables(clases, aulas, asignaciones):
+        modelo.add_at_most_one(grupo)
+
+    # Cada suposición es el índice de una clase o de una asignación manual
+    suposiciones: dict[int, tuple[str, int]] = {}
+    literales: list[cp_model.IntVar] = []
+
+    for i_clase in range(len(clases.clases)):
+        literal = modelo.new_bool_var(f'asignar_clase_{i_clase}')
+        variables = asignaciones.variables_de_fila(i_clase)
+        modelo.add_at_most_one(variables)
+        modelo.add_bool_or(variables).only_enforce_if(literal)
+        suposiciones[literal.index] = ('clase', i_clase)
+        literales.append(literal)
+
+    aulas_dobles_que_contienen: dict[int, int] = {
+        aula_hija: aula_doble
+        for aula_doble, aulas_hijas in aulas.aulas_dobles.items()
+        for aula_hija in aulas_hijas
+    }
+    for i_ocupada, (i_aula, horario) in enumerate(clases.aulas_ocupadas):
+        afectadas = [i_aula, *aulas.aulas_dobles.get(i_aula, ())]
+        if i_aula in aulas_dobles_que_contienen:
+            afectadas.append(aulas_dobles_que_contienen[i_aula])
+
+        inicio, fin = time_to_minutos(horario.inicio), time_to_minutos(horario.fin)
+        variables = [
+            asignaciones.variables[celda]
+            for afectada in afectadas
+            for celda in asignaciones.celdas_de_columna(afectada).tolist()
+            if clases.inicios[asignaciones.filas[celda]] < fin and inicio < clases.fines[asignaciones.filas[celda]]
+        ]
+        if not variables:
+            continue
+
+        literal = modelo.new_bool_var(f'ocupar_aula_{i_aula}_{i_ocupada}')
+        modelo.add_bool_and([variable.Not() for variable in variables]).only_enforce_if(literal)
+        suposiciones[literal.index] = ('ocupada', i_ocupada)
+        literales.append(literal)
+
+    # Extraer el conflicto, y achicarlo mientras se pueda. Con un solo worker
+    # el solver siempre informa las suposiciones usadas.
+    solver = cp_model.CpSolver()
+    solver.parameters.num_workers = 1
+    if configuración.tiempo_máximo_en_segundos is not None:
+        solver.parameters.max_time_in_seconds = configuración.tiempo_máximo_en_segundos
+
+    conflicto: list[int]|None = None
+    while True:
+        modelo.clear_assumptions()
+        modelo.add_assumptions(literales)
+        status = solver.solve(modelo)
+        if status != cp_model.INFEASIBLE:
+            break
+
+        conflicto = list(solver.sufficient_assumptions_for_infeasibility())
+        if len(conflicto) >= len(literales):
+            break
+        en_el_conflicto = set(conflicto)
+        literales = [literal for literal in literales if literal.index in en_el_conflicto]
+
+    if conflicto is None:
+        logger.info('No se pudo demostrar que el problema es imposible (status %s).', solver.status_name(status))
+        return None
+
+    i_clases = sorted(índice for tipo, índice in map(suposiciones.__getitem__, conflicto) if tipo == 'clase')
+    i_ocupadas = sorted(índice for tipo, índice in map(suposiciones.__getitem__, conflicto) if tipo == 'ocupada')
+    i_aulas = sorted(set(asignaciones.columnas[asignaciones.celdas_de_filas(i_clases)].tolist()))
+
+    return ConflictoDeAsignación(
+        clases=[clases.clases[i_clase] for i_clase in i_clases],
+        aulas=[aulas.aulas[i_aula].aula_original for i_aula in i_aulas],
+        aulas_ocupadas=[
+            (aulas.aulas[clases.aulas_ocupadas[i_ocupada][0]].aula_original, clases.aulas_ocupadas[i_ocupada][1])
+            for i_ocupada in i_ocupadas
+        ]
+    )
+
+def _horario(horario: RangoHorario) -> str:
+    ''':return: El horario en formato "HH:MM a HH:MM".'''
+    return f'{time_to_string_horario(horario.inicio)} a {time_to_string_horario(horario.fin)}'
@@ -1,2 +1,14 @@
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from asignacion_aulica.lógica_de_asignación.diagnóstico import ConflictoDeAsignación
+
 class AsignaciónImposibleException(Exception):
-    pass
+    def __init__(self, mensaje: str, conflicto: 'ConflictoDeAsignación|None' = None):
+        '''
+        :param mensaje: Por qué no se pudo hacer la asignación.
+        :param conflicto: Las clases y aulas que hacen imposible la asignación,
+        si se diagnosticó (ver `diagnóstico.py`).
+        '''
+        super().__init__(mensaje)
+        self.conflicto: 'ConflictoDeAsignación|None' = conflicto
@@ -0,0 +1,184 @@
+'''
+En este módulo se define una heurística que resuelve un problema de asignación
+sin el solucionador de restricciones.
+
+Es un algoritmo goloso de tipo "best-fit" para planificar intervalos: las
+clases se recorren en orden de inicio, y a cada una se le asigna, entre las
+aulas permitidas (ver `restricciones.aulas_prohibidas`) que están libres en su
+horario, la que menos aumenta la penalización (ver
+`preferencias.costos_por_celda`). Un aula doble y las aulas que la componen se
+ocupan juntas.
+
+En la asignación parcial (ver `ConfiguraciónDelSolver.asignación_parcial`),
+las clases que no tienen ningún aula libre quedan sin aula.
+
+Tarda milisegundos aun con miles de clases, pero no garantiza encontrar la
+solución óptima, ni encontrar una solución aunque exista. Sirve como vista
+previa de la asignación, como alternativa cuando el solucionador no encuentra
+una solución a tiempo, y como pista para el solucionador.
+'''
+from bisect import bisect_left, insort
+from collections.abc import Sequence
+import numpy as np
+
+from asignacion_aulica.lógica_de_asignación.excepciones import AsignaciónImposibleException
+from asignacion_aulica.lógica_de_asignación.matriz_de_asignaciones import MatrizDeAsignaciones
+from asignacion_aulica.lógica_de_asignación.preferencias import PESO_DE_CLASE_SIN_AULA, costos_por_celda
+from asignacion_aulica.lógica_de_asignación.preprocesamiento import AulasPreprocesadas, ClasesPreprocesadas
+from asignacion_aulica.lógica_de_asignación import restricciones
+
+def asignar_con_heurística(
+    clases: ClasesPreprocesadas,
+    aulas: AulasPreprocesadas,
+    asignación_parcial: bool = False,
+    aulas_permitidas: np.ndarray|None = None,
+    cotas_superiores: Sequence[int]|None = None
+) -> tuple[list[int|None], float, float]:
+    '''
+    Asignar aulas a todas las clases de un problema de asignación con la
+    heurística.
+
+    Primero se recorren las clases en orden de inicio. Si alguna clase se queda
+    sin aula libre, se vuelve a intentar empezando por las clases que tienen
+    menos aulas permitidas. En la asignación parcial se prueban los dos órdenes,
+    y se elige el que deja menos clases sin aula.
+
+    Con el mismo costo, se prefiere el aula que la clase tiene asignada
+    actualmente.
+
+    :param clases: Los datos de las clases del problema de asignación.
+    :param aulas: Los datos de las aulas disponibles.
+    :param asignación_parcial: Si dejar sin aula a las clases que no tienen
+    ningún aula libre, en vez de fallar.
+    :param aulas_permitidas: La matriz de aulas permitidas, si ya se calculó
+    (ver `restricciones.aulas_prohibidas`). Si es `None`, se calcula.
+    :param cotas_superiores: Las cotas superiores con las que se normaliza
+    cada penalización (ver `preferencias.obtener_penalizaciones`), o `None`
+    para usar las de este problema.
+
+    :return: Tupla con el índice del aula asignada a cada clase (o `None` si
+    quedó sin aula), la penalización de la solución (ponderada como en
+    `sumar_penalizaciones`, más `PESO_DE_CLASE_SIN_AULA` por cada clase sin
+    aula), y una cota inferior de la penalización óptima, que es la suma del
+    menor costo posible de cada clase.
+    :raise AsignaciónImposibleException: Si no es una asignación parcial y
+    alguna clase no tiene ningún aula permitida, o con ninguno de los órdenes
+    se encuentra un aula libre para todas las clases.
+    '''
+    if aulas_permitidas is None:
+        aulas_permitidas = ~restricciones.aulas_prohibidas(clases, aulas)
+    celdas = MatrizDeAsignaciones(aulas_permitidas, None)
+    costos = costos_por_celda(clases, aulas, celdas, cotas_superiores)
+
+    cantidad_de_aulas_permitidas = np.diff(celdas.inicio_de_fila)
+    if not asignación_parcial and np.any(cantidad_de_aulas_permitidas == 0):
+        clase = clases.clases[int(np.argmin(cantidad_de_aulas_permitidas))]
+        raise AsignaciónImposibleException(f'No hay ningún aula permitida para la clase de {clase.materia.nombre}.')
+
+    # Ordenar las celdas de cada fila por costo, y con el mismo costo poner
+    # primero la del aula asignada actualmente
+    anteriores = np.full(len(clases.clases), -1, dtype=np.intp)
+    for i_clase, clase in enumerate(clases.clases):
+        i_aula_anterior = aulas.índice_o_none(clase.aula_asignada)
+        if i_aula_anterior is not None:
+            anteriores[i_clase] = i_aula_anterior
+    no_es_la_anterior = celdas.columnas != anteriores[celdas.filas]
+    orden = np.lexsort((celdas.columnas, no_es_la_anterior, costos, celdas.filas))
+
+    órdenes_de_las_clases = (
+        np.lexsort((clases.fines, clases.inicios)),
+        np.lexsort((clases.inicios, cantidad_de_aulas_permitidas))
+    )
+    if asignación_parcial:
+        celdas_asignadas = min(
+            (_asignar_en_orden(clases, aulas, celdas, orden, orden_de_las_clases, True) for orden_de_las_clases in órdenes_de_las_clases),
+            key=lambda celdas_asignadas: celdas_asignadas.count(-1)
+        )
+    else:
+        for orden_de_las_clases in órdenes_de_las_clases:
+            celdas_asignadas = _asignar_en_orden(clases, aulas, celdas, orden, orden_de_las_clases)
+            if celdas_asignadas is not None:
+                break
+        else:
+            raise AsignaciónImposibleException('La heurística no encontró un aula libre para todas las clases.')
+
+    # Las dos sumas recorren las clases en el mismo orden, así que son
+    # exactamente iguales si cada clase está en su aula de menor costo. Las
+    # clases sin aulas permitidas quedan sin aula en cualquier solución.
+    costos_mínimos = np.full(celdas.forma[0], float(PESO_DE_CLASE_SIN_AULA))
+    np.minimum.at(costos_mínimos, celdas.filas, costos)
+    celdas_asignadas = np.array(celdas_asignadas, dtype=np.intp)
+    con_aula = celdas_asignadas != -1
+    costos_asignados = np.full(celdas.forma[0], float(PESO_DE_CLASE_SIN_AULA))
+    costos_asignados[con_aula] = costos[celdas_asignadas[con_aula]]
+    penalización = float(costos_asignados.sum())
+    cota_inferior = float(costos_mínimos.sum())
+
+    columnas = celdas.columnas.tolist()
+    aulas_asignadas = [None if celda == -1 else columnas[celda] for celda in celdas_asignadas.tolist()]
+    return aulas_asignadas, penalización, cota_inferior
+
+def _asignar_en_orden(
+    clases: ClasesPreprocesadas,
+    aulas: AulasPreprocesadas,
+    celdas: MatrizDeAsignaciones,
+    orden_de_las_celdas: np.ndarray,
+    orden_de_las_clases: Sequence[int],
+    asignación_parcial: bool = False
+) -> list[int]|None:
+    '''
+    Asignar a cada clase, en el orden dado, la primera de sus celdas (en el
+    orden dado) cuya aula está libre en el horario de la clase.
+
+    :param orden_de_las_celdas: Los índices de las celdas, ordenados por fila
+    y luego por preferencia.
+    :param orden_de_las_clases: Los índices de las clases, en el orden en el
+    que se asignan.
+    :param asignación_parcial: Si seguir cuando una clase no tiene ningún
+    aula libre, dejándola sin aula.
+    :return: El índice de la celda asignada a cada clase, o `None` si alguna
+    clase no tiene ningún aula libre. En la asignación parcial, las clases sin
+    aula tienen -1.
+    '''
+    # Aulas que comparten espacio con cada aula: las que componen un aula
+    # doble, y el aula doble de la que es parte cada una
+    relacionadas: dict[int, list[int]] = {}
+    for aula_doble, aulas_hijas in aulas.aulas_dobles.items():
+        relacionadas.setdefault(aula_doble, []).extend(aulas_hijas)
+        for aula_hija in aulas_hijas:
+            relacionadas.setdefault(aula_hija, []).append(aula_doble)
+
+    # Los horarios (inicio, fin) de las clases asignadas a cada aula, en
+    # orden. Cada aula sólo tiene las clases asignadas a ella, así que los
+    # intervalos son disjuntos y, ordenados por inicio y después por fin
+    # (para las clases que duran 0 minutos), los fines también quedan en
+    # orden. Entonces para ver si está libre alcanza con buscar binariamente
+    # el último que empieza antes del fin de la clase (como en
+    # `restricciones.no_asignar_aulas_ocupadas`).
+    horarios_ocupados: list[list[tuple[int, int]]] = [[] for _ in aulas.aulas]
+
+    def libre(i_aula: int, inicio: int, fin: int) -> bool:
+        ocupados = horarios_ocupados[i_aula]
+        último_anterior = bisect_left(ocupados, (fin,)) - 1
+        return último_anterior < 0 or ocupados[último_anterior][1] <= inicio
+
+    inicios, fines = clases.inicios.tolist(), clases.fines.tolist()
+    columnas = celdas.columnas.tolist()
+    lista_de_celdas = orden_de_las_celdas.tolist()
+    celdas_asignadas: list[int] = [-1] * len(clases.clases)
+    for i_clase in np.asarray(orden_de_las_clases).tolist():
+        inicio, fin = inicios[i_clase], fines[i_clase]
+        candidatas = lista_de_celdas[celdas.inicio_de_fila[i_clase]:celdas.inicio_de_fila[i_clase+1]]
+        for celda in candidatas:
+            i_aula = columnas[celda]
+            if libre(i_aula, inicio, fin) and all(libre(otra, inicio, fin) for otra in relacionadas.get(i_aula, ())):
+                break
+        else:
+            if asignación_parcial:
+                continue
+            return None
+
+        celdas_asignadas[i_clase] = celda
+        insort(horarios_ocupados[i_aula], (inicio, fin))
+
+    return celdas_asignadas
@@ -0,0 +1,167 @@
+'''
+En este módulo se define la estructura que guarda las variables de asignación
+del modelo.
+
+Conceptualmente es una matriz donde cada fila representa una clase, cada columna
+representa un aula, y cada celda indica si esa clase está asignada a ese aula.
+Pero en la práctica la mayoría de las combinaciones están prohibidas (por
+equipamiento, horarios de apertura, etc.), así que sólo se guardan las celdas
+permitidas, que son las únicas que tienen variables del modelo. Las demás
+celdas son constantes 0.
+
+Las celdas permitidas se guardan ordenadas por fila y luego por columna (como
+una matriz CSR), junto con índices por fila y por columna que permiten
+recorrerlas sin revisar todas las celdas de la matriz.
+
+Una columna puede representar a un grupo de aulas intercambiables (ver
+`preprocesamiento.aulas_intercambiables`). En ese caso la celda indica que la
+clase está asignada a alguna de las aulas del grupo, y las demás columnas del
+grupo no tienen celdas permitidas.
+'''
+from ortools.sat.python.cp_model import CpModel, CpSolver, IntVar
+from collections.abc import Iterable
+import numpy as np
+
+class MatrizDeAsignaciones:
+    '''
+    Matriz dispersa de variables de asignación, donde las filas son clases y
+    las columnas son aulas.
+    '''
+    def __init__(self, permitidas: np.ndarray, modelo: CpModel|None, aulas_por_columna: np.ndarray|None = None):
+        '''
+        Agrega al modelo una variable booleana por cada celda permitida.
+
+        :param permitidas: Matriz de booleanos donde las filas son clases y las
+        columnas son aulas, con `True` en las combinaciones que pueden ser
+        asignadas.
+        :param modelo: El CpModel al que agregar variables. Si es `None` no se
+        crean variables, y la matriz sólo sirve para recorrer las celdas
+        permitidas (por ejemplo, para calcular sus costos sin un modelo).
+        :param aulas_por_columna: La cantidad de aulas que representa cada
+        columna. Si es `None`, cada columna representa un aula.
+        '''
+        self.forma: tuple[int, int] = permitidas.shape
+
+        # Cantidad de aulas que representa cada columna: 1 para las aulas
+        # comunes, la cantidad de aulas del grupo para los representantes de
+        # grupos de aulas intercambiables.
+        self.aulas_por_columna: np.ndarray = (
+            np.ones(self.forma[1], dtype=np.intp) if aulas_por_columna is None
+            else aulas_por_columna
+        )
+
+        # Fila y columna de cada celda permitida, ordenadas por fila y luego
+        # por columna.
+        self.filas: np.ndarray
+        self.columnas: np.ndarray
+        self.filas, self.columnas = np.nonzero(permitidas)
+
+        # La variable de cada celda permitida, en el mismo orden.
+        self.variables: list[IntVar] = [
+            modelo.new_bool_var(f'clase_{i_clase}_asignada_al_aula_{i_aula}')
+            for i_clase, i_aula in zip(self.filas.tolist(), self.columnas.tolist())
+        ] if modelo is not None else []
+
+        # Las celdas de la fila i están en el rango
+        # `inicio_de_fila[i]:inicio_de_fila[i+1]`.
+        self.inicio_de_fila: np.ndarray = np.zeros(self.forma[0] + 1, dtype=np.intp)
+        np.cumsum(np.bincount(self.filas, minlength=self.forma[0]), out=self.inicio_de_fila[1:])
+
+        # Índices de las celdas ordenados por columna. Las celdas de la columna
+        # a son `orden_por_columna[inicio_de_columna[a]:inicio_de_columna[a+1]]`.
+        self.orden_por_columna: np.ndarray = np.argsort(self.columnas, kind='stable')
+        self.inicio_de_columna: np.ndarray = np.zeros(self.forma[1] + 1, dtype=np.intp)
+        np.cumsum(np.bincount(self.columnas, minlength=self.forma[1]), out=self.inicio_de_columna[1:])
+
+        # Diccionario de (fila, columna) a índice de celda.
+        self._índices: dict[tuple[int, int], int] = {
+            celda: índice
+            for índice, celda in enumerate(zip(self.filas.tolist(), self.columnas.tolist()))
+        }
+
+    def __len__(self) -> int:
+        '''Cantidad de celdas permitidas.'''
+        return len(self.filas)
+
+    def __getitem__(self, celda: tuple[int, int]) -> IntVar|int:
+        '''
+        :param celda: Índices de la clase y del aula.
+        :return: La variable de esa celda, o 0 si la celda está prohibida.
+        '''
+        índice = self._índices.get((int(celda[0]), int(celda[1])))
+        return 0 if índice is None else self.variables[índice]
+
+    def celdas_de_fila(self, fila: int) -> range:
+        ''':return: Los índices de las celdas permitidas en la fila dada.'''
+        return range(self.inicio_de_fila[fila], self.inicio_de_fila[fila+1])
+
+    def celdas_de_columna(self, columna: int) -> np.ndarray:
+        ''':return: Los índices de las celdas permitidas en la columna dada.'''
+        return self.orden_por_columna[self.inicio_de_columna[columna]:self.inicio_de_columna[columna+1]]
+
+    def variables_de_fila(self, fila: int) -> list[IntVar]:
+        ''':return: Las variables de la fila dada.'''
+        return self.variables[self.inicio_de_fila[fila]:self.inicio_de_fila[fila+1]]
+
+    def celdas_de_filas(self, filas: Iterable[int]) -> np.ndarray:
+        ''':return: Los índices de las celdas permitidas en las filas dadas.'''
+        rangos = [self.celdas_de_fila(fila) for fila in filas]
+        if not rangos:
+            return np.zeros(0, dtype=np.intp)
+        return np.concatenate([np.arange(rango.start, rango.stop, dtype=np.intp) for rango in rangos])
+
+    def variables_por_columna(self, filas: Iterable[int]) -> dict[int, list[IntVar]]:
+        '''
+        Agrupa por columna las variables de las filas dadas.
+
+        :param filas: Índices de las filas.
+        :return: Diccionario de índice de columna a las variables de esa
+        columna en las filas dadas, ordenado por columna. Sólo incluye las
+        columnas que tienen alguna variable.
+        '''
+        celdas = self.celdas_de_filas(filas)
+        celdas = celdas[np.argsort(self.columnas[celdas], kind='stable')]
+
+        grupos: dict[int, list[IntVar]] = {}
+        for celda, columna in zip(celdas.tolist(), self.columnas[celdas].tolist()):
+            grupos.setdefault(columna, []).append(self.variables[celda])
+
+        return grupos
+
+    def variables_en(self, filas: slice, columnas: slice|Iterable[int]) -> list[IntVar]:
+        '''
+        :param filas: Rango de índices de filas.
+        :param columnas: Rango o conjunto de índices de columnas.
+        :return: Las variables en la submatriz dada.
+        '''
+        inicio, fin = self.inicio_de_fila[filas.start], self.inicio_de_fila[filas.stop]
+        columnas_de_las_celdas = self.columnas[inicio:fin]
+
+        if isinstance(columnas, slice):
+            en_las_columnas = (columnas.start <= columnas_de_las_celdas) & (columnas_de_las_celdas < columnas.stop)
+        else:
+            en_las_columnas = np.isin(columnas_de_las_celdas, list(columnas))
+
+        return [self.variables[celda] for celda in (np.nonzero(en_las_columnas)[0] + inicio).tolist()]
+
+    def valores(self, solver: CpSolver) -> np.ndarray:
+        '''
+        :param solver: Un solver que ya resolvió el modelo.
+        :return: Matriz densa de enteros con el valor de cada celda.
+        '''
+        valores = np.zeros(self.forma, dtype=int)
+        valores[self.filas, self.columnas] = [solver.value(variable) for variable in self.variables]
+        return valores
+
+    def aulas_asignadas(self, solver: CpSolver) -> list[int]:
+        '''
+        :param solver: Un solver que ya resolvió el modelo.
+        :return: El índice de la columna asignada en cada fila, asumiendo que
+        cada fila tiene exactamente una variable verdadera.
+        '''
+        asignadas = [0] * self.forma[0]
+        for fila, columna, variable in zip(self.filas.tolist(), self.columnas.tolist(), self.variables):
+            if solver.boolean_value(variable):
+                asignadas[fila] = columna
+
+        return asignadas
@@ -0,0 +1,132 @@
+'''
+En este módulo se definen las métricas que se registran durante la asignación,
+para poder encontrar qué parte del proceso es lenta con datos reales sin usar
+un profiler.
+
+Las métricas incluyen el tiempo de cada etapa de la asignación, el tamaño del
+modelo de cada problema, y las estadísticas del solver. Se pueden convertir a
+JSON con `MétricasDeLaAsignación.a_json`.
+'''
+from ortools.sat.python import cp_model
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+import json, time
+
+from asignacion_aulica.gestor_de_datos.días_y_horarios import Día
+
+@contextmanager
+def medir(tiempos: dict[str, float], etapa: str) -> Iterator[None]:
+    '''
+    Medir el tiempo que tarda un bloque de código, y sumarlo al tiempo de la
+    etapa en el diccionario dado.
+
+    :param tiempos: Diccionario de nombre de etapa a segundos.
+    :param etapa: El nombre de la etapa que se está midiendo.
+    '''
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        tiempos[etapa] = tiempos.get(etapa, 0.0) + time.perf_counter() - inicio
+
+@dataclass
+class MétricasDeUnProblema:
+    '''
+    Métricas de la resolución de un problema de asignación.
+    '''
+    # El día del problema.
+    día: Día
+
+    # Cantidad de clases y de aulas del problema.
+    clases: int = 0
+    aulas: int = 0
+
+    # Si la solución se obtuvo del cache, sin construir el modelo.
+    desde_cache: bool = False
+
+    # Segundos que tardó cada etapa de la resolución.
+    tiempos: dict[str, float] = field(default_factory=dict)
+
+    # Cantidad de variables de asignación del modelo, y cantidad de celdas de
+    # la matriz que son constantes 0 porque están prohibidas.
+    variables_de_asignación: int = 0
+    celdas_prohibidas: int = 0
+
+    # Cantidad de aulas que no tienen columna propia en el modelo porque son
+    # intercambiables con otra.
+    aulas_agrupadas: int = 0
+
+    # Cantidad de clases que quedaron sin aula en la asignación parcial.
+    clases_sin_aula: int = 0
+
+    # En la búsqueda en vecindarios, cantidad de ventanas resueltas y cantidad
+    # de ventanas que mejoraron la penalización.
+    ventanas: int = 0
+    ventanas_con_mejora: int = 0
+
+    # Cantidad de grupos (`add_at_most_one`, o sumas acotadas para los grupos
+    # de aulas intercambiables) que agregó cada restricción con variables.
+    restricciones_por_regla: dict[str, int] = field(default_factory=dict)
+
+    # Cantidad de variables auxiliares que agregó cada penalización.
+    variables_por_penalización: dict[str, int] = field(default_factory=dict)
+
+    # Estadísticas del solver. Si se resolvió en varias etapas, se suman las
+    # estadísticas de todas las etapas.
+    status: str = ''
+    branches: int = 0
+    conflictos: int = 0
+    tiempo_determinístico: float = 0.0
+    tiempo_del_solver: float = 0.0
+    gap: float = 0.0
+
+    def sumar_estadísticas_del_solver(self, solver: cp_model.CpSolver):
+        '''
+        Sumar las estadísticas de la última llamada a `solve` del solver.
+        '''
+        respuesta = solver.response_proto
+        self.branches += respuesta.num_branches
+        self.conflictos += respuesta.num_conflicts
+        self.tiempo_determinístico += respuesta.deterministic_time
+        self.tiempo_del_solver += respuesta.wall_time
+
+    def sumar_estadísticas(self, otras: 'MétricasDeUnProblema'):
+        '''
+        Sumar las estadísticas del solver de otro problema (por ejemplo, de
+        una ventana de la búsqueda en vecindarios).
+        '''
+        self.branches += otras.branches
+        self.conflictos += otras.conflictos
+        self.tiempo_determinístico += otras.tiempo_determinístico
+        self.tiempo_del_solver += otras.tiempo_del_solver
+
+@dataclass
+class MétricasDeLaAsignación:
+    '''
+    Métricas de una asignación completa.
+    '''
+    # Segundos que tardó cada etapa de la asignación.
+    tiempos: dict[str, float] = field(default_factory=dict)
+
+    # Las métricas de cada problema resuelto, ordenadas por día.
+    problemas: list[MétricasDeUnProblema] = field(default_factory=list)
+
+    def tiempo_por_día(self) -> dict[Día, float]:
+        '''
+        :return: La suma de los tiempos de resolución de los problemas de cada
+        día que se resolvió.
+        '''
+        tiempos: dict[Día, float] = {}
+        for problema in self.problemas:
+            tiempos[problema.día] = tiempos.get(problema.día, 0.0) + sum(problema.tiempos.values())
+
+        return tiempos
+
+    def a_json(self) -> str:
+        ''':return: Las métricas como un string JSON.'''
+        datos = asdict(self)
+        for problema in datos['problemas']:
+            problema['día'] = problema['día'].name
+        datos['tiempo_por_día'] = {día.name: segundos for día, segundos in self.tiempo_por_día().items()}
+        return json.dumps(datos, ensure_ascii=False)
@@ -1,5 +1,7 @@
 from asignacion_aulica.gestor_de_datos.entidades import Carreras, Clase, Edificios, todas_las_clases
 from asignacion_aulica.gestor_de_datos.días_y_horarios import Día
+from asignacion_aulica.lógica_de_asignación.diagnóstico import ConflictoDeAsignación
+from asignacion_aulica.lógica_de_asignación.métricas import MétricasDeLaAsignación
 
 class InfoPostAsignación:
     '''
@@ -9,10 +11,32 @@ class InfoPostAsignación:
         self,
         edificios: Edificios,
         carreras: Carreras,
-        días_sin_asignar: list[Día]|None = None
+        días_sin_asignar: list[Día]|None = None,
+        días_sin_cambios: list[Día]|None = None,
+        firmas: dict[Día, str]|None = None,
+        gap_de_optimalidad: float = 0.0,
+        cancelada: bool = False,
+        métricas: MétricasDeLaAsignación|None = None,
+        motivos_de_días_sin_asignar: dict[Día, list[str]]|None = None,
+        conflictos: dict[Día, ConflictoDeAsignación]|None = None,
+        clases_sin_asignar: list[Clase]|None = None
     ) -> None:
         '''
         :param días_sin_asignar: Días en los que no se pudo hacer la asignación.
+        :param días_sin_cambios: Días que no se volvieron a resolver porque no
+        cambiaron desde la asignación anterior.
+        :param firmas: Firmas de los días asignados completamente (sin clases
+        sin aula) y en forma óptima.
+        :param gap_de_optimalidad: Diferencia relativa entre la penalización
+        de la asignación y la mejor cota inferior encontrada por el solver.
+        :param cancelada: Si se canceló la asignación antes de terminar.
+        :param métricas: Tiempos y tamaños de las etapas de la asignación.
+        :param motivos_de_días_sin_asignar: Mensajes que explican por qué no se
+        pudo hacer la asignación en cada día sin asignar.
+        :param conflictos: Las clases y aulas que hacen imposible la asignación
+        en cada día sin asignar en el que se diagnosticó.
+        :param clases_sin_asignar: Clases que quedaron sin aula en la
+        asignación parcial.
         :param edificios: Los edificios disponibles.
         :param carreras: Las carreras, con las aulas ya asignadas.
         '''
@@ -21,6 +45,36 @@ class InfoPostAsignación:
         # Días en los que no se pudo hacer la asignación.
         self.días_sin_asignar: list[Día] = días_sin_asignar or []
 
+        # Por qué no se pudo hacer la asignación en cada día sin asignar.
+        self.motivos_de_días_sin_asignar: dict[Día, list[str]] = motivos_de_días_sin_asignar or {}
+
+        # Conjunto chico de clases y aulas que hace imposible la asignación, en
+        # los días sin asignar en los que se diagnosticó (ver `diagnóstico.py`).
+        self.conflictos: dict[Día, ConflictoDeAsignación] = conflictos or {}
+
+        # Clases que quedaron sin aula en la asignación parcial, en los días
+        # que sí se asignaron.
+        self.clases_sin_asignar: list[Clase] = clases_sin_asignar or []
+
+        # Días que se dejaron como estaban porque no cambiaron desde la
+        # asignación anterior.
+        self.días_sin_cambios: list[Día] = días_sin_cambios or []
+
+        # Firma de cada día asignado, para pasarle a la próxima asignación y
+        # que sólo resuelva los días que cambiaron.
+        self.firmas: dict[Día, str] = firmas or {}
+
+        # Qué tan lejos puede estar la asignación de la óptima, relativo a su
+        # penalización. Es 0 si se encontró la asignación óptima.
+        self.gap_de_optimalidad: float = gap_de_optimalidad
+
+        # Si se canceló la asignación. En ese caso los días asignados tienen
+        # la mejor solución encontrada hasta la cancelación.
+        self.cancelada: bool = cancelada
+
+        # Tiempos de cada etapa de la asignación y tamaños de los modelos.
+        self.métricas: MétricasDeLaAsignación = métricas or MétricasDeLaAsignación()
+
         # Clases que tienen más alumnos de los que entran en el aula que tienen
         # asignada.
         self.clases_con_aula_chica: list[Clase] = [
@@ -41,7 +95,9 @@ class InfoPostAsignación:
         :return: `True` si está todo bien y no hay nada que avisarle al usuario.
         '''
         return (
-            len(self.días_sin_asignar) == 0
+            not self.cancelada
+            and len(self.días_sin_asignar) == 0
+            and len(self.clases_sin_asignar) == 0
             and len(self.clases_con_aula_chica) == 0
             and len(self.clases_fuera_de_su_edificio_preferido) == 0
         )
@@ -5,10 +5,17 @@ Las preferencias son valores numéricos que dependen de las variables del modelo
 y que se quieren minimizar o maximizar. En particular este módulo define
 penalizaciones, que son preferencias que se quieren minimizar.
 
-Cada penalización se define en una función que agrega al modelo las variables
-necesarias y devuelve una tupla con: una expresión que representa el valor a
-minimizar, y el valor máximo que puede llegar a tener esa expresión una vez
-resuelto el modelo (excepto si el valor máximo es 0, en cuyo caso devuelve 1).
+Cada penalización se define en una función que devuelve una tupla con: una
+expresión que representa el valor a minimizar, y el valor máximo que puede
+llegar a tener esa expresión una vez resuelto el modelo (excepto si el valor
+máximo es 0, en cuyo caso devuelve 1).
+
+Como cada clase se asigna a exactamente un aula, todas las penalizaciones son
+sumas de los costos de las celdas de la matriz de asignaciones multiplicados
+por sus variables. Cada penalización calcula esos costos con una función de
+costos, y la expresión es una sola suma ponderada con coeficientes enteros,
+sin variables auxiliares ni restricciones. Los costos también se pueden usar
+sin un modelo, con `costos_por_celda`.
 
 Las penalizaciones individuales se suman para formar una penalización total.
 Cada penalización tiene un peso distinto en esa suma, para permitir darle más
@@ -18,8 +25,9 @@ El valor máximo o cota superior se utiliza para normalizar los valores de las
 penalizaciones. Esto hace que las escalas de penalizaciones sean más
 comparables, facilitando la selección de pesos.
 
-La función `obtener_penalizaciones` es la que hay que llamar desde fuera de este
-módulo.
+Las funciones `obtener_penalización` y `obtener_penalizaciones` son las que hay
+que llamar desde fuera de este módulo. La segunda devuelve las penalizaciones
+por separado, para poder optimizarlas de a una en orden de importancia.
 '''
 from ortools.sat.python.cp_model_helper import LinearExpr
 from ortools.sat.python.cp_model import CpModel, IntVar
@@ -27,21 +35,23 @@ from typing import Callable, TypeAlias
 from collections.abc import Sequence
 import numpy as np
 
+from asignacion_aulica.lógica_de_asignación.matriz_de_asignaciones import MatrizDeAsignaciones
 from asignacion_aulica.lógica_de_asignación.preprocesamiento import (
     AulasPreprocesadas, ClasesPreprocesadas
 )
 
 función_de_penalización: TypeAlias = Callable[
-    [ClasesPreprocesadas, AulasPreprocesadas, CpModel, np.ndarray],
+    [ClasesPreprocesadas, AulasPreprocesadas, CpModel, MatrizDeAsignaciones],
     tuple[LinearExpr|int, int]
 ]
 '''
 Las funciones de penalización toman los siguientes argumentos:
 - clases: Los datos de las clases en el problema de asignación.
 - aulas: Los datos de todas las aulas disponibles.
-- modelo: el CpModel al que agregar variables.
-- asignaciones: Matriz con los datos de asignaciones, donde las filas son
-  clases y las columnas son aulas.
+- modelo: el CpModel del problema. Las penalizaciones actuales no le agregan
+  variables.
+- asignaciones: Las variables de asignación, donde las filas son clases y las
+  columnas son aulas. Sólo las celdas permitidas tienen variables.
 
 Y devuelven una expresión que representa el valor de la penalización, y su cota
 superior. La cota superior siempre es mayor a 0.
@@ -58,142 +68,294 @@ def cantidad_de_clases_fuera_del_edificio_preferido(
     clases: ClasesPreprocesadas,
     aulas: AulasPreprocesadas,
     modelo: CpModel,
-    asignaciones: np.ndarray
+    asignaciones: MatrizDeAsignaciones
 ) -> tuple[LinearExpr|int, int]:
     '''Cantidad de clases que no están en el edificio preferido de su carrera.'''
-    #TODO: calcular cantidad de alumnos en vez de cantidad de clases.
-    cantidad_de_clases_fuera_del_edificio_preferido: LinearExpr|int = 0
-    cota_superior: int = 0
-
-    for rango_clases, rango_aulas_preferidas in clases.rangos_de_aulas_preferidas:
-        n_clases = rango_clases.stop - rango_clases.start
-        asignaciones_a_aulas_preferidas = asignaciones[rango_clases, rango_aulas_preferidas]
-        cantidad_de_clases_fuera_del_edificio_preferido += n_clases - asignaciones_a_aulas_preferidas.sum()
-        cota_superior += n_clases
-
-    # Evitamos que la cota superior sea 0 porque luego se usa para dividir
-    if cota_superior == 0:
-        cota_superior = 1
-
-    return cantidad_de_clases_fuera_del_edificio_preferido, cota_superior
+    return _suma_ponderada(asignaciones, *costos_fuera_del_edificio_preferido(clases, aulas, asignaciones))
 
 def cantidad_de_alumnos_que_no_entran_en_el_aula(
     clases: ClasesPreprocesadas,
     aulas: AulasPreprocesadas,
     modelo: CpModel,
-    asignaciones: np.ndarray
+    asignaciones: MatrizDeAsignaciones
 ) -> tuple[LinearExpr|int, int]:
     '''
     La cantidad de alumnos que exceden la capacidad del aula asignada a su clase.
     '''
-    mínima_capacidad = min(aula.capacidad for aula in aulas.aulas)
+    return _suma_ponderada(asignaciones, *costos_de_alumnos_que_no_entran_en_el_aula(clases, aulas, asignaciones))
 
-    cantidad_de_alumnos_que_no_entran_en_el_aula: LinearExpr|int = 0
-    cota_superior_total = 0
-
-    for i_clase, clase in enumerate(clases.clases):
-        máximo_exceso_de_capacidad: LinearExpr|int = max(0, clase.cantidad_de_alumnos - mínima_capacidad)
-        exceso_de_capacidad_en_esta_clase = modelo.new_int_var(0, máximo_exceso_de_capacidad, f"exceso_de_capacidad_de_clase{i_clase}")
-        cota_superior_en_esta_clase = 0
+def capacidad_sobrante(
+    clases: ClasesPreprocesadas,
+    aulas: AulasPreprocesadas,
+    modelo: CpModel,
+    asignaciones: MatrizDeAsignaciones
+) -> tuple[LinearExpr|int, int]:
+    '''
+    Suma de la cantidad de asientos que sobran en el aula asignada a cada clase.
+    '''
+    return _suma_ponderada(asignaciones, *costos_de_capacidad_sobrante(clases, aulas, asignaciones))
 
-        for i_aula, aula in enumerate(aulas.aulas):
-            asignada_a_este_aula = asignaciones[i_clase, i_aula]
+def cantidad_de_alumnos_en_edificios_no_deseables(
+    clases: ClasesPreprocesadas,
+    aulas: AulasPreprocesadas,
+    modelo: CpModel,
+    asignaciones: MatrizDeAsignaciones
+) -> tuple[LinearExpr|int, int]:
+    '''Cantidad de alumnos que cursan en edificios que se prefiere no usar.'''
+    return _suma_ponderada(asignaciones, *costos_en_edificios_no_deseables(clases, aulas, asignaciones))
 
-            # Esta lógica asume que no va a haber asignaciones en 1 nunca;
-            # que van a ser 0 (asignaciones prohibidas) o variables del modelo
-            if isinstance(asignada_a_este_aula, IntVar):
-                exceso_si_se_asigna_a_este_aula = max(0, clase.cantidad_de_alumnos - aula.capacidad)
-                modelo.add(exceso_de_capacidad_en_esta_clase == exceso_si_se_asigna_a_este_aula).only_enforce_if(asignada_a_este_aula)
+def costos_fuera_del_edificio_preferido(
+    clases: ClasesPreprocesadas,
+    aulas: AulasPreprocesadas,
+    asignaciones: MatrizDeAsignaciones
+) -> tuple[np.ndarray, int]:
+    '''
+    Costos de `cantidad_de_clases_fuera_del_edificio_preferido`: 1 en las
+    celdas de las clases que tienen edificio preferido y cuya aula está fuera
+    de ese edificio.
+    '''
+    #TODO: calcular cantidad de alumnos en vez de cantidad de clases.
+    costos = np.zeros(len(asignaciones), dtype=np.int64)
+    cota_superior: int = 0
 
-                cota_superior_en_esta_clase = max(cota_superior_en_esta_clase, exceso_si_se_asigna_a_este_aula)
+    for rango_clases, rango_aulas_preferidas in clases.rangos_de_aulas_preferidas:
+        inicio, fin = asignaciones.inicio_de_fila[rango_clases.start], asignaciones.inicio_de_fila[rango_clases.stop]
+        columnas = asignaciones.columnas[inicio:fin]
+        costos[inicio:fin] = (columnas < rango_aulas_preferidas.start) | (rango_aulas_preferidas.stop <= columnas)
+        cota_superior += rango_clases.stop - rango_clases.start
 
-        cantidad_de_alumnos_que_no_entran_en_el_aula += exceso_de_capacidad_en_esta_clase
-        cota_superior_total += cota_superior_en_esta_clase
+    return costos, cota_superior
 
-    # Evitamos que la cota superior sea 0 porque luego se usa para dividir
-    if cota_superior_total == 0:
-        cota_superior_total = 1
+def costos_de_alumnos_que_no_entran_en_el_aula(
+    clases: ClasesPreprocesadas,
+    aulas: AulasPreprocesadas,
+    asignaciones: MatrizDeAsignaciones
+) -> tuple[np.ndarray, int]:
+    '''
+    Costos de `cantidad_de_alumnos_que_no_entran_en_el_aula`: la cantidad de
+    alumnos que exceden la capacidad del aula de cada celda.
+    '''
+    costos = np.maximum(0, clases.alumnos[asignaciones.filas] - aulas.capacidades[asignaciones.columnas])
+    return costos, _suma_de_los_máximos_por_fila(asignaciones, costos)
 
-    return cantidad_de_alumnos_que_no_entran_en_el_aula, cota_superior_total
+def costos_de_capacidad_sobrante(
+    clases: ClasesPreprocesadas,
+    aulas: AulasPreprocesadas,
+    asignaciones: MatrizDeAsignaciones
+) -> tuple[np.ndarray, int]:
+    '''
+    Costos de `capacidad_sobrante`: la cantidad de asientos que sobran en el
+    aula de cada celda.
+    '''
+    costos = np.maximum(0, aulas.capacidades[asignaciones.columnas] - clases.alumnos[asignaciones.filas])
+    return costos, _suma_de_los_máximos_por_fila(asignaciones, costos)
 
-def capacidad_sobrante(
+def costos_en_edificios_no_deseables(
     clases: ClasesPreprocesadas,
     aulas: AulasPreprocesadas,
-    modelo: CpModel,
-    asignaciones: np.ndarray
+    asignaciones: MatrizDeAsignaciones
+) -> tuple[np.ndarray, int]:
+    '''
+    Costos de `cantidad_de_alumnos_en_edificios_no_deseables`: la cantidad de
+    alumnos de la clase en las celdas cuya aula está en un edificio que se
+    prefiere no usar.
+    '''
+    es_no_deseable = np.zeros(len(aulas.aulas), dtype=bool)
+    es_no_deseable[aulas.preferir_no_usar] = True
+
+    costos = np.where(es_no_deseable[asignaciones.columnas], clases.alumnos[asignaciones.filas], 0)
+    return costos, _suma_de_los_máximos_por_fila(asignaciones, costos)
+
+def _suma_de_los_máximos_por_fila(asignaciones: MatrizDeAsignaciones, costos: np.ndarray) -> int:
+    '''
+    :return: La suma del costo máximo de cada fila, que es el valor máximo que
+    puede tener la penalización porque cada clase se asigna a una sola aula.
+    '''
+    máximos = np.zeros(asignaciones.forma[0], dtype=np.int64)
+    np.maximum.at(máximos, asignaciones.filas, costos)
+    return int(máximos.sum())
+
+def _suma_ponderada(
+    asignaciones: MatrizDeAsignaciones,
+    costos: np.ndarray,
+    cota_superior: int
 ) -> tuple[LinearExpr|int, int]:
     '''
-    Suma de la cantidad de asientos que sobran en el aula asignada a cada clase.
+    Construir la expresión de una penalización a partir del costo de cada
+    celda, sin variables auxiliares.
+
+    Como cada clase se asigna a exactamente un aula, la penalización de una
+    clase es la suma de los costos de sus celdas multiplicados por sus
+    variables. Sólo se incluyen las celdas con costo distinto de 0.
+
+    :param asignaciones: Las variables de asignación.
+    :param costos: El costo entero de cada celda permitida.
+    :param cota_superior: El valor máximo de la penalización.
+    :return: La expresión de la penalización y su cota superior, que es 1 si
+    la cota dada es 0.
     '''
-    máxima_capacidad = max(aula.capacidad for aula in aulas.aulas)
+    # Evitamos que la cota superior sea 0 porque luego se usa para dividir
+    cota_superior = max(1, cota_superior)
 
-    capacidad_sobrante_total: LinearExpr|int = 0
-    cota_superior_total: int = 0
+    celdas = np.flatnonzero(costos)
+    if len(celdas) == 0:
+        return 0, cota_superior
 
-    for i_clase, clase in enumerate(clases.clases):
-        máxima_capacidad_sobrante = max(0, máxima_capacidad - clase.cantidad_de_alumnos)
-        capacidad_sobrante_en_esta_clase = modelo.new_int_var(0, máxima_capacidad_sobrante, f"capacidad_sobrante_clase_{i_clase}")
-        cota_superior_en_esta_clase = 0
+    penalización = LinearExpr.weighted_sum(
+        [asignaciones.variables[celda] for celda in celdas.tolist()],
+        costos[celdas].tolist()
+    )
+    return penalización, cota_superior
 
-        for i_aula, aula in enumerate(aulas.aulas):
-            asignada_a_este_aula = asignaciones[i_clase, i_aula]
+todas_las_penalizaciones: Sequence[tuple[int, función_de_penalización]] = (
+    (1000, cantidad_de_alumnos_que_no_entran_en_el_aula),
+    (100,  cantidad_de_clases_fuera_del_edificio_preferido),
+    (10,   cantidad_de_alumnos_en_edificios_no_deseables),
+    (1,    capacidad_sobrante)
+)
 
-            # Esta lógica asume que no va a haber asignaciones en 1 nunca;
-            # que van a ser 0 (asignaciones prohibidas) o variables del modelo
-            if isinstance(asignada_a_este_aula, IntVar):
-                sobrante_si_se_asigna_a_este_aula = max(0, aula.capacidad - clase.cantidad_de_alumnos)
-                modelo.add(capacidad_sobrante_en_esta_clase == sobrante_si_se_asigna_a_este_aula).only_enforce_if(asignada_a_este_aula)
+función_de_costos: TypeAlias = Callable[
+    [ClasesPreprocesadas, AulasPreprocesadas, MatrizDeAsignaciones],
+    tuple[np.ndarray, int]
+]
+'''
+Las funciones de costos toman los mismos argumentos que las de penalización,
+excepto el modelo, y devuelven el costo entero de cada celda permitida de la
+matriz de asignaciones (en el mismo orden que sus variables) y la cota superior
+de la penalización.
+'''
 
-                cota_superior_en_esta_clase = max(cota_superior_en_esta_clase, sobrante_si_se_asigna_a_este_aula)
+costos_de_cada_penalización: dict[función_de_penalización, función_de_costos] = {
+    cantidad_de_alumnos_que_no_entran_en_el_aula: costos_de_alumnos_que_no_entran_en_el_aula,
+    cantidad_de_clases_fuera_del_edificio_preferido: costos_fuera_del_edificio_preferido,
+    cantidad_de_alumnos_en_edificios_no_deseables: costos_en_edificios_no_deseables,
+    capacidad_sobrante: costos_de_capacidad_sobrante
+}
+'''La función de costos con la que se construye cada penalización.'''
 
-        capacidad_sobrante_total += capacidad_sobrante_en_esta_clase
-        cota_superior_total += cota_superior_en_esta_clase
+def costos_por_celda(
+    clases: ClasesPreprocesadas,
+    aulas: AulasPreprocesadas,
+    asignaciones: MatrizDeAsignaciones,
+    cotas_superiores: Sequence[int]|None = None
+) -> np.ndarray:
+    '''
+    Calcula cuánto aporta a la penalización total asignar la clase de cada
+    celda al aula de esa celda, sin usar un modelo.
 
-    # Evitamos que la cota superior sea 0 porque luego se usa para dividir
-    if cota_superior_total == 0:
-        cota_superior_total = 1
+    :param clases: Los datos de las clases en el problema de asignación.
+    :param aulas: Los datos de todas las aulas disponibles.
+    :param asignaciones: La matriz de asignaciones, de la que se usan las
+    celdas permitidas.
+    :param cotas_superiores: Si se pasan, las cotas superiores con las que se
+    normaliza cada penalización, en vez de las de este problema (ver
+    `obtener_penalizaciones`).
+
+    :return: Array con el costo de cada celda permitida, en el mismo orden que
+    las variables de `asignaciones`. Es la suma de los costos de cada
+    penalización multiplicados por su peso normalizado, igual que en
+    `obtener_penalización`.
+    '''
+    costos_totales = np.zeros(len(asignaciones), dtype=float)
+    for i, (peso, función) in enumerate(todas_las_penalizaciones):
+        costos, cota_superior = costos_de_cada_penalización[función](clases, aulas, asignaciones)
+        if cotas_superiores is not None:
+            cota_superior = cotas_superiores[i]
+        costos_totales += (peso / max(1, cota_superior)) * costos
 
-    return capacidad_sobrante_total, cota_superior_total
+    return costos_totales
 
-def cantidad_de_alumnos_en_edificios_no_deseables(
+def obtener_cotas_superiores(
+    clases: ClasesPreprocesadas,
+    aulas: AulasPreprocesadas,
+    asignaciones: MatrizDeAsignaciones
+) -> list[int]:
+    '''
+    Calcula la cota superior de cada penalización sin usar un modelo.
+
+    :param clases: Los datos de las clases en el problema de asignación.
+    :param aulas: Los datos de todas las aulas disponibles.
+    :param asignaciones: La matriz de asignaciones, de la que se usan las
+    celdas permitidas.
+
+    :return: La cota superior de cada penalización, en el mismo orden que
+    `todas_las_penalizaciones`. Siempre son mayores a 0.
+    '''
+    return [
+        int(max(1, costos_de_cada_penalización[función](clases, aulas, asignaciones)[1]))
+        for _, función in todas_las_penalizaciones
+    ]
+
+def obtener_penalizaciones(
     clases: ClasesPreprocesadas,
     aulas: AulasPreprocesadas,
     modelo: CpModel,
-    asignaciones: np.ndarray
-) -> tuple[LinearExpr|int, int]:
-    '''Cantidad de alumnos que cursan en edificios que se prefiere no usar.'''
-    cantidad_de_alumnos_en_edificios_no_deseables = 0
-    cota_superior = 0
+    asignaciones: MatrizDeAsignaciones,
+    variables_por_penalización: dict[str, int]|None = None,
+    cotas_superiores: Sequence[int]|None = None
+) -> list[tuple[float, LinearExpr|int]]:
+    '''
+    Calcula cada una de las penalizaciones por separado, en el mismo orden que
+    `todas_las_penalizaciones` (de la más importante a la menos importante).
 
-    for i_clase, clase in enumerate(clases.clases):
-        # Esta lógica asume que no va a haber asignaciones en 1 nunca;
-        # que van a ser 0 (asignaciones prohibidas) o variables del modelo.
-        asignaciones_a_edificios_no_deseables = asignaciones[i_clase, aulas.preferir_no_usar]
-        puede_estar_en_edificio_no_deseable = any(map(lambda x: isinstance(x, IntVar), asignaciones_a_edificios_no_deseables))
+    Las expresiones de las penalizaciones tienen valores enteros.
 
-        if puede_estar_en_edificio_no_deseable:
-            está_en_edificio_no_deseable = sum(asignaciones_a_edificios_no_deseables)
-            cantidad_de_alumnos_en_edificios_no_deseables += clase.cantidad_de_alumnos * está_en_edificio_no_deseable
-            cota_superior += clase.cantidad_de_alumnos
+    :param clases: Los datos de las clases en el problema de asignación.
+    :param aulas: Los datos de todas las aulas disponibles.
+    :param modelo: el CpModel al que agregar variables.
+    :param asignaciones: Las variables de asignación, donde las filas son
+    clases y las columnas son aulas.
+    :param variables_por_penalización: Si se pasa un diccionario, se completa
+    con la cantidad de variables auxiliares que agrega al modelo cada
+    penalización, con el nombre de su función como clave.
+    :param cotas_superiores: Si se pasan, las cotas superiores con las que se
+    normaliza cada penalización, en vez de las de este problema. Sirve para
+    que un problema que es parte de otro más grande (como una ventana de la
+    búsqueda en vecindarios) tenga la misma penalización que en el problema
+    completo. Se obtienen con `obtener_cotas_superiores`.
+
+    :return: Lista de tuplas (peso normalizado, expresión de la penalización),
+    donde el peso normalizado es el peso de la penalización dividido por su
+    cota superior.
+    '''
+    penalizaciones: list[tuple[float, LinearExpr|int]] = []
+    for i, (peso, función) in enumerate(todas_las_penalizaciones):
+        variables_antes = len(modelo.proto.variables)
+        penalización, cota_superior = función(clases, aulas, modelo, asignaciones)
+        if cotas_superiores is not None:
+            cota_superior = cotas_superiores[i]
+        penalizaciones.append((peso / cota_superior, penalización))
 
-    # Evitamos que la cota superior sea 0 porque luego se usa para dividir
-    if cota_superior == 0:
-        cota_superior = 1
+        if variables_por_penalización is not None:
+            variables_por_penalización[función.__name__] = len(modelo.proto.variables) - variables_antes
 
-    return cantidad_de_alumnos_en_edificios_no_deseables, cota_superior
+    return penalizaciones
 
-todas_las_penalizaciones: Sequence[tuple[int, función_de_penalización]] = (
-    (1000, cantidad_de_alumnos_que_no_entran_en_el_aula),
-    (100,  cantidad_de_clases_fuera_del_edificio_preferido),
-    (10,   cantidad_de_alumnos_en_edificios_no_deseables),
-    (1,    capacidad_sobrante)
-)
+PESO_DE_CLASE_SIN_AULA: int = 1 + sum(peso for peso, _ in todas_las_penalizaciones)
+'''
+Peso de cada clase que queda sin aula en la asignación parcial. Como cada
+penalización normalizada vale a lo sumo su peso, dejar una clase sin aula
+cuesta más que todas las demás penalizaciones juntas.
+'''
+
+def penalización_de_clases_sin_aula(sin_aula: Sequence[IntVar]) -> tuple[float, LinearExpr|int]:
+    '''
+    Penalización para la asignación parcial, donde cada clase puede quedar sin
+    aula. No se normaliza con su cota superior, así que minimizarla tiene
+    prioridad sobre todas las demás penalizaciones: sólo se deja una clase sin
+    aula si no hay forma de asignarle una.
+
+    :param sin_aula: Las variables que indican si cada clase quedó sin aula.
+    :return: Tupla (peso, expresión de la penalización), para agregar antes de
+    las que devuelve `obtener_penalizaciones`.
+    '''
+    return float(PESO_DE_CLASE_SIN_AULA), LinearExpr.sum(sin_aula) if sin_aula else 0
 
 def obtener_penalización(
     clases: ClasesPreprocesadas,
     aulas: AulasPreprocesadas,
     modelo: CpModel,
-    asignaciones: np.ndarray
+    asignaciones: MatrizDeAsignaciones
 ) -> LinearExpr|float:
     '''
     Calcula la suma de todas las penalizaciones, ponderada con sus pesos y sus
@@ -202,15 +364,21 @@ def obtener_penalización(
     :param clases: Los datos de las clases en el problema de asignación.
     :param aulas: Los datos de todas las aulas disponibles.
     :param modelo: el CpModel al que agregar variables.
-    :param asignaciones: Matriz con los datos de asignaciones, donde las filas
-    son clases y las columnas son aulas.
+    :param asignaciones: Las variables de asignación, donde las filas son
+    clases y las columnas son aulas.
 
     :return: La expresión de penalización total.
     '''
+    return sumar_penalizaciones(obtener_penalizaciones(clases, aulas, modelo, asignaciones))
+
+def sumar_penalizaciones(penalizaciones: Sequence[tuple[float, LinearExpr|int]]) -> LinearExpr|float:
+    '''
+    :param penalizaciones: Tuplas (peso normalizado, penalización), como las
+    que devuelve `obtener_penalizaciones`.
+    :return: La suma de las penalizaciones multiplicadas por sus pesos.
+    '''
     penalización_total = 0.0
-    for peso, función in todas_las_penalizaciones:
-        penalización, cota_superior = función(clases, aulas, modelo, asignaciones)
-        penalización_total += (peso / cota_superior) * penalización
+    for peso_normalizado, penalización in penalizaciones:
+        penalización_total += peso_normalizado * penalización
     
     return penalización_total
-
@@ -1,11 +1,17 @@
 from dataclasses import dataclass, field
+from collections.abc import Iterable, Sequence
+from functools import cached_property
+from bisect import bisect_left
 from typing import TypeAlias
-import itertools
+import itertools, heapq, hashlib
+import numpy as np
 
 from asignacion_aulica.gestor_de_datos.días_y_horarios import (
     HorariosSemanales,
     RangoHorario,
-    Día
+    Día,
+    time_to_minutos,
+    time_to_string_horario
 )
 from asignacion_aulica.gestor_de_datos.entidades import (
     Edificios,
@@ -52,6 +58,15 @@ class AulasPreprocesadas:
         # la componen.
         self.aulas_dobles: dict[int, tuple[int, int]] = {}
 
+        # Diccionario de nombre de equipamiento a índice de bit, con todos los
+        # equipamientos que tiene alguna de las aulas.
+        self.vocabulario_de_equipamiento: dict[str, int] = {}
+
+        # Diccionario de `id` del aula original a su índice. Las aulas se
+        # buscan por identidad, porque comparar por igualdad compara todos los
+        # campos (incluyendo los horarios y el edificio).
+        self._índices_por_id: dict[int, int] = {}
+
         # Popular las variables con los datos de las aulas:
         for edificio in edificios:
             inicio_rango = len(self.aulas)
@@ -62,13 +77,8 @@ class AulasPreprocesadas:
             if edificio.preferir_no_usar:
                 self.preferir_no_usar.extend(range(inicio_rango, fin_rango))
 
-            for aula_doble in edificio.aulas_dobles:
-                i_aula_grande = inicio_rango + edificio.aulas.index(aula_doble.aula_grande)
-                i_aula_chica_1 = inicio_rango + edificio.aulas.index(aula_doble.aula_chica_1)
-                i_aula_chica_2 = inicio_rango + edificio.aulas.index(aula_doble.aula_chica_2)
-                self.aulas_dobles[i_aula_grande] = (i_aula_chica_1, i_aula_chica_2)
-
             for aula in edificio.aulas:
+                self._índices_por_id[id(aula)] = len(self.aulas)
                 self.aulas.append(AulaPreprocesada(
                     nombre=aula.nombre,
                     edificio=edificio,
@@ -81,6 +91,83 @@ class AulasPreprocesadas:
                     ))
                 ))
 
+            for aula_doble in edificio.aulas_dobles:
+                i_aula_grande = self.índice(aula_doble.aula_grande)
+                i_aula_chica_1 = self.índice(aula_doble.aula_chica_1)
+                i_aula_chica_2 = self.índice(aula_doble.aula_chica_2)
+                self.aulas_dobles[i_aula_grande] = (i_aula_chica_1, i_aula_chica_2)
+
+        # Capacidad de cada aula.
+        self.capacidades: np.ndarray = np.array([aula.capacidad for aula in self.aulas], dtype=np.int64)
+
+        # Horarios de cada aula en cada día, en minutos desde las 00:00. Las
+        # filas son aulas y las columnas son días.
+        forma = (len(self.aulas), len(Día))
+        self.apertura: np.ndarray = np.zeros(shape=forma, dtype=np.int16)
+        self.cierre: np.ndarray = np.zeros(shape=forma, dtype=np.int16)
+        self.cerrada: np.ndarray = np.zeros(shape=forma, dtype=bool)
+        for i_aula, aula in enumerate(self.aulas):
+            for día, horario in zip(Día, aula.horarios):
+                self.apertura[i_aula, día] = time_to_minutos(horario.inicio)
+                self.cierre[i_aula, día] = time_to_minutos(horario.fin)
+                self.cerrada[i_aula, día] = horario.cerrado
+
+        # Equipamiento de cada aula, como un conjunto de bits. Las filas son
+        # aulas y las columnas son palabras de 64 bits.
+        for aula in self.aulas:
+            for equipamiento in sorted(aula.equipamiento):
+                self.vocabulario_de_equipamiento.setdefault(equipamiento, len(self.vocabulario_de_equipamiento))
+        self.equipamiento: np.ndarray = self.codificar_equipamiento(aula.equipamiento for aula in self.aulas)
+
+    def índice(self, aula: Aula) -> int:
+        '''
+        :param aula: Un aula de alguno de los edificios.
+        :return: El índice del aula.
+        :raise ValueError: Si el aula no está en ninguno de los edificios.
+        '''
+        i_aula = self._índices_por_id.get(id(aula))
+        if i_aula is None:
+            raise ValueError(f'El aula {aula.nombre} no está en ninguno de los edificios.')
+        return i_aula
+
+    def índice_o_none(self, aula: Aula|None) -> int|None:
+        '''
+        :param aula: Un aula, o `None`.
+        :return: El índice del aula, o `None` si no está en ninguno de los
+        edificios.
+        '''
+        return self._índices_por_id.get(id(aula))
+
+    def codificar_equipamiento(self, equipamientos: Iterable[set[str]]) -> np.ndarray:
+        '''
+        Codificar conjuntos de equipamientos como conjuntos de bits, según el
+        vocabulario de equipamiento de las aulas.
+
+        Los equipamientos que no tiene ningún aula se codifican con un bit extra
+        que nunca está presente en las aulas.
+
+        :param equipamientos: Un conjunto de equipamientos para cada fila.
+        :return: Matriz donde las filas corresponden a los conjuntos de
+        equipamientos, y las columnas son palabras de 64 bits.
+        '''
+        bit_desconocido = len(self.vocabulario_de_equipamiento)
+        n_palabras = bit_desconocido // 64 + 1
+
+        filas: list[list[int]] = []
+        for conjunto in equipamientos:
+            bits = 0
+            for equipamiento in conjunto:
+                bits |= 1 << self.vocabulario_de_equipamiento.get(equipamiento, bit_desconocido)
+            filas.append([(bits >> (64 * palabra)) & 0xFFFF_FFFF_FFFF_FFFF for palabra in range(n_palabras)])
+
+        return np.array(filas, dtype=np.uint64).reshape(len(filas), n_palabras)
+
+DTYPE_HORARIOS: np.dtype = np.dtype([('día', np.uint8), ('inicio', np.int16), ('fin', np.int16)])
+'''
+Tipo de los elementos de `ClasesPreprocesadas.horarios`. Los minutos se guardan
+con signo para poder restarlos sin desbordar.
+'''
+
 @dataclass
 class ClasesPreprocesadas:
     '''
@@ -93,8 +180,8 @@ class ClasesPreprocesadas:
     
     Cada instancia de `ClasesPreprocesadas` contiene clases de un solo día de la
     semana (porque esa es la forma más fácil de separar las clases en problemas
-    independientes). Sería posible sub-dividir cada día en más de una instancia
-    de `ClasesPreprocesadas`, pero por el momento eso no se está haciendo.
+    independientes). Cada día se puede sub-dividir en más instancias de
+    `ClasesPreprocesadas` con `separar_en_problemas_independientes`.
     '''
     # Un conjunto de clases que han de ser asignadas. Las clases en este
     # conjunto son presenciales y no tienen asignación manual.
@@ -109,6 +196,70 @@ class ClasesPreprocesadas:
     # asignación manual.
     aulas_ocupadas: list[tuple[int, RangoHorario]] = field(default_factory=list)
 
+    @cached_property
+    def pares_que_se_superponen(self) -> list[tuple[int, int]]:
+        '''
+        Pares de índices de clases cuyos horarios se superponen.
+
+        Se calcula la primera vez que se usa y se comparte entre todas las
+        restricciones que lo necesitan, así que no hay que modificar `clases`
+        después de eso.
+        '''
+        return pares_de_clases_que_se_superponen(self.días, self.inicios, self.fines)
+
+    @cached_property
+    def cliques_de_superposición(self) -> list[list[int]]:
+        '''
+        Conjuntos maximales de clases que se superponen todas entre sí.
+
+        Igual que `pares_que_se_superponen`, se calcula una sola vez.
+        '''
+        return cliques_de_clases_que_se_superponen(self.días, self.inicios, self.fines)
+
+    @cached_property
+    def horarios(self) -> np.ndarray:
+        '''
+        El día y el horario de cada clase, como un array estructurado con los
+        campos `día`, `inicio` y `fin`. Los horarios están en minutos desde las
+        00:00.
+
+        Todas las reglas de la asignación comparan horarios con estos enteros
+        en vez de comparar objetos `time`. Se calcula una sola vez.
+        '''
+        return np.array(
+            [
+                (clase.día, time_to_minutos(clase.horario.inicio), time_to_minutos(clase.horario.fin))
+                for clase in self.clases
+            ],
+            dtype=DTYPE_HORARIOS
+        )
+
+    @cached_property
+    def días(self) -> np.ndarray:
+        '''El día de cada clase. Se calcula una sola vez.'''
+        return self.horarios['día'].astype(np.intp)
+
+    @cached_property
+    def inicios(self) -> np.ndarray:
+        '''
+        El horario de inicio de cada clase, en minutos desde las 00:00. Se
+        calcula una sola vez.
+        '''
+        return np.ascontiguousarray(self.horarios['inicio'])
+
+    @cached_property
+    def fines(self) -> np.ndarray:
+        '''
+        El horario de fin de cada clase, en minutos desde las 00:00. Se calcula
+        una sola vez.
+        '''
+        return np.ascontiguousarray(self.horarios['fin'])
+
+    @cached_property
+    def alumnos(self) -> np.ndarray:
+        '''La cantidad de alumnos de cada clase. Se calcula una sola vez.'''
+        return np.array([clase.cantidad_de_alumnos for clase in self.clases], dtype=np.int64)
+
 ClasesPreprocesadasPorDía: TypeAlias = tuple[
     ClasesPreprocesadas, ClasesPreprocesadas, ClasesPreprocesadas,
     ClasesPreprocesadas, ClasesPreprocesadas, ClasesPreprocesadas,
@@ -150,9 +301,7 @@ def preprocesar_clases(
                 continue
             elif clase.no_cambiar_asignación:
                 if clase.aula_asignada:
-                    edificio = clase.aula_asignada.edificio
-                    rango_del_edificio: slice = aulas.rangos_de_aulas[edificio.nombre]
-                    i_aula: int = rango_del_edificio.start + edificio.aulas.index(clase.aula_asignada)
+                    i_aula: int = aulas.índice(clase.aula_asignada)
                     clases_preprocesadas[clase.día].aulas_ocupadas.append(
                         (i_aula, clase.horario)
                     )
@@ -170,3 +319,477 @@ def preprocesar_clases(
                     clases_preprocesadas[día].rangos_de_aulas_preferidas.append((rango_de_clases, rango_de_aulas))
 
     return clases_preprocesadas
+
+def firma_del_problema(
+    clases: ClasesPreprocesadas,
+    aulas: AulasPreprocesadas,
+    día: Día,
+    incluir_aulas_asignadas: bool = True,
+    datos_adicionales: object = None
+) -> str:
+    '''
+    Calcular una firma que identifica el contenido de un problema de
+    asignación de un día.
+
+    La firma depende de todos los datos que usa la asignación para ese día: el
+    horario, alumnos, equipamiento y aula asignada de cada clase; los
+    edificios preferidos; las aulas ocupadas por asignaciones manuales; y la
+    capacidad, equipamiento y horario de ese día de cada aula, las aulas
+    dobles, y los edificios que se prefiere no usar.
+
+    Si la firma de un día no cambió desde la última asignación, volver a
+    resolverlo daría el mismo resultado que ya tienen asignado las clases.
+
+    La firma es estable entre ejecuciones del programa, así que se puede
+    guardar en disco.
+
+    :param clases: Los datos de las clases del día.
+    :param aulas: Los datos de las aulas disponibles.
+    :param día: El día de las clases.
+    :param incluir_aulas_asignadas: Si la firma depende del aula que tiene
+    asignada cada clase. Para identificar los datos de entrada de un problema,
+    sin importar su resultado, hay que pasar `False`.
+    :param datos_adicionales: Otros datos que tienen que formar parte de la
+    firma. Su `repr` tiene que ser estable.
+    :return: La firma, como un string hexadecimal.
+    '''
+    contenido = (
+        día.value,
+        [
+            (aula.capacidad, sorted(aula.equipamiento), aula.horarios[día])
+            for aula in aulas.aulas
+        ],
+        sorted(aulas.aulas_dobles.items()),
+        aulas.preferir_no_usar,
+        sorted(aulas.rangos_de_aulas.items()),
+        [
+            (
+                clase.horario,
+                clase.cantidad_de_alumnos,
+                sorted(clase.equipamiento_necesario),
+                aulas.índice_o_none(clase.aula_asignada) if incluir_aulas_asignadas else None
+            )
+            for clase in clases.clases
+        ],
+        clases.rangos_de_aulas_preferidas,
+        clases.aulas_ocupadas,
+        datos_adicionales
+    )
+
+    return hashlib.sha256(repr(contenido).encode()).hexdigest()
+
+def separar_en_problemas_independientes(
+    clases: ClasesPreprocesadas,
+    aulas: AulasPreprocesadas,
+    aulas_permitidas: np.ndarray
+) -> list[ClasesPreprocesadas]:
+    '''
+    Separar un problema de asignación en sub-problemas independientes entre sí.
+
+    Dos clases están en conflicto si sus horarios se superponen y si hay algún
+    aula a la que se podrían asignar ambas (contando un aula doble y sus aulas
+    hijas como si fueran el mismo aula). Cada componente conexa del grafo de
+    conflictos es un sub-problema, porque la asignación de sus clases no
+    restringe a las clases de las otras componentes.
+
+    :param clases: Los datos de las clases del problema de asignación.
+    :param aulas: Los datos de las aulas disponibles.
+    :param aulas_permitidas: Matriz de booleanos donde las filas son clases y
+    las columnas son aulas, que indica qué combinaciones no están prohibidas.
+
+    :return: Los sub-problemas, ordenados según la primera de sus clases. Las
+    clases dentro de cada sub-problema mantienen el orden original.
+    '''
+    return [
+        subconjunto_de_clases(clases, componente)
+        for componente in componentes_independientes(clases, aulas, aulas_permitidas)
+    ]
+
+def componentes_independientes(
+    clases: ClasesPreprocesadas,
+    aulas: AulasPreprocesadas,
+    aulas_permitidas: np.ndarray
+) -> list[list[int]]:
+    '''
+    Calcular las clases de cada sub-problema independiente (ver
+    `separar_en_problemas_independientes`).
+
+    Las filas de `aulas_permitidas` sólo dependen de cada clase y de las aulas
+    ocupadas del día, así que la matriz de cada sub-problema son las filas de
+    sus clases.
+
+    :param clases: Los datos de las clases del problema de asignación.
+    :param aulas: Los datos de las aulas disponibles.
+    :param aulas_permitidas: Matriz de booleanos donde las filas son clases y
+    las columnas son aulas, que indica qué combinaciones no están prohibidas.
+
+    :return: Los índices de las clases de cada sub-problema, en orden
+    creciente. Los sub-problemas están ordenados según su primera clase.
+    '''
+    aulas_en_conflicto = extender_a_aulas_dobles(aulas, aulas_permitidas)
+    conflictos = (
+        (i_clase1, i_clase2)
+        for i_clase1, i_clase2 in clases.pares_que_se_superponen
+        if np.any(aulas_en_conflicto[i_clase1] & aulas_permitidas[i_clase2])
+    )
+
+    return _componentes_conexas(len(clases.clases), conflictos)
+
+def extender_a_aulas_dobles(aulas: AulasPreprocesadas, matriz: np.ndarray) -> np.ndarray:
+    '''
+    Extender una matriz de booleanos (filas clases, columnas aulas) a las aulas
+    que comparten espacio: si una celda de un aula doble es verdadera, también
+    lo son las de sus aulas hijas, y viceversa.
+
+    :param aulas: Los datos de las aulas disponibles.
+    :param matriz: La matriz a extender, que no se modifica.
+    :return: Una matriz nueva con las celdas extendidas.
+    '''
+    extendida = matriz.copy()
+    for aula_grande, aulas_hijas in aulas.aulas_dobles.items():
+        for aula_hija in aulas_hijas:
+            extendida[:, aula_hija] |= matriz[:, aula_grande]
+            extendida[:, aula_grande] |= matriz[:, aula_hija]
+
+    return extendida
+
+def motivos_de_infactibilidad(
+    clases: ClasesPreprocesadas,
+    aulas: AulasPreprocesadas,
+    aulas_permitidas: np.ndarray
+) -> list[str]:
+    '''
+    Buscar, sin construir el modelo, motivos por los que es imposible asignarle
+    aula a todas las clases.
+
+    Se verifica que:
+    - Cada clase tenga al menos un aula permitida.
+    - En cada clique de clases superpuestas, y para cada conjunto de
+      equipamiento que necesita alguna de sus clases, las clases que necesitan
+      al menos ese equipamiento no sean más que las aulas permitidas para
+      alguna de ellas (condición de Hall). Como las aulas permitidas ya
+      descuentan las cerradas y las ocupadas, con el conjunto vacío esto
+      compara las clases en curso con las aulas abiertas y libres.
+
+    Es una verificación necesaria pero no suficiente: si devuelve algún motivo
+    la asignación es imposible, pero si no devuelve ninguno puede ser imposible
+    igual (por ejemplo, por las aulas dobles).
+
+    :param clases: Los datos de las clases del problema.
+    :param aulas: Los datos de las aulas disponibles.
+    :param aulas_permitidas: Matriz de booleanos donde las filas son clases y
+    las columnas son aulas, con `True` en las combinaciones permitidas.
+    :return: Un mensaje por cada motivo encontrado, que indica las clases o el
+    horario en el que está el problema.
+    '''
+    motivos: list[str] = []
+    aulas_por_clase = aulas_permitidas.sum(axis=1)
+
+    for i_clase in np.flatnonzero(aulas_por_clase == 0).tolist():
+        clase = clases.clases[i_clase]
+        motivos.append(
+            f'La clase de {clase.materia.nombre} del {clase.día.name} de '
+            f'{time_to_string_horario(clase.horario.inicio)} a {time_to_string_horario(clase.horario.fin)} '
+            'no tiene ningún aula abierta, libre y con el equipamiento necesario.'
+        )
+
+    # Los conjuntos de equipamiento distintos que necesitan las clases, y para
+    # cada uno qué clases necesitan al menos ese equipamiento
+    requerido = aulas.codificar_equipamiento(clase.equipamiento_necesario for clase in clases.clases)
+    conjuntos: dict[bytes, int] = {bytes(requerido.shape[1] * 8): 0}
+    nombres_de_los_conjuntos: list[list[str]] = [[]]
+    conjunto_de_cada_clase = np.zeros(len(clases.clases), dtype=np.intp)
+    for i_clase, (fila, clase) in enumerate(zip(requerido, clases.clases)):
+        if fila.tobytes() not in conjuntos:
+            conjuntos[fila.tobytes()] = len(conjuntos)
+            nombres_de_los_conjuntos.append(sorted(clase.equipamiento_necesario))
+        conjunto_de_cada_clase[i_clase] = conjuntos[fila.tobytes()]
+
+    filas_de_los_conjuntos = np.frombuffer(b''.join(conjuntos), dtype=np.uint64).reshape(len(conjuntos), -1)
+    necesitan_el_conjunto = np.all(
+        (requerido[np.newaxis, :, :] & filas_de_los_conjuntos[:, np.newaxis, :]) == filas_de_los_conjuntos[:, np.newaxis, :],
+        axis=2
+    )
+
+    inicios, fines = clases.inicios, clases.fines
+    for clique in clases.cliques_de_superposición:
+        if len(clique) < 2:
+            continue
+
+        # Si con varios conjuntos se involucra a las mismas clases, se informa
+        # sólo con el más específico
+        motivos_del_clique: dict[bytes, str] = {}
+        índices = np.array(clique, dtype=np.intp)
+        for conjunto in sorted({0, *conjunto_de_cada_clase[índices].tolist()}, key=lambda c: len(nombres_de_los_conjuntos[c])):
+            involucradas = índices[necesitan_el_conjunto[conjunto, índices]]
+
+            # Las aulas permitidas para alguna de las clases son al menos las
+            # de la clase que tiene más, así que sólo puede haber un problema
+            # si hay más clases que eso
+            if len(involucradas) <= aulas_por_clase[involucradas].max():
+                continue
+
+            cantidad_de_aulas = int(np.count_nonzero(aulas_permitidas[involucradas].any(axis=0)))
+            if len(involucradas) > cantidad_de_aulas:
+                equipamiento = f' que necesitan {", ".join(nombres_de_los_conjuntos[conjunto])}' if conjunto != 0 else ''
+                motivos_del_clique[involucradas.tobytes()] = (
+                    f'El {clases.clases[clique[0]].día.name} entre las '
+                    f'{_minutos_a_horario(int(inicios[índices].max()))} y las {_minutos_a_horario(int(fines[índices].min()))} '
+                    f'hay {len(involucradas)} clases{equipamiento}, pero sólo {cantidad_de_aulas} aulas disponibles para ellas.'
+                )
+
+        motivos.extend(motivos_del_clique.values())
+
+    return motivos
+
+def _minutos_a_horario(minutos: int) -> str:
+    ''':return: Los minutos desde las 00:00 en formato HH:MM.'''
+    return f'{minutos // 60:02}:{minutos % 60:02}'
+
+def subconjunto_de_clases(clases: ClasesPreprocesadas, índices: Sequence[int]) -> ClasesPreprocesadas:
+    '''
+    Armar un problema de asignación con algunas de las clases de otro problema.
+
+    Se conservan todas las aulas ocupadas del problema original.
+
+    :param clases: El problema de asignación original.
+    :param índices: Los índices de las clases a conservar, en orden creciente.
+    '''
+    subconjunto = ClasesPreprocesadas(
+        clases=[clases.clases[i] for i in índices],
+        aulas_ocupadas=list(clases.aulas_ocupadas)
+    )
+
+    # Las clases de cada carrera son contiguas, y siguen siéndolo al filtrarlas
+    for rango_clases, rango_aulas in clases.rangos_de_aulas_preferidas:
+        inicio = bisect_left(índices, rango_clases.start)
+        fin = bisect_left(índices, rango_clases.stop)
+        if inicio != fin:
+            subconjunto.rangos_de_aulas_preferidas.append((slice(inicio, fin), rango_aulas))
+
+    return subconjunto
+
+def ocupación_por_aula(
+    clases: ClasesPreprocesadas,
+    aulas: AulasPreprocesadas
+) -> dict[int, tuple[np.ndarray, np.ndarray]]:
+    '''
+    Agrupar por aula los horarios ocupados por asignaciones manuales.
+
+    Si está ocupada un aula doble también están ocupadas las aulas que la
+    componen, y si está ocupada una de las aulas que la componen también está
+    ocupada el aula doble.
+
+    Los horarios de cada aula se ordenan y se unen los que se superponen, así
+    que quedan intervalos disjuntos donde los inicios y los fines están
+    ordenados. Un intervalo [inicio, fin) se superpone con una clase si
+    `inicio < fin de la clase` y `inicio de la clase < fin`; por eso se unen
+    sólo los intervalos que se superponen, y no los que se tocan.
+
+    :param clases: Los datos de las clases del problema.
+    :param aulas: Los datos de las aulas disponibles.
+    :return: Diccionario de índice de aula a tupla (inicios, fines) de los
+    intervalos ocupados, en minutos desde las 00:00. Sólo incluye las aulas
+    que tienen algún horario ocupado.
+    '''
+    aulas_dobles_que_contienen: dict[int, int] = {
+        aula_hija: aula_doble
+        for aula_doble, aulas_hijas in aulas.aulas_dobles.items()
+        for aula_hija in aulas_hijas
+    }
+
+    intervalos_por_aula: dict[int, list[tuple[int, int]]] = {}
+    for i_aula, horario in clases.aulas_ocupadas:
+        intervalo = (time_to_minutos(horario.inicio), time_to_minutos(horario.fin))
+        afectadas = [i_aula, *aulas.aulas_dobles.get(i_aula, ())]
+        if i_aula in aulas_dobles_que_contienen:
+            afectadas.append(aulas_dobles_que_contienen[i_aula])
+        for afectada in afectadas:
+            intervalos_por_aula.setdefault(afectada, []).append(intervalo)
+
+    ocupación: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+    for i_aula, intervalos in intervalos_por_aula.items():
+        intervalos.sort()
+        unidos: list[list[int]] = []
+        for inicio, fin in intervalos:
+            if unidos and inicio < unidos[-1][1]:
+                unidos[-1][1] = max(unidos[-1][1], fin)
+            else:
+                unidos.append([inicio, fin])
+
+        inicios, fines = np.array(unidos, dtype=np.int16).T
+        ocupación[i_aula] = (inicios, fines)
+
+    return ocupación
+
+def aulas_intercambiables(
+    clases: ClasesPreprocesadas,
+    aulas: AulasPreprocesadas
+) -> dict[int, list[int]]:
+    '''
+    Agrupar las aulas que son intercambiables en un problema de asignación.
+
+    Dos aulas son intercambiables si están en el mismo edificio, tienen la
+    misma capacidad, el mismo equipamiento, los mismos horarios en los días de
+    las clases y los mismos horarios ocupados, y ninguna es parte de un aula
+    doble. Todas las restricciones y penalizaciones tratan igual a las aulas
+    intercambiables, así que el modelo puede usar una sola columna por grupo,
+    con la cantidad de aulas del grupo como capacidad.
+
+    :param clases: Los datos de las clases del problema.
+    :param aulas: Los datos de las aulas disponibles.
+    :return: Diccionario del índice de la primera aula de cada grupo (su
+    representante) a los índices de todas las aulas del grupo, en orden
+    creciente. Sólo incluye los grupos de más de un aula.
+    '''
+    candidatas = np.ones(len(aulas.aulas), dtype=bool)
+    for aula_doble, aulas_hijas in aulas.aulas_dobles.items():
+        candidatas[[aula_doble, *aulas_hijas]] = False
+
+    edificios = np.zeros(len(aulas.aulas), dtype=np.int64)
+    for i_edificio, rango in enumerate(aulas.rangos_de_aulas.values()):
+        edificios[rango] = i_edificio
+
+    # Las aulas con los mismos horarios ocupados tienen el mismo número, y las
+    # que no tienen horarios ocupados tienen 0
+    ocupaciones = np.zeros(len(aulas.aulas), dtype=np.int64)
+    números_de_ocupación: dict[tuple[bytes, bytes], int] = {}
+    for i_aula, (inicios, fines) in ocupación_por_aula(clases, aulas).items():
+        ocupaciones[i_aula] = números_de_ocupación.setdefault((inicios.tobytes(), fines.tobytes()), len(números_de_ocupación) + 1)
+
+    # Una fila por aula con todos los datos que tienen que coincidir
+    días = np.unique(clases.días)
+    datos = np.column_stack((
+        edificios,
+        aulas.capacidades,
+        aulas.equipamiento.view(np.int64),
+        aulas.apertura[:, días],
+        aulas.cierre[:, días],
+        aulas.cerrada[:, días],
+        ocupaciones
+    ))
+
+    grupos: dict[bytes, list[int]] = {}
+    for i_aula in np.flatnonzero(candidatas).tolist():
+        grupos.setdefault(datos[i_aula].tobytes(), []).append(i_aula)
+
+    return {grupo[0]: grupo for grupo in grupos.values() if len(grupo) > 1}
+
+def pares_de_clases_que_se_superponen(
+    días: np.ndarray,
+    inicios: np.ndarray,
+    fines: np.ndarray
+) -> list[tuple[int, int]]:
+    '''
+    Calcula todos los pares de clases que se superponen entre sí, con un
+    algoritmo de línea de barrido en tiempo O(n log n + k), donde k es la
+    cantidad de pares.
+
+    :param días: El día de cada clase.
+    :param inicios: El horario de inicio de cada clase, en minutos.
+    :param fines: El horario de fin de cada clase, en minutos.
+    :return: Lista de tuplas (índice menor, índice mayor).
+    '''
+    pares: list[tuple[int, int]] = []
+
+    # Clases que empezaron antes que la clase actual, en un heap ordenado por
+    # el horario de fin
+    activas: list[tuple[int, int, int]] = []
+    día_actual: int|None = None
+
+    lista_de_días, lista_de_inicios, lista_de_fines = días.tolist(), inicios.tolist(), fines.tolist()
+    for i_clase in np.lexsort((inicios, días)).tolist():
+        día, inicio, fin = lista_de_días[i_clase], lista_de_inicios[i_clase], lista_de_fines[i_clase]
+        if día != día_actual:
+            activas.clear()
+            día_actual = día
+
+        # Sacar las clases que terminaron antes de que empiece esta
+        while activas and activas[0][0] <= inicio:
+            heapq.heappop(activas)
+
+        # Las que quedan empezaron antes y terminan después del inicio de esta
+        # (la comparación sólo descarta algo si esta clase dura 0 minutos)
+        for _, inicio_otra, i_otra in activas:
+            if inicio_otra < fin:
+                pares.append((min(i_clase, i_otra), max(i_clase, i_otra)))
+
+        heapq.heappush(activas, (fin, inicio, i_clase))
+
+    return pares
+
+def cliques_de_clases_que_se_superponen(
+    días: np.ndarray,
+    inicios: np.ndarray,
+    fines: np.ndarray
+) -> list[list[int]]:
+    '''
+    Calcula los cliques maximales del grafo de superposición de las clases.
+
+    Como los horarios son intervalos, cada clique maximal corresponde a un
+    instante en el que la cantidad de clases en curso llega a un máximo local:
+    se recorren los inicios y fines en orden, y se emite el conjunto de clases
+    activas cada vez que termina una clase después de que haya empezado otra.
+
+    :param días: El día de cada clase.
+    :param inicios: El horario de inicio de cada clase, en minutos.
+    :param fines: El horario de fin de cada clase, en minutos.
+    :return: Lista de cliques, cada uno con los índices de sus clases en orden
+    creciente. Incluye cliques de una sola clase.
+    '''
+    # Eventos (día, minuto, tipo, índice). Con el mismo horario, primero se
+    # procesan los fines, porque una clase que termina cuando empieza otra no se
+    # superpone con ella. Las clases que duran 0 minutos sólo se superponen con
+    # las que están activas en ese instante.
+    FIN, INSTANTÁNEA, INICIO = 0, 1, 2
+    eventos: list[tuple[int, int, int, int]] = []
+    for i_clase, (día, inicio, fin) in enumerate(zip(días.tolist(), inicios.tolist(), fines.tolist())):
+        if inicio < fin:
+            eventos.append((día, inicio, INICIO, i_clase))
+            eventos.append((día, fin, FIN, i_clase))
+        else:
+            eventos.append((día, inicio, INSTANTÁNEA, i_clase))
+    eventos.sort()
+
+    cliques: list[list[int]] = []
+    activas: set[int] = set()
+    empezó_alguna_desde_el_último_clique = False
+    for _, _, tipo, i_clase in eventos:
+        if tipo == INICIO:
+            activas.add(i_clase)
+            empezó_alguna_desde_el_último_clique = True
+        elif tipo == INSTANTÁNEA:
+            cliques.append(sorted(activas | {i_clase}))
+        else:
+            if empezó_alguna_desde_el_último_clique:
+                cliques.append(sorted(activas))
+                empezó_alguna_desde_el_último_clique = False
+            activas.remove(i_clase)
+
+    return cliques
+
+def _componentes_conexas(n_nodos: int, aristas: Iterable[tuple[int, int]]) -> list[list[int]]:
+    '''
+    Calcula las componentes conexas de un grafo con el algoritmo union-find.
+
+    :return: Lista de componentes, cada una con sus nodos en orden creciente.
+    Las componentes están ordenadas según su primer nodo.
+    '''
+    padres = list(range(n_nodos))
+
+    def raíz(nodo: int) -> int:
+        while padres[nodo] != nodo:
+            padres[nodo] = padres[padres[nodo]]
+            nodo = padres[nodo]
+        return nodo
+
+    for nodo1, nodo2 in aristas:
+        raíz1, raíz2 = raíz(nodo1), raíz(nodo2)
+        if raíz1 != raíz2:
+            padres[max(raíz1, raíz2)] = min(raíz1, raíz2)
+
+    componentes: dict[int, list[int]] = {}
+    for nodo in range(n_nodos):
+        componentes.setdefault(raíz(nodo), []).append(nodo)
+
+    return list(componentes.values())
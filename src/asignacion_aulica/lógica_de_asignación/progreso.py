@@ -0,0 +1,107 @@
+'''
+En este módulo se define el canal por el que la asignación informa su progreso
+mientras resuelve, y por el que se puede cancelar.
+
+El progreso se obtiene con un `CpSolverSolutionCallback`, que ortools llama
+cada vez que encuentra una solución mejor. La cancelación detiene los solvers
+que están resolviendo con `stop_search`, que conserva la mejor solución
+encontrada hasta el momento.
+'''
+from ortools.sat.python import cp_model
+from contextlib import contextmanager
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+import threading
+
+from asignacion_aulica.gestor_de_datos.días_y_horarios import Día
+
+@dataclass
+class InfoDeProgreso:
+    '''
+    El estado de un problema de asignación cuando se encuentra una solución
+    mejor.
+    '''
+    # El día del problema que se está resolviendo.
+    día: Día
+
+    # La penalización de la mejor solución encontrada hasta ahora.
+    penalización: float
+
+    # La mejor cota inferior de la penalización encontrada hasta ahora.
+    cota_inferior: float
+
+    # Segundos desde que se empezó a resolver el problema.
+    segundos: float
+
+class ProgresoDeLaAsignación:
+    '''
+    Permite seguir el progreso de una asignación y cancelarla desde otro hilo.
+    '''
+    def __init__(self, al_progresar: Callable[[InfoDeProgreso], None]|None = None):
+        '''
+        :param al_progresar: Función que se llama cada vez que se encuentra
+        una solución mejor en alguno de los problemas. Se llama desde el hilo
+        que está resolviendo ese problema.
+        '''
+        self.al_progresar: Callable[[InfoDeProgreso], None]|None = al_progresar
+        self._cancelada = threading.Event()
+        self._lock = threading.Lock()
+        self._solvers_activos: list[cp_model.CpSolver] = []
+
+    def cancelar(self):
+        '''
+        Cancelar la asignación. Los problemas que se están resolviendo terminan
+        con la mejor solución que tengan, y los que todavía no empezaron no se
+        resuelven.
+        '''
+        with self._lock:
+            self._cancelada.set()
+            for solver in self._solvers_activos:
+                solver.stop_search()
+
+    def cancelada(self) -> bool:
+        ''':return: `True` si se canceló la asignación.'''
+        return self._cancelada.is_set()
+
+    @contextmanager
+    def resolviendo(self, solver: cp_model.CpSolver) -> Iterator[None]:
+        '''
+        Registrar un solver mientras resuelve, para poder detenerlo si se
+        cancela la asignación.
+        '''
+        with self._lock:
+            self._solvers_activos.append(solver)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._solvers_activos.remove(solver)
+
+    def callback(self, día: Día) -> cp_model.CpSolverSolutionCallback:
+        '''
+        :param día: El día del problema que se va a resolver.
+        :return: Un callback para pasarle a `CpSolver.solve`, que informa el
+        progreso de ese problema.
+        '''
+        return _CallbackDeProgreso(self, día)
+
+class _CallbackDeProgreso(cp_model.CpSolverSolutionCallback):
+    '''
+    Callback que ortools llama con cada solución mejor que encuentra.
+    '''
+    def __init__(self, progreso: ProgresoDeLaAsignación, día: Día):
+        super().__init__()
+        self.progreso: ProgresoDeLaAsignación = progreso
+        self.día: Día = día
+
+    def on_solution_callback(self):
+        if self.progreso.cancelada():
+            self.stop_search()
+
+        if self.progreso.al_progresar:
+            self.progreso.al_progresar(InfoDeProgreso(
+                día=self.día,
+                penalización=self.objective_value,
+                cota_inferior=self.best_objective_bound,
+                segundos=self.wall_time
+            ))
@@ -0,0 +1,167 @@
+'''
+En este módulo se define la reparación de una asignación existente.
+
+Después de un cambio chico (por ejemplo, cambiar el horario de una clase o
+quitar un aula), volver a resolver el día entero puede cambiar el aula de
+muchas clases que no tenían nada que ver con el cambio. La reparación, en
+cambio, sólo libera las clases del vecindario del cambio, y resuelve un
+problema en el que las demás clases se quedan en el aula que tienen asignada.
+
+El vecindario se arma a partir de las clases semilla: las que están en
+conflicto con la asignación actual (no tienen aula, su aula está prohibida, o
+se superponen con otra clase en la misma aula) y las que se indican como
+modificadas. En cada paso se le agregan las clases que se superponen en el
+tiempo con alguna clase del vecindario y que están en un aula a la que se
+podría mover esa clase; la cantidad de pasos es el radio.
+
+Las clases fijas ocupan su aula en su horario (ver `vecindarios.py`), así que
+el problema liberado se resuelve con el mismo modelo que la asignación
+completa.
+'''
+from collections.abc import Iterable
+import logging, time
+
+from asignacion_aulica.gestor_de_datos.días_y_horarios import Día
+from asignacion_aulica.gestor_de_datos.entidades import Aula, Carreras, Clase, Edificios
+from asignacion_aulica.lógica_de_asignación.asignación import (
+    SoluciónDeUnProblema,
+    gap_de_optimalidad,
+    resolver_problema_de_asignación
+)
+from asignacion_aulica.lógica_de_asignación.configuración import ConfiguraciónDelSolver
+from asignacion_aulica.lógica_de_asignación.diagnóstico import ConflictoDeAsignación
+from asignacion_aulica.lógica_de_asignación.excepciones import AsignaciónImposibleException
+from asignacion_aulica.lógica_de_asignación.métricas import MétricasDeLaAsignación, medir
+from asignacion_aulica.lógica_de_asignación.postprocesamiento import InfoPostAsignación
+from asignacion_aulica.lógica_de_asignación.progreso import ProgresoDeLaAsignación
+from asignacion_aulica.lógica_de_asignación.preprocesamiento import AulasPreprocesadas, preprocesar_clases
+from asignacion_aulica.lógica_de_asignación.vecindarios import (
+    clases_en_conflicto,
+    subproblema_con_clases_fijas,
+    vecinas_de_cada_clase,
+    vecindario
+)
+from asignacion_aulica.lógica_de_asignación import restricciones
+
+logger = logging.getLogger(__name__)
+
+def reparar(
+    edificios: Edificios,
+    carreras: Carreras,
+    clases_modificadas: Iterable[Clase] = (),
+    aulas_modificadas: Iterable[Aula] = (),
+    radio: int = 1,
+    configuración: ConfiguraciónDelSolver|None = None,
+    progreso: ProgresoDeLaAsignación|None = None
+) -> InfoPostAsignación:
+    '''
+    Reparar la asignación actual, cambiando sólo el aula de las clases que
+    están en el vecindario de los conflictos y de los cambios.
+
+    Igual que en `asignar`, las clases con `no_cambiar_asignación == True` no
+    se modifican. A las clases liberadas se les sobreescribe `aula_asignada`,
+    y las demás conservan el aula que tienen. Si no se puede reparar un día,
+    no se modifica ninguna clase de ese día; se puede volver a intentar con un
+    radio más grande, o resolver el día completo con `asignar`.
+
+    Los días sin clases semilla no se resuelven, y se devuelven en
+    `InfoPostAsignación.días_sin_cambios`. La reparación no calcula firmas,
+    porque la asignación reparada no es necesariamente la óptima del día.
+
+    :param edificios: Los edificios disponibles.
+    :param carreras: Las carreras que existen, con las aulas asignadas
+    actualmente.
+    :param clases_modificadas: Clases que cambiaron desde la última
+    asignación, que se liberan aunque su aula actual sea válida.
+    :param aulas_modificadas: Aulas que cambiaron desde la última asignación.
+    Se liberan las clases que están asignadas a ellas.
+    :param radio: Cantidad de pasos con los que se extiende el vecindario de
+    las clases semilla. Con 0 sólo se liberan las clases semilla.
+    :param configuración: Opciones del solucionador. Si es `None` se usan los
+    valores por defecto de `ConfiguraciónDelSolver`.
+    :param progreso: Objeto para informar el progreso y poder cancelar.
+
+    :return: Info sobre el resultado de la reparación.
+    :raise ValueError: Si el radio es negativo.
+    '''
+    configuración = configuración or ConfiguraciónDelSolver()
+    progreso = progreso or ProgresoDeLaAsignación()
+    if radio < 0:
+        raise ValueError(f'El radio tiene que ser al menos 0, no {radio}.')
+
+    métricas = MétricasDeLaAsignación()
+    inicio = time.perf_counter()
+
+    with medir(métricas.tiempos, 'preprocesamiento'):
+        aulas = AulasPreprocesadas(edificios)
+        clases_preprocesadas = preprocesar_clases(carreras, aulas)
+        ids_de_clases_modificadas = {id(clase) for clase in clases_modificadas}
+        índices_de_aulas_modificadas = {aulas.índice_o_none(aula) for aula in aulas_modificadas} - {None}
+
+    días_sin_asignar: list[Día] = []
+    días_sin_cambios: list[Día] = []
+    motivos_de_días_sin_asignar: dict[Día, list[str]] = {}
+    conflictos: dict[Día, ConflictoDeAsignación] = {}
+    clases_sin_asignar: list[Clase] = []
+    soluciones: list[SoluciónDeUnProblema] = []
+    for día in Día:
+        clases = clases_preprocesadas[día]
+        with medir(métricas.tiempos, 'vecindario'):
+            aulas_actuales = [aulas.índice_o_none(clase.aula_asignada) for clase in clases.clases]
+            aulas_permitidas = ~restricciones.aulas_prohibidas(clases, aulas)
+            semillas = set(clases_en_conflicto(clases, aulas, aulas_actuales, aulas_permitidas))
+            semillas.update(
+                i_clase
+                for i_clase, clase in enumerate(clases.clases)
+                if id(clase) in ids_de_clases_modificadas or aulas_actuales[i_clase] in índices_de_aulas_modificadas
+            )
+            if not semillas:
+                días_sin_cambios.append(día)
+                continue
+
+            vecinas = vecinas_de_cada_clase(clases, aulas, aulas_actuales, aulas_permitidas)
+            liberadas = vecindario(clases, aulas, aulas_actuales, semillas, radio, vecinas)
+            problema = subproblema_con_clases_fijas(clases, aulas_actuales, liberadas)
+
+        logger.info('Reparando el día %s: se liberan %d de %d clases.', día.name, len(liberadas), len(clases.clases))
+        try:
+            with medir(métricas.tiempos, 'resolución'):
+                solución = resolver_problema_de_asignación(problema, aulas, configuración, progreso)
+        except AsignaciónImposibleException as exc:
+            logger.error('Falló la reparación para el día %s: %s', día.name, exc)
+            días_sin_asignar.append(día)
+            motivos_de_días_sin_asignar[día] = [f'No se pudo reparar la asignación con radio {radio}. {exc}']
+            if exc.conflicto is not None:
+                conflictos[día] = exc.conflicto
+                motivos_de_días_sin_asignar[día].append(exc.conflicto.mensaje())
+            continue
+
+        for clase, i_aula_asignada in zip(problema.clases, solución.aulas_asignadas):
+            if i_aula_asignada is None:
+                clase.aula_asignada = None
+                clases_sin_asignar.append(clase)
+            else:
+                clase.aula_asignada = aulas.aulas[i_aula_asignada].aula_original
+        soluciones.append(solución)
+        if solución.métricas is not None:
+            métricas.problemas.append(solución.métricas)
+
+    with medir(métricas.tiempos, 'postprocesamiento'):
+        reporte = InfoPostAsignación(
+            edificios,
+            carreras,
+            días_sin_asignar,
+            días_sin_cambios,
+            {},
+            gap_de_optimalidad(soluciones),
+            progreso.cancelada(),
+            métricas,
+            motivos_de_días_sin_asignar,
+            conflictos,
+            clases_sin_asignar
+        )
+
+    métricas.tiempos['total'] = time.perf_counter() - inicio
+    logger.info('Métricas de la reparación: %s', métricas.a_json())
+
+    return reporte
@@ -6,39 +6,42 @@ aulas para ser válida.
 
 Hay algunas restricciones que se pueden calcular conociendo solamente los datos
 de las clases y los datos de las aulas, y que permiten anular algunas variables
-del modelo. Estas restricciones se calculan con la función `aulas_prohibidas`.
+del modelo. Estas restricciones se calculan con la función `aulas_prohibidas`,
+como operaciones vectorizadas de numpy sobre los horarios en minutos y los
+equipamientos codificados como conjuntos de bits.
 
 Hay otras restricciones que para calcularlas se necesita comparar las variables
 del modelo. Estas restricciones se calculan con la función
 `restricciones_con_variables`.
 '''
-from ortools.sat.python.cp_model import BoundedLinearExpression
-from itertools import combinations, product, chain
+from ortools.sat.python.cp_model import IntVar
+from itertools import chain
 from collections.abc import Iterable, Sequence
 from typing import Callable, TypeAlias
 import numpy as np
 
-from asignacion_aulica.gestor_de_datos.entidades import Clase
+from asignacion_aulica.lógica_de_asignación.matriz_de_asignaciones import MatrizDeAsignaciones
 from asignacion_aulica.lógica_de_asignación.preprocesamiento import (
-    AulaPreprocesada, AulasPreprocesadas, ClasesPreprocesadas
+    AulasPreprocesadas, ClasesPreprocesadas, ocupación_por_aula
 )
 
 restricción_de_aulas_prohibidas: TypeAlias = Callable[
     [ClasesPreprocesadas, AulasPreprocesadas],
-    Iterable[tuple[int, int]]
+    np.ndarray
 ]
 '''
 Las restricciones de aulas prohibidas se representan con funciones que reciben:
 - Los datos de las clases de el problema de asignación.
 - Los datos de las aulas disponibles.
 
-Y devuelven un iterable de tuplas `(índice de clase, índice de aula)` que
-representan las combinaciones de clases y aulas que hay que evitar.
+Y devuelven una matriz de booleanos donde cada fila es una clase y cada columna
+es un aula, con `True` en las combinaciones de clases y aulas que hay que
+evitar.
 '''
 
 restricción_con_variables: TypeAlias = Callable[
-    [ClasesPreprocesadas, AulasPreprocesadas, np.ndarray],
-    Iterable[BoundedLinearExpression]
+    [ClasesPreprocesadas, AulasPreprocesadas, MatrizDeAsignaciones],
+    Iterable[list[IntVar]]
 ]
 '''
 Las restricciones con variables se representan con funciones que reciben:
@@ -47,84 +50,140 @@ Las restricciones con variables se representan con funciones que reciben:
 - La matriz de variables de asignación, donde cada fila es una clase y cada
   columna es un aula.
 
-Y devuelven un iterable de predicados que hay que agregar al modelo.
+Y devuelven un iterable de grupos de variables de asignación, donde en cada
+grupo puede haber a lo sumo una variable verdadera. Cada grupo se agrega al
+modelo con `add_at_most_one`, que el solver propaga mucho mejor que muchas
+restricciones de a pares.
+
+Las celdas de la matriz que son constantes 0 no se incluyen en los grupos.
 '''
 
 def no_superponer_clases(
     clases: ClasesPreprocesadas,
     aulas: AulasPreprocesadas,
-    asignaciones: np.ndarray
-) -> Iterable[BoundedLinearExpression]:
+    asignaciones: MatrizDeAsignaciones
+) -> Iterable[list[IntVar]]:
     '''
     Las materias con horarios superpuestos no pueden estar en el mismo aula.
+
+    Se genera un grupo por cada clique de clases superpuestas y cada aula. Las
+    columnas que representan grupos de aulas intercambiables se restringen en
+    `no_superar_las_aulas_intercambiables`.
+    '''
+    for clique in clases.cliques_de_superposición:
+        if len(clique) < 2:
+            continue
+
+        for columna, variables in asignaciones.variables_por_columna(clique).items():
+            if len(variables) > 1 and asignaciones.aulas_por_columna[columna] == 1:
+                yield variables
+
+def no_superar_las_aulas_intercambiables(
+    clases: ClasesPreprocesadas,
+    aulas: AulasPreprocesadas,
+    asignaciones: MatrizDeAsignaciones
+) -> Iterable[tuple[list[IntVar], int]]:
     '''
-    for i_clase1, i_clase2 in _pares_de_clases_que_se_superponen(clases):
-        asignaciones_de_ambas_clases = asignaciones[i_clase1, :] + asignaciones[i_clase2, :]
-        for asignaciones_a_un_aula in asignaciones_de_ambas_clases:
-            yield asignaciones_a_un_aula <= 1
+    En un grupo de aulas intercambiables no puede haber más clases superpuestas
+    que aulas.
+
+    Es la versión de `no_superponer_clases` para las columnas que representan
+    grupos de aulas: como los horarios son intervalos, si ningún clique tiene
+    más clases asignadas al grupo que aulas, las clases se pueden repartir
+    entre las aulas sin superponerse (ver `repartir_aulas_intercambiables`).
+
+    :return: Iterable de tuplas (variables, cantidad de aulas), donde la suma
+    de las variables no puede superar la cantidad de aulas.
+    '''
+    for clique in clases.cliques_de_superposición:
+        for columna, variables in asignaciones.variables_por_columna(clique).items():
+            cantidad_de_aulas = int(asignaciones.aulas_por_columna[columna])
+            if cantidad_de_aulas > 1 and len(variables) > cantidad_de_aulas:
+                yield variables, cantidad_de_aulas
 
 def no_asignar_aula_doble_y_sus_hijas_al_mismo_tiempo(
     clases: ClasesPreprocesadas,
     aulas: AulasPreprocesadas,
-    asignaciones: np.ndarray
-) -> Iterable[BoundedLinearExpression]:
+    asignaciones: MatrizDeAsignaciones
+) -> Iterable[list[IntVar]]:
     '''
     Si se asigna un aula doble, las aulas que la conforman no pueden asignarse
     a otras clases que en ese horario.
+
+    Se genera un grupo por cada clique de clases superpuestas y cada par (aula
+    doble, aula hija), porque en un clique todas las clases se superponen entre
+    sí y no puede haber una en el aula doble y otra en la hija.
     '''
-    for i_clase1, i_clase2 in _pares_de_clases_que_se_superponen(clases):
+    if not aulas.aulas_dobles:
+        return
+
+    for clique in clases.cliques_de_superposición:
+        if len(clique) < 2:
+            continue
+
+        variables_por_aula = asignaciones.variables_por_columna(clique)
         for aula_doble, aulas_hijas in aulas.aulas_dobles.items():
-            # Se asigna una clase al aula doble => No se asigna ninguna clase a las aulas hijas 
-            # Se asigna alguna clase a una de las aulas hijas => No se asigna una clase al aula doble
+            asignaciones_al_aula_doble = variables_por_aula.get(aula_doble)
+            if not asignaciones_al_aula_doble:
+                continue
+
             for aula_hija in aulas_hijas:
-                yield asignaciones[i_clase1, aula_doble] + asignaciones[i_clase2, aula_hija] <= 1
-                yield asignaciones[i_clase2, aula_doble] + asignaciones[i_clase1, aula_hija] <= 1
+                asignaciones_al_aula_hija = variables_por_aula.get(aula_hija)
+                if asignaciones_al_aula_hija:
+                    yield asignaciones_al_aula_doble + asignaciones_al_aula_hija
 
 def no_asignar_aulas_ocupadas(
     clases: ClasesPreprocesadas,
     aulas: AulasPreprocesadas
-) -> Iterable[tuple[int, int]]:
+) -> np.ndarray:
     '''
     Una clase no puede ser asignada a un aula que está ocupada en ese horario.
+
+    Los horarios ocupados de cada aula son intervalos disjuntos y ordenados
+    (ver `ocupación_por_aula`), así que para cada clase alcanza con buscar
+    binariamente el último intervalo que empieza antes de que termine la clase,
+    y fijarse si termina después de que empiece la clase.
     '''
-    for clase_e_índice, aula_ocupada in product(enumerate(clases.clases), clases.aulas_ocupadas):
-        i_clase, clase = clase_e_índice
-        i_aula, horario_aula = aula_ocupada
-        if clase.horario.se_superpone_con(horario_aula):
-            yield (i_clase, i_aula)
-            if i_aula in aulas.aulas_dobles:
-                aula1, aula2 = aulas.aulas_dobles[i_aula]
-                yield (i_clase, aula1)
-                yield (i_clase, aula2)
+    prohibidas = _matriz_vacía(clases, aulas)
+
+    for i_aula, (inicios, fines) in ocupación_por_aula(clases, aulas).items():
+        último_anterior = np.searchsorted(inicios, clases.fines, side='left') - 1
+        prohibidas[:, i_aula] = (
+            (último_anterior >= 0)
+            & (fines[np.maximum(último_anterior, 0)] > clases.inicios)
+        )
+
+    return prohibidas
 
 def no_asignar_en_aula_cerrada(
     clases: ClasesPreprocesadas,
     aulas: AulasPreprocesadas
-) -> Iterable[tuple[int, int]]:
+) -> np.ndarray:
     '''
     Una clase no se puede asignar a un aula que no esté abierta en ese horario.
     '''
-    for i_clase, clase, i_aula, aula in _combinaciones_de_clases_y_aulas(clases, aulas):
-        horario_aula = aula.horarios[clase.día]
-        aula_está_cerrada = (
-            horario_aula.cerrado
-            or horario_aula.inicio > clase.horario.inicio
-            or horario_aula.fin < clase.horario.fin
-        )
-        if aula_está_cerrada:
-            yield (i_clase, i_aula)
+    # Horarios de las aulas en el día de cada clase (filas clases, columnas aulas)
+    apertura = aulas.apertura[:, clases.días].T
+    cierre = aulas.cierre[:, clases.días].T
+    cerrada = aulas.cerrada[:, clases.días].T
+
+    return (
+        cerrada
+        | (apertura > clases.inicios[:, np.newaxis])
+        | (cierre < clases.fines[:, np.newaxis])
+    )
 
 def asignar_aulas_con_el_equipamiento_requerido(
     clases: ClasesPreprocesadas,
     aulas: AulasPreprocesadas
-) -> Iterable[tuple[int, int]]:
+) -> np.ndarray:
     '''
     Una clase no puede ser asignada a un aula que no tenga todo el equipamiento
     requerido.
     '''
-    for i_clase, clase, i_aula, aula in _combinaciones_de_clases_y_aulas(clases, aulas):
-        if not clase.equipamiento_necesario.issubset(aula.equipamiento):
-            yield (i_clase, i_aula)
+    requerido = aulas.codificar_equipamiento(clase.equipamiento_necesario for clase in clases.clases)
+    faltante = requerido[:, np.newaxis, :] & ~aulas.equipamiento[np.newaxis, :, :]
+    return np.any(faltante != 0, axis=2)
 
 todas_las_restricciones_de_aulas_prohibidas: Sequence[restricción_de_aulas_prohibidas] = (
     no_asignar_aulas_ocupadas,
@@ -140,60 +199,45 @@ todas_las_restricciones_con_variables: Sequence[restricción_con_variables] = (
 def aulas_prohibidas(
     clases: ClasesPreprocesadas,
     aulas: AulasPreprocesadas
-) -> Iterable[tuple[int, int]]:
+) -> np.ndarray:
     '''
-    Genera las combinaciones de clases y aulas que no pueden ser asignadas entre
-    sí.
+    Calcula las combinaciones de clases y aulas que no pueden ser asignadas
+    entre sí.
 
     :param clases: Los datos de las clases de el problema de asignación.
     :pram aulas: Los datos de las aulas disponibles.
 
-    :return: Iterable de tuplas (clase, aula) que representan las combinaciones
-    de índice de clase e índice de aula que hay que evitar.
+    :return: Matriz de booleanos donde las filas son clases y las columnas son
+    aulas, con `True` en las combinaciones que hay que evitar.
     '''
-    return chain.from_iterable(
-        restricción(clases, aulas)
-        for restricción in todas_las_restricciones_de_aulas_prohibidas
-    )
+    prohibidas = _matriz_vacía(clases, aulas)
+    for restricción in todas_las_restricciones_de_aulas_prohibidas:
+        prohibidas |= restricción(clases, aulas)
+
+    return prohibidas
 
 def restricciones_con_variables(
     clases: ClasesPreprocesadas,
     aulas: AulasPreprocesadas,
-    asignaciones: np.ndarray
-) -> Iterable[BoundedLinearExpression]:
+    asignaciones: MatrizDeAsignaciones
+) -> Iterable[list[IntVar]]:
     '''
     :param clases: Los datos de las clases de el problema de asignación.
     :pram aulas: Los datos de las aulas disponibles.
-    :param asignaciones: Matriz con las variables de asignaciones, donde las
-    filas son clases y las columnas son aulas.
+    :param asignaciones: Las variables de asignaciones, donde las filas son
+    clases y las columnas son aulas.
 
-    :return: Iterable de predicados que deben ser agregados al modelo.
+    :return: Iterable de grupos de variables que deben ser agregados al modelo
+    con `add_at_most_one`.
     '''
     return chain.from_iterable(
         restricción(clases, aulas, asignaciones)
         for restricción in todas_las_restricciones_con_variables
     )
 
-def _combinaciones_de_clases_y_aulas(clases: ClasesPreprocesadas, aulas: AulasPreprocesadas) -> Iterable[tuple[int, Clase, int, AulaPreprocesada]]:
-    '''
-    Devuelve un iterable de todas las combinaciones de clases y aulas.
-
-    El iterable produce tuplas (índice de la clase, clase, índice del aula, aula).
+def _matriz_vacía(clases: ClasesPreprocesadas, aulas: AulasPreprocesadas) -> np.ndarray:
     '''
-    for clase_con_índice, aula_con_ìndice in product(enumerate(clases.clases), enumerate(aulas.aulas)):
-        i_clase, clase = clase_con_índice
-        i_aula, aula = aula_con_ìndice
-        yield i_clase, clase, i_aula, aula
-
-def _pares_de_clases_que_se_superponen(clases: ClasesPreprocesadas) -> Iterable[tuple[int, int]]:
-    '''
-    Devuelve un iterable de todos los pares de clases que se superponen entre sí.
-
-    El iterable produce tuplas (índice 1, índice 2).
+    Devuelve una matriz de booleanos en `False`, donde las filas son clases y
+    las columnas son aulas.
     '''
-    for clase1_e_índice, clase2_e_índice in combinations(enumerate(clases.clases), 2):
-        i_clase1, clase1 = clase1_e_índice
-        i_clase2, clase2 = clase2_e_índice
-        se_superpopnen = clase1.día == clase2.día and clase1.horario.se_superpone_con(clase2.horario)
-        if se_superpopnen:
-            yield i_clase1, i_clase2
+    return np.zeros(shape=(len(clases.clases), len(aulas.aulas)), dtype=bool)
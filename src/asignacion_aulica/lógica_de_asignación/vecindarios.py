@@ -0,0 +1,161 @@
+'''
+En este módulo se definen los vecindarios de una asignación existente: los
+conjuntos de clases que se liberan para volver a resolverlas, mientras las
+demás se quedan en el aula que tienen asignada.
+
+Los usan la reparación (ver `reparación.py`) y la búsqueda en vecindarios (ver
+`búsqueda_en_vecindarios.py`).
+
+Las clases fijas se tratan como asignaciones manuales: ocupan su aula en su
+horario (ver `ClasesPreprocesadas.aulas_ocupadas`), así que el problema
+liberado se resuelve con el mismo modelo que la asignación completa.
+'''
+from collections.abc import Iterable, Sequence
+import numpy as np
+
+from asignacion_aulica.lógica_de_asignación import restricciones
+from asignacion_aulica.lógica_de_asignación.preprocesamiento import (
+    AulasPreprocesadas,
+    ClasesPreprocesadas,
+    extender_a_aulas_dobles,
+    subconjunto_de_clases
+)
+
+def clases_en_conflicto(
+    clases: ClasesPreprocesadas,
+    aulas: AulasPreprocesadas,
+    aulas_actuales: Sequence[int|None],
+    aulas_permitidas: np.ndarray|None = None
+) -> list[int]:
+    '''
+    Buscar las clases cuya aula actual no cumple con las restricciones.
+
+    :param clases: Los datos de las clases del problema de asignación.
+    :param aulas: Los datos de las aulas disponibles.
+    :param aulas_actuales: El índice del aula asignada actualmente a cada
+    clase, o `None` si no tiene aula (o su aula ya no existe).
+    :param aulas_permitidas: La matriz de aulas permitidas, si ya se calculó
+    (ver `restricciones.aulas_prohibidas`). Si es `None`, se calcula.
+    :return: Los índices, en orden creciente, de las clases que no tienen
+    aula, que están en un aula prohibida para ellas, o que se superponen con
+    otra clase en la misma aula (o en un aula doble y una de sus hijas).
+    '''
+    if aulas_permitidas is None:
+        aulas_permitidas = ~restricciones.aulas_prohibidas(clases, aulas)
+    en_conflicto = {
+        i_clase
+        for i_clase, i_aula in enumerate(aulas_actuales)
+        if i_aula is None or not aulas_permitidas[i_clase, i_aula]
+    }
+
+    comparten_espacio: dict[int, set[int]] = {i_aula: {i_aula} for i_aula in range(len(aulas.aulas))}
+    for aula_doble, aulas_hijas in aulas.aulas_dobles.items():
+        for aula_hija in aulas_hijas:
+            comparten_espacio[aula_doble].add(aula_hija)
+            comparten_espacio[aula_hija].add(aula_doble)
+
+    for i_clase1, i_clase2 in clases.pares_que_se_superponen:
+        i_aula1, i_aula2 = aulas_actuales[i_clase1], aulas_actuales[i_clase2]
+        if i_aula1 is not None and i_aula2 is not None and i_aula2 in comparten_espacio[i_aula1]:
+            en_conflicto.update((i_clase1, i_clase2))
+
+    return sorted(en_conflicto)
+
+def vecinas_de_cada_clase(
+    clases: ClasesPreprocesadas,
+    aulas: AulasPreprocesadas,
+    aulas_actuales: Sequence[int|None],
+    aulas_permitidas: np.ndarray|None = None
+) -> dict[int, list[int]]:
+    '''
+    Calcular las clases vecinas de cada clase, que son las que habría que
+    mover para cambiarla de aula.
+
+    Una clase es vecina de otra si se superponen en el tiempo y si su aula
+    actual (o un aula que comparte espacio con ella) está permitida para la
+    otra.
+
+    :param clases: Los datos de las clases del problema de asignación.
+    :param aulas: Los datos de las aulas disponibles.
+    :param aulas_actuales: El índice del aula asignada actualmente a cada
+    clase, o `None`.
+    :param aulas_permitidas: La matriz de aulas permitidas, si ya se calculó
+    (ver `restricciones.aulas_prohibidas`). Si es `None`, se calcula.
+    :return: Diccionario del índice de cada clase a los índices de sus
+    vecinas. Las clases sin vecinas no están.
+    '''
+    if aulas_permitidas is None:
+        aulas_permitidas = ~restricciones.aulas_prohibidas(clases, aulas)
+    permitidas = extender_a_aulas_dobles(aulas, aulas_permitidas)
+
+    vecinas: dict[int, list[int]] = {}
+    for i_clase1, i_clase2 in clases.pares_que_se_superponen:
+        i_aula1, i_aula2 = aulas_actuales[i_clase1], aulas_actuales[i_clase2]
+        if i_aula2 is not None and permitidas[i_clase1, i_aula2]:
+            vecinas.setdefault(i_clase1, []).append(i_clase2)
+        if i_aula1 is not None and permitidas[i_clase2, i_aula1]:
+            vecinas.setdefault(i_clase2, []).append(i_clase1)
+
+    return vecinas
+
+def vecindario(
+    clases: ClasesPreprocesadas,
+    aulas: AulasPreprocesadas,
+    aulas_actuales: Sequence[int|None],
+    semillas: Iterable[int],
+    radio: int,
+    vecinas: dict[int, list[int]]|None = None
+) -> list[int]:
+    '''
+    Extender un conjunto de clases a las clases que habría que mover para
+    cambiarlas de aula (ver `vecinas_de_cada_clase`).
+
+    :param clases: Los datos de las clases del problema de asignación.
+    :param aulas: Los datos de las aulas disponibles.
+    :param aulas_actuales: El índice del aula asignada actualmente a cada
+    clase, o `None`.
+    :param semillas: Los índices de las clases desde las que se extiende.
+    :param radio: La cantidad de pasos de la extensión.
+    :param vecinas: Las vecinas de cada clase, si ya se calcularon con
+    `vecinas_de_cada_clase`. Si es `None`, se calculan.
+    :return: Los índices de las clases del vecindario, en orden creciente.
+    '''
+    if vecinas is None:
+        vecinas = vecinas_de_cada_clase(clases, aulas, aulas_actuales)
+
+    en_el_vecindario = set(semillas)
+    frontera = en_el_vecindario
+    for _ in range(radio):
+        frontera = {
+            vecina
+            for i_clase in frontera
+            for vecina in vecinas.get(i_clase, ())
+            if vecina not in en_el_vecindario
+        }
+        en_el_vecindario.update(frontera)
+
+    return sorted(en_el_vecindario)
+
+def subproblema_con_clases_fijas(
+    clases: ClasesPreprocesadas,
+    aulas_actuales: Sequence[int|None],
+    liberadas: Sequence[int]
+) -> ClasesPreprocesadas:
+    '''
+    Armar el problema de asignación de las clases liberadas, donde las demás
+    clases ocupan el aula que tienen asignada.
+
+    :param clases: Los datos de las clases del problema de asignación.
+    :param aulas_actuales: El índice del aula asignada actualmente a cada
+    clase, o `None`. Todas las clases que no se liberan tienen que tener aula.
+    :param liberadas: Los índices de las clases liberadas, en orden creciente.
+    :return: El problema con las clases liberadas.
+    '''
+    problema = subconjunto_de_clases(clases, liberadas)
+
+    conjunto_de_liberadas = set(liberadas)
+    for i_clase, i_aula in enumerate(aulas_actuales):
+        if i_clase not in conjunto_de_liberadas and i_aula is not None:
+            problema.aulas_ocupadas.append((i_aula, clases.clases[i_clase].horario))
+
+    return problema
@@ -0,0 +1,217 @@
+'''
+Benchmarks de la asignación de aulas, con comparación contra una línea de base.
+
+Ejecuta la asignación en varios escenarios sintéticos (ver `generadores.py`),
+mide el tiempo de cada etapa con las métricas de la asignación, escribe los
+resultados en un JSON (por defecto `resultados_del_benchmark.json`, en este
+directorio) y los compara con una línea de base guardada. Si alguna
+etapa tarda más que la línea de base multiplicada por `1 + tolerancia`, se
+informa como regresión y el programa termina con código 1.
+
+Uso, desde la raíz del repositorio:
+
+    PYTHONPATH=src python tests/benchmarks/benchmark.py
+    PYTHONPATH=src python tests/benchmarks/benchmark.py --escenarios base,aulas_dobles
+    PYTHONPATH=src python tests/benchmarks/benchmark.py --actualizar-línea-de-base
+
+Los tiempos dependen de la máquina, así que la línea de base se tiene que
+generar en la misma máquina en la que se comparan los resultados.
+'''
+from dataclasses import asdict, replace
+from pathlib import Path
+import argparse, json, logging, sys
+
+from asignacion_aulica.lógica_de_asignación.asignación import asignar
+from asignacion_aulica.lógica_de_asignación.configuración import ConfiguraciónDelSolver
+from asignacion_aulica.lógica_de_asignación.postprocesamiento import InfoPostAsignación
+
+from generadores import ParámetrosDelBenchmark, generar_carreras, generar_edificios
+
+logger = logging.getLogger(__name__)
+
+DIRECTORIO = Path(__file__).parent.resolve()
+LÍNEA_DE_BASE = DIRECTORIO / 'línea_de_base.json'
+RESULTADOS = DIRECTORIO / 'resultados_del_benchmark.json'
+
+_base = ParámetrosDelBenchmark()
+
+ESCENARIOS: dict[str, ParámetrosDelBenchmark] = {
+    'base': _base,
+    'muchas_clases': replace(_base, n_aulas=60, clases_por_hora=30, n_días=1),
+    'muchas_aulas': replace(_base, n_aulas=120),
+    'clases_superpuestas': replace(_base, n_aulas=50, duración_máxima=3),
+    'muchos_edificios': replace(_base, n_edificios=12),
+    'aulas_dobles': replace(_base, n_aulas_dobles=10),
+    'equipamiento_denso': replace(_base, densidad_de_equipamiento=0.6),
+    'asignaciones_manuales': replace(_base, fracción_de_asignaciones_manuales=0.3),
+    'aulas_intercambiables': replace(_base, n_aulas=60, n_tipos_de_aula=3, clases_por_hora=30, duración_máxima=2, n_días=1),
+    'grande': ParámetrosDelBenchmark(
+        n_edificios=8, n_aulas=100, n_aulas_dobles=10, clases_por_hora=30, duración_máxima=2, n_días=1,
+        densidad_de_equipamiento=0.3, fracción_de_asignaciones_manuales=0.1
+    ),
+}
+'''Los escenarios, donde cada uno cambia una dimensión del escenario base.'''
+
+TOLERANCIA: float = 0.25
+'''Cuánto más lenta que la línea de base puede ser una etapa, relativamente.'''
+
+TIEMPO_MÁXIMO_POR_PROBLEMA: float = 5.0
+'''
+Límite de tiempo del solver para cada problema, para que los escenarios
+grandes terminen aunque no se llegue al óptimo.
+'''
+
+TIEMPO_MÍNIMO: float = 0.02
+'''
+Diferencia mínima en segundos para considerar una regresión, para ignorar el
+ruido en las etapas que tardan muy poco.
+'''
+
+def ejecutar_escenario(
+    parámetros: ParámetrosDelBenchmark,
+    repeticiones: int,
+    hilos: int,
+    tiempo_máximo: float = TIEMPO_MÁXIMO_POR_PROBLEMA
+) -> dict:
+    '''
+    Ejecutar la asignación de un escenario varias veces.
+
+    Los tiempos que se informan son los mínimos entre todas las repeticiones,
+    que son los menos afectados por el ruido de la máquina.
+
+    :param parámetros: Los parámetros del escenario.
+    :param repeticiones: Cantidad de veces que se ejecuta la asignación.
+    :param hilos: Cantidad de problemas que se resuelven en paralelo.
+    :param tiempo_máximo: Límite de tiempo del solver para cada problema.
+    :return: Diccionario con el resultado, para guardar en el JSON.
+    '''
+    configuración = ConfiguraciónDelSolver(
+        hilos=hilos,
+        tiempo_máximo_en_segundos=tiempo_máximo,
+        aceptar_factible=True,
+        usar_asignación_anterior=False
+    )
+    tiempos: dict[str, float] = {}
+    resultado: InfoPostAsignación|None = None
+
+    for _ in range(repeticiones):
+        edificios = generar_edificios(parámetros)
+        carreras = generar_carreras(parámetros, edificios)
+
+        resultado = asignar(edificios, carreras, configuración)
+
+        tiempos_de_esta_vez = dict(resultado.métricas.tiempos)
+        for problema in resultado.métricas.problemas:
+            for etapa, segundos in problema.tiempos.items():
+                nombre = f'problemas.{etapa}'
+                tiempos_de_esta_vez[nombre] = tiempos_de_esta_vez.get(nombre, 0.0) + segundos
+
+        for etapa, segundos in tiempos_de_esta_vez.items():
+            tiempos[etapa] = min(segundos, tiempos.get(etapa, segundos))
+
+    problemas = resultado.métricas.problemas
+    return {
+        'parámetros': asdict(parámetros),
+        'tiempos': tiempos,
+        'problemas': len(problemas),
+        'variables_de_asignación': sum(problema.variables_de_asignación for problema in problemas),
+        'celdas_prohibidas': sum(problema.celdas_prohibidas for problema in problemas),
+        'días_sin_asignar': [día.name for día in resultado.días_sin_asignar],
+        'gap_de_optimalidad': resultado.gap_de_optimalidad,
+    }
+
+def comparar(
+    resultados: dict[str, dict],
+    línea_de_base: dict[str, dict],
+    tolerancia: float = TOLERANCIA,
+    tiempo_mínimo: float = TIEMPO_MÍNIMO
+) -> list[str]:
+    '''
+    Comparar los tiempos de los resultados con los de la línea de base.
+
+    Sólo se comparan los escenarios y las etapas que están en ambos. Los
+    escenarios cuyos parámetros cambiaron no se comparan.
+
+    :param resultados: Los resultados de los escenarios ejecutados.
+    :param línea_de_base: Los resultados guardados en la línea de base.
+    :param tolerancia: Cuánto más lenta puede ser una etapa, relativamente.
+    :param tiempo_mínimo: Diferencia mínima en segundos para considerar que
+    hay una regresión.
+    :return: Un mensaje por cada regresión encontrada.
+    '''
+    regresiones: list[str] = []
+    for escenario, resultado in resultados.items():
+        base = línea_de_base.get(escenario)
+        if base is None or base['parámetros'] != resultado['parámetros']:
+            continue
+
+        for etapa, segundos in resultado['tiempos'].items():
+            segundos_base = base['tiempos'].get(etapa)
+            if segundos_base is None:
+                continue
+
+            if segundos > segundos_base * (1 + tolerancia) and segundos - segundos_base > tiempo_mínimo:
+                regresiones.append(
+                    f'{escenario}: {etapa} tardó {segundos:.3f} s, '
+                    f'la línea de base es {segundos_base:.3f} s '
+                    f'({100 * (segundos / segundos_base - 1):+.0f}%)'
+                )
+
+        if not set(resultado['días_sin_asignar']) <= set(base['días_sin_asignar']):
+            regresiones.append(
+                f'{escenario}: días sin asignar {resultado["días_sin_asignar"]}, '
+                f'en la línea de base eran {base["días_sin_asignar"]}'
+            )
+
+    return regresiones
+
+def main(argumentos: list[str]|None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--escenarios', default=','.join(ESCENARIOS),
+                        help='Nombres de los escenarios a ejecutar, separados por comas.')
+    parser.add_argument('--repeticiones', type=int, default=3,
+                        help='Cantidad de veces que se ejecuta cada escenario.')
+    parser.add_argument('--hilos', type=int, default=1,
+                        help='Cantidad de problemas que se resuelven en paralelo.')
+    parser.add_argument('--tiempo-máximo', type=float, default=TIEMPO_MÁXIMO_POR_PROBLEMA,
+                        help='Límite de tiempo del solver para cada problema, en segundos.')
+    parser.add_argument('--salida', type=Path, default=RESULTADOS,
+                        help='Archivo donde escribir los resultados.')
+    parser.add_argument('--línea-de-base', type=Path, default=LÍNEA_DE_BASE,
+                        help='Archivo con la línea de base con la que comparar.')
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA,
+                        help='Cuánto más lenta que la línea de base puede ser una etapa, relativamente.')
+    parser.add_argument('--actualizar-línea-de-base', action='store_true',
+                        help='Guardar los resultados como la nueva línea de base.')
+    args = parser.parse_args(argumentos)
+
+    resultados: dict[str, dict] = {}
+    for escenario in args.escenarios.split(','):
+        if escenario not in ESCENARIOS:
+            parser.error(f'No existe el escenario {escenario}.')
+        resultados[escenario] = ejecutar_escenario(
+            ESCENARIOS[escenario], args.repeticiones, args.hilos, args.tiempo_máximo
+        )
+        print(f'{escenario}: {resultados[escenario]["tiempos"]["total"]:.3f} s')
+
+    args.salida.write_text(json.dumps(resultados, ensure_ascii=False, indent=2), encoding='utf-8')
+
+    if args.actualizar_línea_de_base:
+        línea_de_base = json.loads(args.línea_de_base.read_text(encoding='utf-8')) if args.línea_de_base.exists() else {}
+        línea_de_base.update(resultados)
+        args.línea_de_base.write_text(json.dumps(línea_de_base, ensure_ascii=False, indent=2), encoding='utf-8')
+        return 0
+
+    if not args.línea_de_base.exists():
+        print('No hay línea de base con la que comparar.')
+        return 0
+
+    línea_de_base = json.loads(args.línea_de_base.read_text(encoding='utf-8'))
+    regresiones = comparar(resultados, línea_de_base, args.tolerancia)
+    for regresión in regresiones:
+        print('REGRESIÓN', regresión)
+
+    return 1 if regresiones else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,186 @@
+'''
+Generadores de datos sintéticos para los benchmarks de la asignación.
+
+Los datos se generan pseudo-aleatoriamente con una semilla fija, así que los
+mismos parámetros siempre generan los mismos edificios y clases. Cada
+dimensión del problema (clases, aulas, edificios, aulas dobles, equipamiento
+y asignaciones manuales) se controla con un parámetro independiente.
+'''
+from dataclasses import dataclass
+from datetime import time
+import random
+
+from asignacion_aulica.gestor_de_datos.días_y_horarios import Día, RangoHorario
+from asignacion_aulica.gestor_de_datos.entidades import (
+    Aula,
+    AulaDoble,
+    Carrera,
+    Carreras,
+    Clase,
+    Edificio,
+    Edificios,
+    Materia
+)
+
+@dataclass
+class ParámetrosDelBenchmark:
+    '''
+    Parámetros de un escenario de benchmark.
+    '''
+    # Cantidad de edificios. Las aulas se reparten entre los edificios.
+    n_edificios: int = 3
+
+    # Cantidad de aulas simples (sin contar las de las aulas dobles).
+    n_aulas: int = 40
+
+    # Cantidad de aulas dobles. Cada una agrega tres aulas: la grande y sus
+    # dos hijas.
+    n_aulas_dobles: int = 0
+
+    # Capacidad máxima exclusiva de las aulas simples.
+    capacidad_máxima: int = 100
+
+    # Si es mayor a 0, las aulas simples se eligen entre esta cantidad de
+    # tipos de aula (capacidad y equipamiento), así que hay muchas aulas
+    # intercambiables entre sí.
+    n_tipos_de_aula: int = 0
+
+    # Cantidad de clases que empiezan en cada hora de cada día.
+    clases_por_hora: int = 10
+
+    # Duración máxima de las clases, en horas. Las clases de una hora no se
+    # superponen con las de otras horas, así que cada hora es un problema
+    # independiente. Con clases más largas los problemas son más grandes, y
+    # para que la asignación sea posible tiene que haber más aulas que
+    # `clases_por_hora`.
+    duración_máxima: int = 1
+
+    # Cantidad máxima exclusiva de alumnos de las clases.
+    alumnos_máximo: int = 100
+
+    # Cantidad de días con clases, empezando por el lunes.
+    n_días: int = 2
+
+    # Cantidad de tipos de equipamiento distintos.
+    n_equipamientos: int = 4
+
+    # Probabilidad de que un aula tenga cada tipo de equipamiento, y de que
+    # una clase necesite equipamiento. El equipamiento que necesita una clase
+    # es parte del de un aula elegida al azar, para que siempre haya alguna
+    # aula que lo tenga.
+    densidad_de_equipamiento: float = 0.2
+
+    # Fracción de las clases que tienen un aula asignada manualmente.
+    fracción_de_asignaciones_manuales: float = 0.0
+
+    # La semilla del generador de números pseudo-aleatorios.
+    semilla: int = 0
+
+def generar_edificios(parámetros: ParámetrosDelBenchmark) -> Edificios:
+    '''
+    Generar los edificios y las aulas de un escenario.
+
+    :param parámetros: Los parámetros del escenario.
+    :return: Los edificios generados.
+    '''
+    rng = random.Random(parámetros.semilla)
+    equipamientos = [f'equipamiento {i}' for i in range(parámetros.n_equipamientos)]
+    edificios = [Edificio(nombre=f'edificio {i}') for i in range(parámetros.n_edificios)]
+
+    def equipamiento_aleatorio() -> set[str]:
+        return {
+            equipamiento
+            for equipamiento in equipamientos
+            if rng.random() < parámetros.densidad_de_equipamiento
+        }
+
+    tipos_de_aula = [
+        (rng.randrange(1, parámetros.capacidad_máxima), equipamiento_aleatorio())
+        for _ in range(parámetros.n_tipos_de_aula)
+    ]
+
+    for i_aula in range(parámetros.n_aulas):
+        edificio = edificios[i_aula % len(edificios)]
+        if tipos_de_aula:
+            capacidad, equipamiento = rng.choice(tipos_de_aula)
+        else:
+            capacidad, equipamiento = rng.randrange(1, parámetros.capacidad_máxima), equipamiento_aleatorio()
+        edificio.aulas.append(Aula(
+            nombre=f'aula {i_aula}',
+            edificio=edificio,
+            capacidad=capacidad,
+            equipamiento=set(equipamiento)
+        ))
+
+    for i_doble in range(parámetros.n_aulas_dobles):
+        edificio = edificios[i_doble % len(edificios)]
+        equipamiento = equipamiento_aleatorio()
+        hijas = [
+            Aula(
+                nombre=f'aula {i_doble}{letra}',
+                edificio=edificio,
+                capacidad=rng.randrange(1, parámetros.capacidad_máxima),
+                equipamiento=set(equipamiento)
+            )
+            for letra in 'ab'
+        ]
+        grande = Aula(
+            nombre=f'aula doble {i_doble}',
+            edificio=edificio,
+            capacidad=hijas[0].capacidad + hijas[1].capacidad,
+            equipamiento=set(equipamiento)
+        )
+        edificio.aulas.extend((grande, *hijas))
+        edificio.aulas_dobles.append(AulaDoble(grande, *hijas))
+
+    return edificios
+
+def generar_carreras(parámetros: ParámetrosDelBenchmark, edificios: Edificios) -> Carreras:
+    '''
+    Generar las carreras y las clases de un escenario.
+
+    Hay una carrera por edificio, que lo prefiere. Las clases empiezan entre
+    las 8 y las 21 hs, y duran entre una hora y la duración máxima.
+
+    Las clases con asignación manual se asignan a aulas distintas dentro de
+    cada hora de inicio, para que no se superpongan entre sí.
+
+    :param parámetros: Los parámetros del escenario.
+    :param edificios: Los edificios generados con `generar_edificios`.
+    :return: Las carreras generadas.
+    '''
+    rng = random.Random(parámetros.semilla + 1)
+    todas_las_aulas = [aula for edificio in edificios for aula in edificio.aulas]
+
+    def equipamiento_necesario() -> set[str]:
+        if rng.random() >= parámetros.densidad_de_equipamiento:
+            return set()
+        aula = rng.choice(todas_las_aulas)
+        return {equipamiento for equipamiento in sorted(aula.equipamiento) if rng.random() < 0.5}
+
+    carreras: list[Carrera] = []
+    for edificio in edificios:
+        carrera = Carrera(nombre=f'carrera de {edificio.nombre}', edificio_preferido=edificio)
+        carrera.materias.append(Materia(nombre=f'materia de {edificio.nombre}', carrera=carrera, año=1))
+        carreras.append(carrera)
+
+    for día in list(Día)[:parámetros.n_días]:
+        for hora in range(8, 22):
+            aulas_manuales = iter(rng.sample(todas_las_aulas, min(len(todas_las_aulas), parámetros.clases_por_hora)))
+            for _ in range(parámetros.clases_por_hora):
+                materia = rng.choice(carreras).materias[0]
+                duración = rng.randint(1, parámetros.duración_máxima)
+                clase = Clase(
+                    materia=materia,
+                    día=día,
+                    horario=RangoHorario(time(hora), time(min(23, hora + duración))),
+                    virtual=False,
+                    cantidad_de_alumnos=rng.randrange(1, parámetros.alumnos_máximo),
+                    equipamiento_necesario=equipamiento_necesario()
+                )
+                if rng.random() < parámetros.fracción_de_asignaciones_manuales:
+                    clase.aula_asignada = next(aulas_manuales, None)
+                    clase.no_cambiar_asignación = clase.aula_asignada is not None
+                materia.clases.append(clase)
+
+    return carreras
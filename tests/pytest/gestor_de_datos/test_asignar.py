@@ -28,3 +28,23 @@ def test_asignar(gestor: GestorDeDatos):
 
     assert info.todo_ok()
     assert clase.aula_asignada is not None
+
+def test_asignar_solo_cambios(gestor: GestorDeDatos):
+    gestor.agregar_edificio()
+    gestor.agregar_aula(0)
+    gestor.agregar_carrera('0')
+    gestor.agregar_materia(0)
+    gestor.agregar_clase(0, 0)
+    clase: Clase = gestor.get_clase(0, 0, 0)
+    clase.día = Día.Martes
+
+    info = gestor.asignar_aulas(solo_cambios=True)
+    assert info.todo_ok()
+    assert info.días_sin_cambios == []
+
+    info = gestor.asignar_aulas(solo_cambios=True)
+    assert info.días_sin_cambios == list(Día)
+
+    clase.horario = RangoHorario(time(14), time(16))
+    info = gestor.asignar_aulas(solo_cambios=True)
+    assert info.días_sin_cambios == [día for día in Día if día != Día.Martes]
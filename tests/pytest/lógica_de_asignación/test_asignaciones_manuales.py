@@ -1,7 +1,13 @@
 from datetime import time
+import numpy as np
 import pytest
 
-from asignacion_aulica.lógica_de_asignación.preprocesamiento import AulasPreprocesadas, ClasesPreprocesadas, ClasesPreprocesadasPorDía
+from asignacion_aulica.lógica_de_asignación.preprocesamiento import (
+    AulasPreprocesadas,
+    ClasesPreprocesadas,
+    ClasesPreprocesadasPorDía,
+    ocupación_por_aula
+)
 from asignacion_aulica.lógica_de_asignación.restricciones import no_asignar_aulas_ocupadas
 from asignacion_aulica.gestor_de_datos.días_y_horarios import RangoHorario, Día
 from asignacion_aulica.gestor_de_datos.entidades import Carreras, Edificios
@@ -43,7 +49,7 @@ def test_asignación_manual_al_aula_doble(
     assert clases_martes.aulas_ocupadas == [(1, RangoHorario(time(20), time(22)))]
 
     # Probar no_asignar_aulas_ocupadas
-    prohibidas = set(no_asignar_aulas_ocupadas(clases_martes, aulas_preprocesadas))
+    prohibidas = set(zip(*np.nonzero(no_asignar_aulas_ocupadas(clases_martes, aulas_preprocesadas))))
     assert (0, 1) in prohibidas
     assert (0, 0) in prohibidas
     assert (0, 2) in prohibidas
@@ -55,6 +61,51 @@ def test_asignación_manual_al_aula_doble(
     assert result.días_sin_asignar == [Día.Martes,]
     
 
+@pytest.mark.edificios(MockEdificio(
+        aulas=(
+            MockAula(nombre='0'),
+            MockAula(nombre='1'),
+            MockAula(nombre='2'),
+        ),
+        aulas_dobles={1: (0, 2)}
+))
+@pytest.mark.clases(
+    MockClase(día=Día.Martes, horario=RangoHorario(time(19), time(23))),
+    MockClase(
+        día=Día.Martes, horario=RangoHorario(time(20), time(22)),
+        no_cambiar_asignación=True, aula_asignada=(0, 0)
+    )
+)
+def test_asignación_manual_a_un_aula_que_compone_un_aula_doble(
+    aulas_preprocesadas: AulasPreprocesadas,
+    clases_preprocesadas: ClasesPreprocesadasPorDía
+):
+    '''
+    Verificar que si se asigna manualmente una de las aulas que componen un
+    aula doble, el aula doble también se bloquea en ese horario.
+    '''
+    prohibidas = set(zip(*np.nonzero(no_asignar_aulas_ocupadas(clases_preprocesadas[Día.Martes], aulas_preprocesadas))))
+    assert prohibidas == {(0, 0), (0, 1)}
+
+@pytest.mark.aulas(MockAula(), MockAula())
+@pytest.mark.clases(
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(10), time(12)), no_cambiar_asignación=True, aula_asignada=(0, 0)),
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(11), time(13)), no_cambiar_asignación=True, aula_asignada=(0, 0)),
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(8), time(9)),   no_cambiar_asignación=True, aula_asignada=(0, 0)),
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(13), time(14)), no_cambiar_asignación=True, aula_asignada=(0, 0)),
+)
+def test_ocupación_por_aula(
+    aulas_preprocesadas: AulasPreprocesadas,
+    clases_preprocesadas: ClasesPreprocesadasPorDía
+):
+    ocupación = ocupación_por_aula(clases_preprocesadas[Día.Lunes], aulas_preprocesadas)
+
+    # Se unen los intervalos que se superponen, pero no los que se tocan
+    assert list(ocupación) == [0]
+    inicios, fines = ocupación[0]
+    assert inicios.tolist() == [8*60, 10*60, 13*60]
+    assert fines.tolist() == [9*60, 13*60, 14*60]
+
 @pytest.mark.aulas(MockAula(), MockAula())
 @pytest.mark.clases(
     MockClase(
@@ -78,7 +129,7 @@ def test_dos_clases_al_mismo_tiempo_con_una_asignación_manual(
     assert clases_lunes.aulas_ocupadas == [(0, RangoHorario(time(10), time(13)))]
     
     # Probar no_asignar_aulas_ocupadas
-    prohibidas = list(no_asignar_aulas_ocupadas(clases_lunes, aulas_preprocesadas))
+    prohibidas = list(zip(*np.nonzero(no_asignar_aulas_ocupadas(clases_lunes, aulas_preprocesadas))))
     assert prohibidas == [(0, 0)]
 
     # Probar asignar
@@ -119,7 +170,7 @@ def test_una_asignación_y_varias_superposiciones(
     assert clases_domingo.aulas_ocupadas == []
     
     # Probar no_asignar_aulas_ocupadas
-    prohibidas = list(no_asignar_aulas_ocupadas(clases_lunes, aulas_preprocesadas))
+    prohibidas = list(zip(*np.nonzero(no_asignar_aulas_ocupadas(clases_lunes, aulas_preprocesadas))))
     assert prohibidas == [(0, 1), (1, 1), (2, 1), (3, 1)]
 
     # Probar asignar
@@ -167,7 +218,7 @@ def test_varias_asignaciones_y_una_no_asignada(
     assert clases_jueves.aulas_ocupadas == [(2, RangoHorario(time(10), time(13)))]
 
     # Probar no_asignar_aulas_ocupadas
-    prohibidas = list(no_asignar_aulas_ocupadas(clases_martes, aulas_preprocesadas))
+    prohibidas = list(zip(*np.nonzero(no_asignar_aulas_ocupadas(clases_martes, aulas_preprocesadas))))
     assert prohibidas == [(0, 1), (0, 3), (0, 4), (0, 5)]
 
     # Probar asignar
@@ -0,0 +1,89 @@
+from datetime import time
+import pytest
+
+from asignacion_aulica.gestor_de_datos.días_y_horarios import Día, RangoHorario
+from asignacion_aulica.gestor_de_datos.entidades import Carreras, Edificios
+from asignacion_aulica.lógica_de_asignación.asignación import asignar
+from asignacion_aulica.lógica_de_asignación.configuración import ConfiguraciónDelSolver, MotorDeAsignación
+
+from mocks import MockAula, MockClase, MockEdificio
+
+# La heurística pone la primera clase en el aula chica, así que la segunda va
+# a la grande y la tercera no entra en la chica. En el óptimo la primera va a
+# la grande y deja la chica libre para la segunda. La última clase está en
+# otro edificio, así que las tres primeras forman una ventana.
+@pytest.mark.edificios(
+    MockEdificio(aulas=(MockAula(capacidad=30), MockAula(capacidad=40))),
+    MockEdificio(aulas=(MockAula(capacidad=30, equipamiento={'proyector'}),)),
+)
+@pytest.mark.clases(
+    MockClase(cantidad_de_alumnos=30, horario=RangoHorario(time(8), time(10))),
+    MockClase(cantidad_de_alumnos=30, horario=RangoHorario(time(9), time(11))),
+    MockClase(cantidad_de_alumnos=40, horario=RangoHorario(time(10), time(12))),
+    MockClase(cantidad_de_alumnos=30, horario=RangoHorario(time(8), time(12)), equipamiento_necesario={'proyector'}),
+)
+def test_búsqueda_en_vecindarios(edificios: Edificios, carreras: Carreras):
+    clases = carreras[0].materias[0].clases
+    aulas = edificios[0].aulas
+
+    configuración = ConfiguraciónDelSolver(
+        motor=MotorDeAsignación.BÚSQUEDA_EN_VECINDARIOS,
+        máximo_de_clases_por_ventana=3
+    )
+    resultado = asignar(edificios, carreras, configuración)
+    assert resultado.todo_ok()
+    problema = resultado.métricas.problemas[0]
+    assert problema.status == 'BÚSQUEDA_EN_VECINDARIOS'
+    assert problema.ventanas_con_mejora == 1
+
+    # Llega a la misma asignación que el solucionador
+    assert clases[0].aula_asignada is aulas[1]
+    assert clases[1].aula_asignada is aulas[0]
+    assert clases[2].aula_asignada is aulas[1]
+    assert clases[3].aula_asignada is edificios[1].aulas[0]
+
+    # Partiendo de la asignación óptima no hay nada que mejorar
+    resultado = asignar(edificios, carreras, configuración)
+    assert resultado.todo_ok()
+    assert resultado.métricas.problemas[0].ventanas_con_mejora == 0
+    assert clases[0].aula_asignada is aulas[1]
+
+# La heurística deja sin aula a una de las clases de 9 a 11, y para repararla
+# hay que liberar cinco clases.
+@pytest.mark.aulas(
+    MockAula(capacidad=40, equipamiento={'proyector'}),
+    MockAula(capacidad=30, equipamiento={'proyector'}),
+    MockAula(capacidad=40),
+)
+@pytest.mark.clases(
+    MockClase(cantidad_de_alumnos=30, horario=RangoHorario(time(12), time(14)), equipamiento_necesario={'proyector'}),
+    MockClase(cantidad_de_alumnos=40, horario=RangoHorario(time(12), time(13)), equipamiento_necesario={'proyector'}),
+    MockClase(cantidad_de_alumnos=30, horario=RangoHorario(time(8), time(10))),
+    MockClase(cantidad_de_alumnos=30, horario=RangoHorario(time(10), time(13))),
+    MockClase(cantidad_de_alumnos=40, horario=RangoHorario(time(9), time(10))),
+    MockClase(cantidad_de_alumnos=40, horario=RangoHorario(time(9), time(11))),
+)
+def test_reparar_la_asignación_inicial(edificios: Edificios, carreras: Carreras):
+    # Con ventanas de cuatro clases no se puede reparar, y no se resuelve el
+    # problema entero
+    configuración = ConfiguraciónDelSolver(
+        motor=MotorDeAsignación.BÚSQUEDA_EN_VECINDARIOS,
+        máximo_de_clases_por_ventana=4,
+        usar_asignación_anterior=False
+    )
+    resultado = asignar(edificios, carreras, configuración)
+    assert resultado.días_sin_asignar == [Día.Lunes]
+
+    configuración.asignación_parcial = True
+    resultado = asignar(edificios, carreras, configuración)
+    assert resultado.días_sin_asignar == []
+    assert len(resultado.clases_sin_asignar) == 1
+
+    # La heurística prefiere las aulas asignadas actualmente
+    for clase in carreras[0].materias[0].clases:
+        clase.aula_asignada = None
+
+    configuración.máximo_de_clases_por_ventana = 5
+    resultado = asignar(edificios, carreras, configuración)
+    assert resultado.todo_ok()
+    assert resultado.métricas.problemas[0].status == 'BÚSQUEDA_EN_VECINDARIOS'
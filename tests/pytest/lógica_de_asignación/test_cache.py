@@ -0,0 +1,119 @@
+from pathlib import Path
+import os
+import pytest
+
+from asignacion_aulica.gestor_de_datos.días_y_horarios import Día
+from asignacion_aulica.gestor_de_datos.entidades import Carreras, Edificios
+from asignacion_aulica.lógica_de_asignación import cache as módulo_cache
+from asignacion_aulica.lógica_de_asignación.asignación import asignar
+from asignacion_aulica.lógica_de_asignación.cache import CacheDeSoluciones, clave_del_problema
+from asignacion_aulica.lógica_de_asignación.configuración import ConfiguraciónDelSolver, MotorDeAsignación
+from asignacion_aulica.lógica_de_asignación.preprocesamiento import AulasPreprocesadas, preprocesar_clases
+from asignacion_aulica.lógica_de_asignación.progreso import InfoDeProgreso, ProgresoDeLaAsignación
+
+from mocks import MockAula, MockClase
+
+@pytest.mark.aulas(MockAula(capacidad=30), MockAula(capacidad=40))
+@pytest.mark.clases(MockClase(día=Día.Lunes, cantidad_de_alumnos=35))
+def test_clave_del_problema(edificios: Edificios, carreras: Carreras, monkeypatch: pytest.MonkeyPatch):
+    configuración = ConfiguraciónDelSolver()
+    def clave(configuración: ConfiguraciónDelSolver = configuración, cotas_superiores: list[int]|None = None) -> str:
+        aulas = AulasPreprocesadas(edificios)
+        clases = preprocesar_clases(carreras, aulas)
+        return clave_del_problema(clases[Día.Lunes], aulas, configuración, cotas_superiores)
+
+    clave_original = clave()
+    assert clave() == clave_original
+
+    # El aula asignada no cambia la clave
+    carreras[0].materias[0].clases[0].aula_asignada = edificios[0].aulas[1]
+    assert clave() == clave_original
+
+    # Las opciones que cambian el resultado sí
+    assert clave(ConfiguraciónDelSolver(lexicográfico=True)) != clave_original
+    assert clave(ConfiguraciónDelSolver(agrupar_aulas_intercambiables=False)) != clave_original
+    assert clave(ConfiguraciónDelSolver(hilos=4, tiempo_máximo_en_segundos=10)) == clave_original
+
+    # Las cotas con las que se normalizan las penalizaciones también
+    assert clave(cotas_superiores=[1, 2, 3, 4]) != clave_original
+
+    # Los pesos de las penalizaciones también
+    pesos_cambiados = [(2 * peso, función) for peso, función in módulo_cache.todas_las_penalizaciones]
+    monkeypatch.setattr(módulo_cache, 'todas_las_penalizaciones', pesos_cambiados)
+    assert clave() != clave_original
+    monkeypatch.undo()
+
+    # Y los datos de las clases
+    carreras[0].materias[0].clases[0].cantidad_de_alumnos = 25
+    assert clave() != clave_original
+
+def test_guardar_y_obtener(tmp_path: Path):
+    cache = CacheDeSoluciones(tmp_path / 'cache')
+    assert cache.obtener('a') is None
+
+    cache.guardar('a', [1, 0, 2], 3.5, 3.0)
+    guardada = cache.obtener('a')
+    assert guardada['aulas_asignadas'] == [1, 0, 2]
+    assert guardada['penalización'] == 3.5
+    assert guardada['cota_inferior'] == 3.0
+
+    # Una entrada corrupta se ignora
+    (tmp_path / 'cache' / 'b.json').write_text('{', encoding='utf-8')
+    assert cache.obtener('b') is None
+
+def test_desaloja_las_entradas_usadas_menos_recientemente(tmp_path: Path):
+    cache = CacheDeSoluciones(tmp_path, máximo_de_entradas=2)
+    cache.guardar('a', [0], 0, 0)
+    cache.guardar('b', [0], 0, 0)
+    os.utime(tmp_path / 'a.json', (1, 1))
+    os.utime(tmp_path / 'b.json', (2, 2))
+
+    # Leer 'a' lo marca como usado recientemente
+    assert cache.obtener('a') is not None
+    cache.guardar('c', [0], 0, 0)
+
+    assert cache.obtener('a') is not None
+    assert cache.obtener('b') is None
+    assert cache.obtener('c') is not None
+
+@pytest.mark.aulas(MockAula(capacidad=30), MockAula(capacidad=40))
+@pytest.mark.clases(
+    MockClase(día=Día.Lunes, cantidad_de_alumnos=35),
+    MockClase(día=Día.Martes, cantidad_de_alumnos=25),
+)
+def test_asignar_usa_las_soluciones_guardadas(edificios: Edificios, carreras: Carreras, tmp_path: Path):
+    cache = CacheDeSoluciones(tmp_path, guardar_modelos=True)
+    infos: list[InfoDeProgreso] = []
+    progreso = ProgresoDeLaAsignación(infos.append)
+
+    primer_resultado = asignar(edificios, carreras, progreso=progreso, cache=cache)
+    assert primer_resultado.todo_ok()
+    assert {info.día for info in infos} == {Día.Lunes, Día.Martes}
+    assert len(list(tmp_path.glob('*.json'))) == 2
+    assert len(list(tmp_path.glob('*.pb'))) == 2
+
+    # Cambiar sólo el lunes: el martes sale del cache sin resolverse
+    clases = carreras[0].materias[0].clases
+    clases[0].cantidad_de_alumnos = 20
+    clases[1].aula_asignada = None
+    infos.clear()
+    segundo_resultado = asignar(edificios, carreras, progreso=progreso, cache=cache)
+
+    assert segundo_resultado.todo_ok()
+    assert {info.día for info in infos} == {Día.Lunes}
+    assert clases[0].aula_asignada is edificios[0].aulas[0]
+    assert clases[1].aula_asignada is edificios[0].aulas[0]
+
+@pytest.mark.aulas(MockAula(capacidad=30), MockAula(capacidad=40))
+@pytest.mark.clases(MockClase(día=Día.Lunes, cantidad_de_alumnos=35))
+def test_otros_motores_no_usan_el_cache(edificios: Edificios, carreras: Carreras, tmp_path: Path):
+    cache = CacheDeSoluciones(tmp_path)
+    assert asignar(edificios, carreras, cache=cache).todo_ok()
+    assert len(list(tmp_path.glob('*.json'))) == 1
+
+    configuración = ConfiguraciónDelSolver(motor=MotorDeAsignación.HEURÍSTICA)
+    resultado = asignar(edificios, carreras, configuración, cache=cache)
+    assert resultado.todo_ok()
+    problema = resultado.métricas.problemas[0]
+    assert problema.status == 'HEURÍSTICA'
+    assert not problema.desde_cache
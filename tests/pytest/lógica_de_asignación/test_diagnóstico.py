@@ -0,0 +1,78 @@
+from datetime import time
+import pytest
+
+from asignacion_aulica.gestor_de_datos.días_y_horarios import RangoHorario, Día
+from asignacion_aulica.gestor_de_datos.entidades import Carreras, Edificios, todas_las_clases
+from asignacion_aulica.lógica_de_asignación.asignación import asignar
+from asignacion_aulica.lógica_de_asignación.configuración import ConfiguraciónDelSolver
+from asignacion_aulica.lógica_de_asignación.diagnóstico import diagnosticar_infactibilidad
+from asignacion_aulica.lógica_de_asignación.preprocesamiento import AulasPreprocesadas, ClasesPreprocesadasPorDía
+
+from mocks import MockAula, MockClase, MockEdificio
+
+@pytest.mark.aulas(MockAula(), MockAula(), MockAula(equipamiento={'proyector'}))
+@pytest.mark.clases(
+    MockClase(horario=RangoHorario(time(9), time(10)), no_cambiar_asignación=True, aula_asignada=(0, 0)),
+    MockClase(horario=RangoHorario(time(9), time(10)), no_cambiar_asignación=True, aula_asignada=(0, 2)),
+    MockClase(horario=RangoHorario(time(8), time(10))),
+    MockClase(horario=RangoHorario(time(9), time(11))),
+    MockClase(horario=RangoHorario(time(14), time(15))),
+)
+def test_diagnosticar_infactibilidad(
+    edificios: Edificios,
+    carreras: Carreras,
+    aulas_preprocesadas: AulasPreprocesadas,
+    clases_preprocesadas: ClasesPreprocesadasPorDía
+):
+    clases = list(todas_las_clases(carreras))
+    aulas = edificios[0].aulas
+    conflicto = diagnosticar_infactibilidad(clases_preprocesadas[Día.Lunes], aulas_preprocesadas)
+
+    # Las dos clases de la mañana sólo tienen libre el aula 1, porque las
+    # otras están ocupadas. La clase de la tarde no es parte del conflicto.
+    assert conflicto is not None
+    assert conflicto.clases == [clases[2], clases[3]]
+    assert conflicto.aulas == aulas
+    assert conflicto.aulas_ocupadas == [
+        (aulas[0], RangoHorario(time(9), time(10))),
+        (aulas[2], RangoHorario(time(9), time(10))),
+    ]
+
+@pytest.mark.aulas(MockAula(), MockAula())
+@pytest.mark.clases(MockClase(horario=RangoHorario(time(8), time(10))), MockClase(horario=RangoHorario(time(9), time(11))))
+def test_no_hay_conflicto_si_el_problema_tiene_solución(
+    aulas_preprocesadas: AulasPreprocesadas,
+    clases_preprocesadas: ClasesPreprocesadasPorDía
+):
+    assert diagnosticar_infactibilidad(clases_preprocesadas[Día.Lunes], aulas_preprocesadas) is None
+
+@pytest.mark.edificios(MockEdificio(
+    aulas=(
+        MockAula(capacidad=60, equipamiento={'proyector'}),
+        MockAula(capacidad=30),
+        MockAula(capacidad=30),
+    ),
+    aulas_dobles={0: (1, 2)}
+))
+@pytest.mark.clases(
+    MockClase(horario=RangoHorario(time(8), time(10))),
+    MockClase(horario=RangoHorario(time(9), time(11)), equipamiento_necesario={'proyector'}),
+    MockClase(horario=RangoHorario(time(15), time(16))),
+)
+def test_asignar_con_diagnóstico(edificios: Edificios, carreras: Carreras):
+    clases = list(todas_las_clases(carreras))
+
+    # La verificación previa no lo detecta, porque hay tres aulas para dos
+    # clases, pero la clase con proyector necesita el aula doble
+    configuración = ConfiguraciónDelSolver(diagnosticar_infactibilidad=True)
+    resultado = asignar(edificios, carreras, configuración)
+
+    assert resultado.días_sin_asignar == [Día.Lunes]
+    conflicto = resultado.conflictos[Día.Lunes]
+    assert conflicto.clases == clases[:2]
+    assert conflicto.aulas_ocupadas == []
+    assert resultado.motivos_de_días_sin_asignar[Día.Lunes][-1] == conflicto.mensaje()
+
+    # Sin el diagnóstico sólo se informa que falló
+    resultado = asignar(edificios, carreras)
+    assert resultado.conflictos == {}
@@ -0,0 +1,136 @@
+from datetime import time
+import pytest
+
+from asignacion_aulica.gestor_de_datos.días_y_horarios import RangoHorario, Día
+from asignacion_aulica.gestor_de_datos.entidades import Carreras, Edificios
+from asignacion_aulica.lógica_de_asignación.asignación import asignar
+from asignacion_aulica.lógica_de_asignación.configuración import ConfiguraciónDelSolver, MotorDeAsignación
+from asignacion_aulica.lógica_de_asignación.excepciones import AsignaciónImposibleException
+from asignacion_aulica.lógica_de_asignación.heurística import asignar_con_heurística
+from asignacion_aulica.lógica_de_asignación.preprocesamiento import AulasPreprocesadas, ClasesPreprocesadasPorDía
+
+from mocks import MockAula, MockClase, MockEdificio
+
+@pytest.mark.aulas(MockAula(capacidad=50), MockAula(capacidad=30), MockAula(capacidad=40))
+@pytest.mark.clases(
+    MockClase(cantidad_de_alumnos=30, horario=RangoHorario(time(8), time(10))),
+    MockClase(cantidad_de_alumnos=30, horario=RangoHorario(time(9), time(11))),
+    MockClase(cantidad_de_alumnos=30, horario=RangoHorario(time(10), time(12))),
+)
+def test_elige_el_aula_libre_de_menor_costo(
+    aulas_preprocesadas: AulasPreprocesadas,
+    clases_preprocesadas: ClasesPreprocesadasPorDía
+):
+    aulas_asignadas, penalización, cota_inferior = asignar_con_heurística(clases_preprocesadas[Día.Lunes], aulas_preprocesadas)
+
+    # La primera y la última clase no se superponen, así que entran en el aula
+    # más chica. La del medio va a la siguiente más chica.
+    assert aulas_asignadas == [1, 2, 1]
+    assert penalización > 0
+    assert cota_inferior == 0
+
+@pytest.mark.edificios(MockEdificio(
+    aulas=(
+        MockAula(capacidad=60, equipamiento={'proyector'}),
+        MockAula(capacidad=30),
+        MockAula(capacidad=30),
+    ),
+    aulas_dobles={0: (1, 2)}
+))
+@pytest.mark.clases(
+    MockClase(cantidad_de_alumnos=30, horario=RangoHorario(time(8), time(10))),
+    MockClase(cantidad_de_alumnos=60, horario=RangoHorario(time(9), time(11)), equipamiento_necesario={'proyector'}),
+)
+def test_no_usa_un_aula_doble_y_sus_hijas_al_mismo_tiempo(
+    aulas_preprocesadas: AulasPreprocesadas,
+    clases_preprocesadas: ClasesPreprocesadasPorDía
+):
+    # La segunda clase sólo puede ir al aula doble, y entonces la primera no
+    # puede ir a ninguna de las hijas
+    with pytest.raises(AsignaciónImposibleException):
+        asignar_con_heurística(clases_preprocesadas[Día.Lunes], aulas_preprocesadas)
+
+@pytest.mark.aulas(MockAula(capacidad=30, equipamiento={'proyector'}), MockAula(capacidad=30))
+@pytest.mark.clases(
+    MockClase(cantidad_de_alumnos=30, horario=RangoHorario(time(8), time(10))),
+    MockClase(cantidad_de_alumnos=30, horario=RangoHorario(time(9), time(11)), equipamiento_necesario={'proyector'}),
+)
+def test_reintenta_empezando_por_las_clases_más_restringidas(
+    aulas_preprocesadas: AulasPreprocesadas,
+    clases_preprocesadas: ClasesPreprocesadasPorDía
+):
+    aulas_asignadas, penalización, cota_inferior = asignar_con_heurística(clases_preprocesadas[Día.Lunes], aulas_preprocesadas)
+    assert aulas_asignadas == [1, 0]
+    assert penalización == cota_inferior
+
+@pytest.mark.aulas(MockAula(capacidad=30))
+@pytest.mark.clases(
+    MockClase(cantidad_de_alumnos=30, horario=RangoHorario(time(10), time(10))),
+    MockClase(cantidad_de_alumnos=30, horario=RangoHorario(time(10), time(12))),
+    MockClase(cantidad_de_alumnos=30, horario=RangoHorario(time(11), time(13))),
+)
+def test_no_superpone_clases_con_una_clase_de_0_minutos(
+    aulas_preprocesadas: AulasPreprocesadas,
+    clases_preprocesadas: ClasesPreprocesadasPorDía
+):
+    # La clase de 0 minutos no se superpone con la que empieza a la misma
+    # hora, pero la última sí se superpone con esa
+    aulas_asignadas, _, _ = asignar_con_heurística(clases_preprocesadas[Día.Lunes], aulas_preprocesadas, asignación_parcial=True)
+    assert aulas_asignadas == [0, 0, None]
+
+@pytest.mark.aulas(MockAula(capacidad=30), MockAula(capacidad=30), MockAula(capacidad=60))
+@pytest.mark.clases(
+    MockClase(cantidad_de_alumnos=30, horario=RangoHorario(time(8), time(10)), aula_asignada=(0, 1)),
+    MockClase(cantidad_de_alumnos=30, horario=RangoHorario(time(8), time(10))),
+    MockClase(cantidad_de_alumnos=30, horario=RangoHorario(time(12), time(14)), día=Día.Martes),
+)
+def test_asignar_con_heurística(edificios: Edificios, carreras: Carreras):
+    resultado = asignar(edificios, carreras, ConfiguraciónDelSolver(motor=MotorDeAsignación.HEURÍSTICA))
+    assert resultado.todo_ok()
+    assert all(problema.status == 'HEURÍSTICA' for problema in resultado.métricas.problemas)
+
+    # Con el mismo costo conserva el aula asignada
+    clases = carreras[0].materias[0].clases
+    aulas = edificios[0].aulas
+    assert clases[0].aula_asignada is aulas[1]
+    assert clases[1].aula_asignada is aulas[0]
+    assert clases[2].aula_asignada is aulas[0]
+
+    # La heurística llega a la misma penalización que el solucionador
+    resultado_del_solver = asignar(edificios, carreras)
+    assert resultado_del_solver.todo_ok()
+    assert (
+        sum(problema.gap for problema in resultado.métricas.problemas)
+        == sum(problema.gap for problema in resultado_del_solver.métricas.problemas)
+        == 0
+    )
+
+@pytest.mark.aulas(MockAula(capacidad=30), MockAula(capacidad=40))
+@pytest.mark.clases(
+    MockClase(cantidad_de_alumnos=30, horario=RangoHorario(time(8), time(10))),
+    MockClase(cantidad_de_alumnos=40, horario=RangoHorario(time(9), time(11))),
+)
+def test_heurística_si_falla_el_solucionador(edificios: Edificios, carreras: Carreras):
+    # Sin tiempo, el solucionador no llega a encontrar una solución
+    configuración = ConfiguraciónDelSolver(tiempo_máximo_en_segundos=0, usar_asignación_anterior=False)
+    resultado = asignar(edificios, carreras, configuración)
+    assert resultado.días_sin_asignar == [Día.Lunes]
+
+    configuración.usar_heurística_si_falla = True
+    resultado = asignar(edificios, carreras, configuración)
+    assert resultado.todo_ok()
+    assert resultado.métricas.problemas[0].status == 'HEURÍSTICA'
+
+@pytest.mark.aulas(MockAula(capacidad=30), MockAula(capacidad=40))
+@pytest.mark.clases(
+    MockClase(cantidad_de_alumnos=40, horario=RangoHorario(time(8), time(10))),
+    MockClase(cantidad_de_alumnos=30, horario=RangoHorario(time(9), time(11))),
+)
+def test_pistas_de_la_heurística(edificios: Edificios, carreras: Carreras):
+    resultado = asignar(edificios, carreras, ConfiguraciónDelSolver(pistas_de_la_heurística=True))
+    assert resultado.todo_ok()
+    assert 'pistas' in resultado.métricas.problemas[0].tiempos
+
+    clases = carreras[0].materias[0].clases
+    assert clases[0].aula_asignada is edificios[0].aulas[1]
+    assert clases[1].aula_asignada is edificios[0].aulas[0]
@@ -1,9 +1,17 @@
+from ortools.sat.python import cp_model
+import json, os
+from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import time
 import pytest
 
 from asignacion_aulica.gestor_de_datos.días_y_horarios import RangoHorario, Día
 from asignacion_aulica.gestor_de_datos.entidades import Carreras, Edificios
-from asignacion_aulica.lógica_de_asignación.asignación import asignar
+from asignacion_aulica.lógica_de_asignación.asignación import agregar_pistas, asignar, workers_por_problema
+from asignacion_aulica.lógica_de_asignación.configuración import ConfiguraciónDelSolver, MotorDeAsignación
+from asignacion_aulica.lógica_de_asignación.matriz_de_asignaciones import MatrizDeAsignaciones
+from asignacion_aulica.lógica_de_asignación.preprocesamiento import AulasPreprocesadas, ClasesPreprocesadasPorDía
+from asignacion_aulica.lógica_de_asignación.progreso import InfoDeProgreso, ProgresoDeLaAsignación
 
 from mocks import MockAula, MockClase, MockEdificio
 
@@ -26,12 +34,13 @@ def test_no_hay_edificios(edificios: Edificios, carreras: Carreras):
     MockClase(día=Día.Miércoles, cantidad_de_alumnos=56),
     MockClase(día=Día.Miércoles, cantidad_de_alumnos=55),
 )
-def test_restricciones_y_preferencias(edificios: Edificios, carreras: Carreras):
+@pytest.mark.parametrize('lexicográfico', (False, True))
+def test_restricciones_y_preferencias(edificios: Edificios, carreras: Carreras, lexicográfico: bool):
     '''
     Verifica que las restricciones tienen prioridad sobre las preferencias,
     y las penalizaciones son minimizadas.
     '''
-    resultado = asignar(edificios, carreras)
+    resultado = asignar(edificios, carreras, ConfiguraciónDelSolver(lexicográfico=lexicográfico))
     assert not resultado.todo_ok()
 
     assert carreras[0].materias[0].clases[0].aula_asignada == edificios[0].aulas[1]
@@ -110,6 +119,12 @@ def test_asignación_imposible_por_solapamiento_inevitable(edificios: Edificios,
     assert not resultado.todo_ok()
     assert resultado.días_sin_asignar == [Día.Lunes]
 
+    # Se descarta sin resolver el modelo, indicando el horario del problema
+    assert resultado.métricas.problemas == []
+    assert resultado.motivos_de_días_sin_asignar == {
+        Día.Lunes: ['El Lunes entre las 09:00 y las 10:00 hay 2 clases, pero sólo 1 aulas disponibles para ellas.']
+    }
+
 @pytest.mark.aulas( MockAula(horario_viernes=RangoHorario(time(8), time(23))) )
 @pytest.mark.clases( MockClase(horario=RangoHorario(time(7), time(9)), día=Día.Viernes) )
 def test_asignación_imposible_por_aula_que_abre_más_tarde(edificios: Edificios, carreras: Carreras):
@@ -148,8 +163,9 @@ def test_asignación_imposible_por_equipamiento_y_capacidad(edificios: Edificios
     MockClase(cantidad_de_alumnos=23),
     MockClase(cantidad_de_alumnos=2)
 )
-def test_evita_edificios_no_deseables(edificios: Edificios, carreras: Carreras):
-    resultado = asignar(edificios, carreras)
+@pytest.mark.parametrize('lexicográfico', (False, True))
+def test_evita_edificios_no_deseables(edificios: Edificios, carreras: Carreras, lexicográfico: bool):
+    resultado = asignar(edificios, carreras, ConfiguraciónDelSolver(lexicográfico=lexicográfico))
     assert resultado.todo_ok()
 
     # Debería minimizar el uso de edificios no deseables poniendo las dos
@@ -157,3 +173,332 @@ def test_evita_edificios_no_deseables(edificios: Edificios, carreras: Carreras):
     assert carreras[0].materias[0].clases[2].aula_asignada.edificio.nombre == 'el que preferimos no usar'
     assert carreras[0].materias[0].clases[1].aula_asignada.edificio.nombre == 'el otro'
     assert carreras[0].materias[0].clases[0].aula_asignada.edificio.nombre == 'el otro'
+
+@pytest.mark.aulas(
+    MockAula(capacidad=60),
+    MockAula(capacidad=40, equipamiento={"proyector"}),
+)
+@pytest.mark.clases(
+    MockClase(día=Día.Lunes, cantidad_de_alumnos=70, equipamiento_necesario={"proyector"}),
+    MockClase(día=Día.Lunes, cantidad_de_alumnos=50),
+    MockClase(día=Día.Martes, horario=RangoHorario(time(8), time(10))),
+    MockClase(día=Día.Martes, horario=RangoHorario(time(9), time(11))),
+    MockClase(día=Día.Martes, horario=RangoHorario(time(9), time(11))),
+    MockClase(día=Día.Miércoles, cantidad_de_alumnos=56),
+    MockClase(día=Día.Miércoles, cantidad_de_alumnos=55),
+)
+def test_asignación_en_paralelo_da_el_mismo_resultado(edificios: Edificios, carreras: Carreras):
+    clases = carreras[0].materias[0].clases
+
+    resultado_secuencial = asignar(edificios, carreras, ConfiguraciónDelSolver(hilos=1))
+    aulas_secuencial = [clase.aula_asignada for clase in clases]
+    for clase in clases:
+        clase.aula_asignada = None
+
+    resultado_paralelo = asignar(edificios, carreras, ConfiguraciónDelSolver(hilos=len(Día)))
+    aulas_paralelo = [clase.aula_asignada for clase in clases]
+
+    assert resultado_paralelo.días_sin_asignar == resultado_secuencial.días_sin_asignar == [Día.Martes]
+    assert all(aula is not None for aula in aulas_paralelo[:2] + aulas_paralelo[5:])
+    assert aulas_paralelo == aulas_secuencial
+
+def test_workers_por_problema(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(os, 'cpu_count', lambda: 16)
+
+    # Con varios hilos se reparten los procesadores, salvo que se fije la
+    # cantidad de workers
+    assert workers_por_problema(ConfiguraciónDelSolver()) == 0
+    assert workers_por_problema(ConfiguraciónDelSolver(hilos=4)) == 4
+    assert workers_por_problema(ConfiguraciónDelSolver(hilos=len(Día))) == 2
+    assert workers_por_problema(ConfiguraciónDelSolver(hilos=32)) == 1
+    assert workers_por_problema(ConfiguraciónDelSolver(hilos=4, workers_por_problema=8)) == 8
+
+@pytest.mark.aulas(MockAula())
+@pytest.mark.clases(MockClase())
+def test_hilos_inválidos(edificios: Edificios, carreras: Carreras):
+    with pytest.raises(ValueError):
+        asignar(edificios, carreras, ConfiguraciónDelSolver(hilos=0))
+
+@pytest.mark.aulas(MockAula(capacidad=30), MockAula(capacidad=30, equipamiento={'proyector'}))
+@pytest.mark.clases(
+    MockClase(cantidad_de_alumnos=30, equipamiento_necesario={'proyector'}, aula_asignada=(0, 0)),
+    MockClase(cantidad_de_alumnos=30, aula_asignada=(0, 0)),
+)
+@pytest.mark.parametrize('reparar_pistas', (False, True))
+def test_asignación_anterior_inválida(edificios: Edificios, carreras: Carreras, reparar_pistas: bool):
+    resultado = asignar(edificios, carreras, ConfiguraciónDelSolver(reparar_pistas=reparar_pistas))
+    assert resultado.todo_ok()
+
+    clases = carreras[0].materias[0].clases
+    assert clases[0].aula_asignada is edificios[0].aulas[1]
+    assert clases[1].aula_asignada is edificios[0].aulas[0]
+
+@pytest.mark.aulas(MockAula(), MockAula(), MockAula())
+@pytest.mark.clases(
+    MockClase(aula_asignada=(0, 2)),
+    MockClase(),
+)
+def test_pistas_de_la_asignación_anterior(
+    aulas_preprocesadas: AulasPreprocesadas,
+    clases_preprocesadas: ClasesPreprocesadasPorDía,
+    modelo: cp_model.CpModel,
+    asignaciones: MatrizDeAsignaciones
+):
+    agregar_pistas(clases_preprocesadas[Día.Lunes], aulas_preprocesadas, modelo, asignaciones)
+
+    # Sólo la primera clase tiene pistas: está en el aula 2 y en ninguna otra
+    pistas = modelo.proto.solution_hint
+    assert dict(zip(pistas.vars, pistas.values)) == {
+        asignaciones[0, 0].index: 0,
+        asignaciones[0, 1].index: 0,
+        asignaciones[0, 2].index: 1
+    }
+
+@pytest.mark.aulas(MockAula(capacidad=30), MockAula(capacidad=40))
+@pytest.mark.clases(
+    MockClase(día=Día.Lunes, cantidad_de_alumnos=30),
+    MockClase(día=Día.Martes, cantidad_de_alumnos=30),
+    MockClase(día=Día.Martes, cantidad_de_alumnos=40),
+)
+def test_sólo_resuelve_los_días_que_cambiaron(edificios: Edificios, carreras: Carreras):
+    clases = carreras[0].materias[0].clases
+
+    primer_resultado = asignar(edificios, carreras)
+    assert primer_resultado.todo_ok()
+    assert primer_resultado.días_sin_cambios == []
+    assert set(primer_resultado.firmas) == set(Día)
+
+    # Sin cambios no se resuelve nada
+    segundo_resultado = asignar(edificios, carreras, firmas_anteriores=primer_resultado.firmas)
+    assert segundo_resultado.días_sin_cambios == list(Día)
+    assert segundo_resultado.firmas == primer_resultado.firmas
+
+    # Cambiar una clase del martes
+    clases[1].cantidad_de_alumnos = 40
+    clases[2].cantidad_de_alumnos = 30
+    tercer_resultado = asignar(edificios, carreras, firmas_anteriores=segundo_resultado.firmas)
+    assert Día.Martes not in tercer_resultado.días_sin_cambios
+    assert Día.Lunes in tercer_resultado.días_sin_cambios
+    assert clases[1].aula_asignada is edificios[0].aulas[1]
+    assert clases[2].aula_asignada is edificios[0].aulas[0]
+    assert tercer_resultado.firmas[Día.Lunes] == primer_resultado.firmas[Día.Lunes]
+    assert tercer_resultado.firmas[Día.Martes] != primer_resultado.firmas[Día.Martes]
+
+@pytest.mark.aulas(MockAula(capacidad=30), MockAula(capacidad=40))
+@pytest.mark.clases(
+    MockClase(cantidad_de_alumnos=35),
+    MockClase(cantidad_de_alumnos=25),
+)
+@pytest.mark.parametrize('configuración', (
+    ConfiguraciónDelSolver(),
+    ConfiguraciónDelSolver(workers_por_problema=1, tiempo_máximo_en_segundos=10),
+    ConfiguraciónDelSolver(gap_relativo_máximo=0.5, aceptar_factible=True),
+    ConfiguraciónDelSolver(lexicográfico=True),
+    ConfiguraciónDelSolver(lexicográfico=True, tiempo_máximo_en_segundos=10, aceptar_factible=True),
+))
+def test_configuración_del_solver(edificios: Edificios, carreras: Carreras, configuración: ConfiguraciónDelSolver):
+    resultado = asignar(edificios, carreras, configuración)
+    assert resultado.todo_ok()
+    assert 0 <= resultado.gap_de_optimalidad <= configuración.gap_relativo_máximo
+
+@pytest.mark.aulas(*(MockAula(capacidad=capacidad) for capacidad in range(10, 200, 10)))
+@pytest.mark.clases(*(
+    MockClase(cantidad_de_alumnos=alumnos, horario=RangoHorario(time(8 + i % 3), time(10 + i % 3)))
+    for i, alumnos in enumerate(range(15, 200, 7))
+))
+def test_sin_tiempo_para_llegar_al_óptimo(edificios: Edificios, carreras: Carreras):
+    # Sin aceptar soluciones factibles, si no llega al óptimo falla
+    configuración = ConfiguraciónDelSolver(tiempo_máximo_en_segundos=0.0, workers_por_problema=1)
+    resultado = asignar(edificios, carreras, configuración)
+    assert resultado.días_sin_asignar == [Día.Lunes]
+
+    # Con tiempo sí llega
+    resultado = asignar(edificios, carreras)
+    assert resultado.días_sin_asignar == []
+
+@pytest.mark.aulas(MockAula(capacidad=30), MockAula(capacidad=40))
+@pytest.mark.clases(
+    MockClase(día=Día.Lunes, cantidad_de_alumnos=35),
+    MockClase(día=Día.Martes, cantidad_de_alumnos=25),
+)
+def test_informa_el_progreso(edificios: Edificios, carreras: Carreras):
+    infos: list[InfoDeProgreso] = []
+    resultado = asignar(edificios, carreras, progreso=ProgresoDeLaAsignación(infos.append))
+
+    assert resultado.todo_ok()
+    assert {info.día for info in infos} == {Día.Lunes, Día.Martes}
+    assert all(info.cota_inferior <= info.penalización and info.segundos >= 0 for info in infos)
+
+@pytest.mark.aulas(MockAula())
+@pytest.mark.clases(MockClase(día=Día.Lunes))
+def test_asignación_cancelada(edificios: Edificios, carreras: Carreras):
+    progreso = ProgresoDeLaAsignación()
+    progreso.cancelar()
+    resultado = asignar(edificios, carreras, progreso=progreso)
+
+    assert resultado.cancelada
+    assert not resultado.todo_ok()
+    assert resultado.días_sin_asignar == [Día.Lunes]
+    assert carreras[0].materias[0].clases[0].aula_asignada is None
+
+class _ProgresoQueSeCancelaAlRegistrarElSolver(ProgresoDeLaAsignación):
+    @contextmanager
+    def resolviendo(self, solver: cp_model.CpSolver) -> Iterator[None]:
+        with super().resolviendo(solver):
+            self.cancelar()
+            yield
+
+@pytest.mark.aulas(MockAula())
+@pytest.mark.clases(MockClase(día=Día.Lunes))
+@pytest.mark.parametrize('lexicográfico', (False, True))
+def test_cancelar_antes_de_empezar_a_resolver(edificios: Edificios, carreras: Carreras, lexicográfico: bool):
+    # La cancelación llega cuando el solver ya está registrado, pero todavía
+    # no empezó a resolver
+    progreso = _ProgresoQueSeCancelaAlRegistrarElSolver()
+    resultado = asignar(edificios, carreras, ConfiguraciónDelSolver(lexicográfico=lexicográfico), progreso=progreso)
+
+    assert resultado.cancelada
+    assert resultado.días_sin_asignar == [Día.Lunes]
+    assert resultado.métricas.problemas == []
+
+@pytest.mark.aulas(*(MockAula(capacidad=capacidad) for capacidad in range(10, 200, 10)))
+@pytest.mark.clases(*(
+    MockClase(cantidad_de_alumnos=alumnos, horario=RangoHorario(time(8 + i % 3), time(10 + i % 3)))
+    for i, alumnos in enumerate(range(15, 200, 7))
+))
+def test_cancelar_conserva_la_mejor_solución(edificios: Edificios, carreras: Carreras):
+    # Cancelar apenas se encuentra la primera solución
+    progreso = ProgresoDeLaAsignación(lambda info: progreso.cancelar())
+    resultado = asignar(edificios, carreras, ConfiguraciónDelSolver(workers_por_problema=1), progreso=progreso)
+
+    assert resultado.cancelada
+    assert resultado.días_sin_asignar == []
+    assert all(clase.aula_asignada is not None for clase in carreras[0].materias[0].clases)
+
+@pytest.mark.aulas(MockAula(capacidad=30), MockAula(capacidad=40))
+@pytest.mark.clases(
+    MockClase(día=Día.Lunes, cantidad_de_alumnos=35),
+    MockClase(día=Día.Lunes, cantidad_de_alumnos=25),
+    MockClase(día=Día.Jueves, cantidad_de_alumnos=25),
+)
+@pytest.mark.parametrize('lexicográfico', (False, True))
+def test_métricas(edificios: Edificios, carreras: Carreras, lexicográfico: bool):
+    resultado = asignar(edificios, carreras, ConfiguraciónDelSolver(lexicográfico=lexicográfico))
+    métricas = resultado.métricas
+
+    assert {'preprocesamiento', 'resolución', 'postprocesamiento', 'total'} <= set(métricas.tiempos)
+    assert [problema.día for problema in métricas.problemas] == [Día.Lunes, Día.Jueves]
+    assert set(métricas.tiempo_por_día()) == {Día.Lunes, Día.Jueves}
+
+    lunes = métricas.problemas[0]
+    assert lunes.clases == 2 and lunes.aulas == 2
+    assert lunes.variables_de_asignación + lunes.celdas_prohibidas == 4
+    assert set(lunes.restricciones_por_regla) == {'no_superponer_clases', 'no_asignar_aula_doble_y_sus_hijas_al_mismo_tiempo'}
+    assert len(lunes.variables_por_penalización) == 4
+    assert lunes.status == 'OPTIMAL'
+    assert lunes.gap == 0
+
+    datos = json.loads(métricas.a_json())
+    assert datos['problemas'][1]['día'] == 'Jueves'
+
+@pytest.mark.aulas(MockAula(capacidad=30), MockAula(capacidad=30), MockAula(capacidad=30), MockAula(capacidad=50))
+@pytest.mark.clases(
+    MockClase(cantidad_de_alumnos=30, horario=RangoHorario(time(8), time(10))),
+    MockClase(cantidad_de_alumnos=30, horario=RangoHorario(time(8), time(12))),
+    MockClase(cantidad_de_alumnos=30, horario=RangoHorario(time(9), time(10))),
+    MockClase(cantidad_de_alumnos=30, horario=RangoHorario(time(10), time(12)), aula_asignada=(0, 2)),
+    MockClase(cantidad_de_alumnos=30, horario=RangoHorario(time(10), time(12))),
+)
+@pytest.mark.parametrize('lexicográfico', (False, True))
+def test_aulas_intercambiables(edificios: Edificios, carreras: Carreras, lexicográfico: bool):
+    resultado = asignar(edificios, carreras, ConfiguraciónDelSolver(lexicográfico=lexicográfico))
+    assert resultado.todo_ok()
+
+    # Las tres aulas de 30 comparten una columna
+    lunes = resultado.métricas.problemas[0]
+    assert lunes.aulas_agrupadas == 2
+    assert lunes.variables_de_asignación == 5 * 2
+
+    # Las clases se reparten entre aulas concretas sin superponerse, y la que
+    # tenía un aula asignada la conserva
+    clases = carreras[0].materias[0].clases
+    aulas = edificios[0].aulas
+    assert all(clase.aula_asignada in aulas[:3] for clase in clases)
+    assert len({id(clases[i].aula_asignada) for i in (0, 1, 2)}) == 3
+    assert len({id(clases[i].aula_asignada) for i in (1, 3, 4)}) == 3
+    assert clases[3].aula_asignada is aulas[2]
+
+@pytest.mark.aulas(MockAula(capacidad=30), MockAula(capacidad=60))
+@pytest.mark.clases(
+    MockClase(día=Día.Lunes, cantidad_de_alumnos=25, horario=RangoHorario(time(9), time(10))),
+    MockClase(día=Día.Lunes, cantidad_de_alumnos=25, horario=RangoHorario(time(9), time(10))),
+    MockClase(día=Día.Lunes, cantidad_de_alumnos=25, horario=RangoHorario(time(9), time(11))),
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(14), time(15)), equipamiento_necesario={'pizarrón'}),
+    MockClase(día=Día.Martes, horario=RangoHorario(time(10), time(11))),
+)
+@pytest.mark.parametrize('configuración', (
+    ConfiguraciónDelSolver(asignación_parcial=True),
+    ConfiguraciónDelSolver(asignación_parcial=True, lexicográfico=True),
+    ConfiguraciónDelSolver(asignación_parcial=True, motor=MotorDeAsignación.HEURÍSTICA),
+    ConfiguraciónDelSolver(asignación_parcial=True, motor=MotorDeAsignación.BÚSQUEDA_EN_VECINDARIOS, máximo_de_clases_por_ventana=2),
+))
+def test_asignación_parcial(edificios: Edificios, carreras: Carreras, configuración: ConfiguraciónDelSolver):
+    clases = carreras[0].materias[0].clases
+
+    # Sin la asignación parcial no se asigna nada el lunes
+    resultado = asignar(edificios, carreras)
+    assert resultado.días_sin_asignar == [Día.Lunes]
+    assert resultado.clases_sin_asignar == []
+
+    # Con la asignación parcial sólo quedan sin aula una de las tres clases
+    # superpuestas y la que necesita un equipamiento que no hay
+    resultado = asignar(edificios, carreras, configuración)
+    assert not resultado.todo_ok()
+    assert resultado.días_sin_asignar == []
+    assert len(resultado.clases_sin_asignar) == 2
+    assert clases[3] in resultado.clases_sin_asignar
+    assert sum(problema.clases_sin_aula for problema in resultado.métricas.problemas) == 2
+
+    superpuestas_con_aula = [clase for clase in clases[:3] if clase.aula_asignada is not None]
+    assert len(superpuestas_con_aula) == 2
+    assert superpuestas_con_aula[0].aula_asignada is not superpuestas_con_aula[1].aula_asignada
+    assert clases[3].aula_asignada is None
+    assert clases[4].aula_asignada is not None
+
+@pytest.mark.aulas(MockAula())
+@pytest.mark.clases(
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(8), time(10))),
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(9), time(11))),
+)
+def test_asignación_parcial_con_firmas_anteriores(edificios: Edificios, carreras: Carreras):
+    configuración = ConfiguraciónDelSolver(asignación_parcial=True)
+    resultado = asignar(edificios, carreras, configuración)
+    assert len(resultado.clases_sin_asignar) == 1
+    assert Día.Lunes not in resultado.firmas
+
+    # El día con una clase sin aula se vuelve a resolver, y se vuelve a
+    # informar la clase sin aula
+    resultado = asignar(edificios, carreras, configuración, resultado.firmas)
+    assert Día.Lunes not in resultado.días_sin_cambios
+    assert len(resultado.clases_sin_asignar) == 1
+    assert not resultado.todo_ok()
+
+# La primera clase, sola, va al aula grande para no usar el edificio no
+# deseable. Con las otras, que sólo pueden ir al edificio no deseable, la cota
+# de esa penalización es más grande, y en el día entero conviene el aula chica.
+@pytest.mark.edificios(
+    MockEdificio(aulas=(MockAula(capacidad=50),)),
+    MockEdificio(aulas=(MockAula(capacidad=10, equipamiento={'pizarrón'}),), preferir_no_usar=True),
+)
+@pytest.mark.clases(
+    MockClase(cantidad_de_alumnos=10, horario=RangoHorario(time(8), time(9))),
+    *(
+        MockClase(cantidad_de_alumnos=10, horario=RangoHorario(time(hora), time(hora + 1)), equipamiento_necesario={'pizarrón'})
+        for hora in range(10, 21)
+    )
+)
+def test_separar_en_problemas_no_cambia_las_penalizaciones(edificios: Edificios, carreras: Carreras):
+    resultado = asignar(edificios, carreras)
+    assert resultado.todo_ok()
+    assert len(resultado.métricas.problemas) > 1
+    assert carreras[0].materias[0].clases[0].aula_asignada is edificios[1].aulas[0]
@@ -0,0 +1,46 @@
+from ortools.sat.python import cp_model
+import numpy as np
+
+from asignacion_aulica.lógica_de_asignación.matriz_de_asignaciones import MatrizDeAsignaciones
+
+def test_sólo_crea_variables_en_las_celdas_permitidas():
+    permitidas = np.array([
+        [True,  False, True ],
+        [False, False, False],
+        [False, True,  True ],
+    ])
+    modelo = cp_model.CpModel()
+    asignaciones = MatrizDeAsignaciones(permitidas, modelo)
+
+    assert len(asignaciones) == 4
+    assert asignaciones[0, 1] == 0
+    assert asignaciones[1, 0] == 0
+    assert asignaciones[0, 0] is asignaciones.variables[0]
+    assert asignaciones[2, 2] is asignaciones.variables[3]
+
+    assert list(asignaciones.celdas_de_fila(0)) == [0, 1]
+    assert list(asignaciones.celdas_de_fila(1)) == []
+    assert list(asignaciones.celdas_de_columna(2)) == [1, 3]
+    assert asignaciones.variables_por_columna([0, 2]) == {
+        0: [asignaciones[0, 0]],
+        1: [asignaciones[2, 1]],
+        2: [asignaciones[0, 2], asignaciones[2, 2]]
+    }
+    assert asignaciones.variables_en(slice(0, 3), slice(1, 3)) == [asignaciones[0, 2], asignaciones[2, 1], asignaciones[2, 2]]
+
+def test_aulas_asignadas():
+    permitidas = np.array([
+        [True,  True,  False],
+        [False, True,  True ],
+    ])
+    modelo = cp_model.CpModel()
+    asignaciones = MatrizDeAsignaciones(permitidas, modelo)
+    modelo.add(asignaciones[0, 1] == 1)
+    modelo.add(asignaciones[1, 2] == 1)
+    for i_clase in range(2):
+        modelo.add_exactly_one(asignaciones.variables_de_fila(i_clase))
+
+    solver = cp_model.CpSolver()
+    assert solver.solve(modelo) == cp_model.OPTIMAL
+    assert asignaciones.aulas_asignadas(solver) == [1, 2]
+    assert asignaciones.valores(solver).tolist() == [[0, 1, 0], [0, 0, 1]]
@@ -1,12 +1,20 @@
 from ortools.sat.python import cp_model
-import numpy as np
+from itertools import product
 import pytest
 
-from asignacion_aulica.lógica_de_asignación.preprocesamiento import AulasPreprocesadas, ClasesPreprocesadasPorDía
-from asignacion_aulica.lógica_de_asignación.preferencias import obtener_penalización
+from asignacion_aulica.lógica_de_asignación.preprocesamiento import AulasPreprocesadas, ClasesPreprocesadasPorDía, subconjunto_de_clases
+from asignacion_aulica.lógica_de_asignación.matriz_de_asignaciones import MatrizDeAsignaciones
+from asignacion_aulica.lógica_de_asignación.asignación import crear_matriz_de_asignaciones
+from asignacion_aulica.lógica_de_asignación.preferencias import (
+    costos_por_celda,
+    obtener_cotas_superiores,
+    obtener_penalización,
+    obtener_penalizaciones,
+    sumar_penalizaciones
+)
 from asignacion_aulica.gestor_de_datos.días_y_horarios import Día
 
-from mocks import MockAula, MockClase
+from mocks import MockAula, MockCarrera, MockClase, MockEdificio, MockMateria
 
 @pytest.mark.aulas(
     MockAula(capacidad=34, nombre="0 - peor: sobrante=0, excedente=1"),
@@ -18,7 +26,7 @@ def test_minimiza_capacidad_sobrante_y_excedida(
     clases_preprocesadas: ClasesPreprocesadasPorDía,
     aulas_preprocesadas: AulasPreprocesadas,
     modelo: cp_model.CpModel,
-    asignaciones: np.ndarray
+    asignaciones: MatrizDeAsignaciones
 ):
     '''
     Verifica que minimiza la capacidad sobrante y excedida, dando prioridad a la excedida.
@@ -33,9 +41,95 @@ def test_minimiza_capacidad_sobrante_y_excedida(
     status = solver.solve(modelo)
     if status != cp_model.OPTIMAL:
         pytest.fail(f'El solver terminó con status {solver.status_name(status)}. Alguien escribió mal la prueba.')
-    asignaciones_finales = np.vectorize(solver.value)(asignaciones)
+    asignaciones_finales = asignaciones.valores(solver)
 
     # Espera que se asigne la clase al aula 1, y priorizando no exceder
     assert sum(asignaciones_finales[0,:]) == 1, 'Se debería asignar a exactamente un aula.'
     assert asignaciones_finales[0, 1] == 1
 
+
+@pytest.mark.edificios(
+    MockEdificio(aulas=(MockAula(capacidad=30), MockAula(capacidad=60))),
+    MockEdificio(aulas=(MockAula(capacidad=40),), preferir_no_usar=True)
+)
+@pytest.mark.carreras(
+    MockCarrera(edificio_preferido=0, materias=(MockMateria(clases=(
+        MockClase(día=Día.Lunes, cantidad_de_alumnos=35),
+        MockClase(día=Día.Lunes, cantidad_de_alumnos=50)
+    )),))
+)
+def test_costos_por_celda_sin_variables_auxiliares(
+    clases_preprocesadas: ClasesPreprocesadasPorDía,
+    aulas_preprocesadas: AulasPreprocesadas,
+    modelo: cp_model.CpModel,
+    asignaciones: MatrizDeAsignaciones
+):
+    '''
+    Verifica que las penalizaciones no agregan variables ni restricciones al
+    modelo, y que los costos de las celdas suman la misma penalización que el
+    modelo con cada combinación de asignaciones.
+    '''
+    clases_lunes = clases_preprocesadas[Día.Lunes]
+    variables_antes = len(modelo.proto.variables)
+    restricciones_antes = len(modelo.proto.constraints)
+    penalización = obtener_penalización(clases_lunes, aulas_preprocesadas, modelo, asignaciones)
+    assert len(modelo.proto.variables) == variables_antes
+    assert len(modelo.proto.constraints) == restricciones_antes
+
+    costos = costos_por_celda(clases_lunes, aulas_preprocesadas, asignaciones)
+    assert costos.shape == (len(asignaciones),)
+
+    for i_clase in range(len(clases_lunes.clases)):
+        modelo.add_exactly_one(asignaciones.variables_de_fila(i_clase))
+    modelo.minimize(penalización)
+
+    for celda_0, celda_1 in product(asignaciones.celdas_de_fila(0), asignaciones.celdas_de_fila(1)):
+        modelo.clear_assumptions()
+        modelo.add_assumptions([asignaciones.variables[celda_0], asignaciones.variables[celda_1]])
+
+        solver = cp_model.CpSolver()
+        assert solver.solve(modelo) == cp_model.OPTIMAL
+        assert solver.objective_value == pytest.approx(costos[celda_0] + costos[celda_1])
+
+
+@pytest.mark.edificios(
+    MockEdificio(aulas=(MockAula(capacidad=30), MockAula(capacidad=60))),
+    MockEdificio(aulas=(MockAula(capacidad=40),), preferir_no_usar=True)
+)
+@pytest.mark.carreras(
+    MockCarrera(edificio_preferido=0, materias=(MockMateria(clases=(
+        MockClase(día=Día.Lunes, cantidad_de_alumnos=10),
+        MockClase(día=Día.Lunes, cantidad_de_alumnos=50)
+    )),))
+)
+def test_penalización_de_una_parte_con_las_cotas_del_problema(
+    clases_preprocesadas: ClasesPreprocesadasPorDía,
+    aulas_preprocesadas: AulasPreprocesadas,
+    asignaciones: MatrizDeAsignaciones
+):
+    '''
+    Verifica que, con las cotas superiores del problema completo, la
+    penalización de una parte de las clases (como una ventana de la búsqueda
+    en vecindarios) es la suma de los costos de sus celdas en el problema
+    completo.
+    '''
+    clases_lunes = clases_preprocesadas[Día.Lunes]
+    costos = costos_por_celda(clases_lunes, aulas_preprocesadas, asignaciones)
+    cotas_superiores = obtener_cotas_superiores(clases_lunes, aulas_preprocesadas, asignaciones)
+
+    parte = subconjunto_de_clases(clases_lunes, [1])
+    modelo = cp_model.CpModel()
+    asignaciones_de_la_parte = crear_matriz_de_asignaciones(parte, aulas_preprocesadas, modelo)
+    penalización = sumar_penalizaciones(obtener_penalizaciones(
+        parte, aulas_preprocesadas, modelo, asignaciones_de_la_parte, cotas_superiores=cotas_superiores
+    ))
+    modelo.add_exactly_one(asignaciones_de_la_parte.variables_de_fila(0))
+    modelo.minimize(penalización)
+
+    for celda_de_la_parte, celda in zip(asignaciones_de_la_parte.celdas_de_fila(0), asignaciones.celdas_de_fila(1), strict=True):
+        modelo.clear_assumptions()
+        modelo.add_assumptions([asignaciones_de_la_parte.variables[celda_de_la_parte]])
+
+        solver = cp_model.CpSolver()
+        assert solver.solve(modelo) == cp_model.OPTIMAL
+        assert solver.objective_value == pytest.approx(costos[celda])
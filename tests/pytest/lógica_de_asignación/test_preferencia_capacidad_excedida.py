@@ -1,9 +1,9 @@
 from ortools.sat.python import cp_model
 from itertools import combinations
-import numpy as np
 import pytest
 
 from asignacion_aulica.lógica_de_asignación.preprocesamiento import AulasPreprocesadas, ClasesPreprocesadasPorDía
+from asignacion_aulica.lógica_de_asignación.matriz_de_asignaciones import MatrizDeAsignaciones
 from asignacion_aulica.gestor_de_datos.días_y_horarios import Día
 from asignacion_aulica.lógica_de_asignación import preferencias
 
@@ -24,7 +24,7 @@ def test_algunas_clases_exceden_capacidad(
     aulas_preprocesadas: AulasPreprocesadas,
     clases_preprocesadas: ClasesPreprocesadasPorDía,
     modelo: cp_model.CpModel,
-    asignaciones: np.ndarray
+    asignaciones: MatrizDeAsignaciones
 ):
     clases_lunes = clases_preprocesadas[Día.Lunes]
     cantidad_excedida, cota_superior = preferencias.cantidad_de_alumnos_que_no_entran_en_el_aula(clases_lunes, aulas_preprocesadas, modelo, asignaciones)
@@ -53,7 +53,7 @@ def test_ninguna_clase_excede_capacidad(
     aulas_preprocesadas: AulasPreprocesadas,
     clases_preprocesadas: ClasesPreprocesadasPorDía,
     modelo: cp_model.CpModel,
-    asignaciones: np.ndarray
+    asignaciones: MatrizDeAsignaciones
 ):
     clases_lunes = clases_preprocesadas[Día.Lunes]
     cantidad_excedida, cota_superior = preferencias.cantidad_de_alumnos_que_no_entran_en_el_aula(clases_lunes, aulas_preprocesadas, modelo, asignaciones)
@@ -83,7 +83,7 @@ def test_entran_justito(
     aulas_preprocesadas: AulasPreprocesadas,
     clases_preprocesadas: ClasesPreprocesadasPorDía,
     modelo: cp_model.CpModel,
-    asignaciones: np.ndarray
+    asignaciones: MatrizDeAsignaciones
 ):
     clases_lunes = clases_preprocesadas[Día.Lunes]
 
@@ -103,7 +103,7 @@ def test_entran_justito(
     if status != cp_model.OPTIMAL:
         pytest.fail(f'El solver terminó con status {solver.status_name(status)}. Alguien escribió mal la prueba.')
     
-    asignaciones_finales = np.vectorize(solver.value)(asignaciones)
+    asignaciones_finales = asignaciones.valores(solver)
     assert sum(asignaciones_finales[0,:]) == 1 and asignaciones_finales[0, 0] == 1
     assert sum(asignaciones_finales[1,:]) == 1 and asignaciones_finales[1, 1] == 1
     assert sum(asignaciones_finales[2,:]) == 1 and asignaciones_finales[2, 2] == 1
@@ -123,7 +123,7 @@ def test_minimiza_capacidad_excedida(
     aulas_preprocesadas: AulasPreprocesadas,
     clases_preprocesadas: ClasesPreprocesadasPorDía,
     modelo: cp_model.CpModel,
-    asignaciones: np.ndarray
+    asignaciones: MatrizDeAsignaciones
 ):
     '''
     Esta prueba es para verificar que minimiza la capacidad excedida en total, y
@@ -151,7 +151,7 @@ def test_minimiza_capacidad_excedida(
     if status != cp_model.OPTIMAL:
         pytest.fail(f'El solver terminó con status {solver.status_name(status)}. Alguien escribió mal la prueba.')
 
-    asignaciones_finales = np.vectorize(solver.value)(asignaciones)
+    asignaciones_finales = asignaciones.valores(solver)
     assert sum(asignaciones_finales[0,:]) == 1 and asignaciones_finales[0, 0] == 1
     assert sum(asignaciones_finales[1,:]) == 1 and asignaciones_finales[1, 1] == 1
     assert sum(asignaciones_finales[2,:]) == 1 and asignaciones_finales[2, 2] == 1
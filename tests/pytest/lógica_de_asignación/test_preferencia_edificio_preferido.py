@@ -1,8 +1,8 @@
 from ortools.sat.python import cp_model
-import numpy as np
 import pytest
 
 from asignacion_aulica.lógica_de_asignación.preprocesamiento import AulasPreprocesadas, ClasesPreprocesadasPorDía
+from asignacion_aulica.lógica_de_asignación.matriz_de_asignaciones import MatrizDeAsignaciones
 from asignacion_aulica.gestor_de_datos.días_y_horarios import Día
 from asignacion_aulica.lógica_de_asignación import preferencias
 
@@ -25,7 +25,7 @@ def test_todas_las_aulas_en_el_edificio_preferido(
     aulas_preprocesadas: AulasPreprocesadas,
     clases_preprocesadas: ClasesPreprocesadasPorDía,
     modelo: cp_model.CpModel,
-    asignaciones: np.ndarray
+    asignaciones: MatrizDeAsignaciones
 ):
     clases_lunes = clases_preprocesadas[Día.Lunes]
     print(clases_lunes.rangos_de_aulas_preferidas)
@@ -99,7 +99,7 @@ def test_algunas_aulas_en_el_edificio_preferido(
     aulas_preprocesadas: AulasPreprocesadas,
     clases_preprocesadas: ClasesPreprocesadasPorDía,
     modelo: cp_model.CpModel,
-    asignaciones: np.ndarray
+    asignaciones: MatrizDeAsignaciones
 ):
     clases_lunes = clases_preprocesadas[Día.Lunes]
     clases_fuera_del_edificio_preferido, cota_superior = preferencias.cantidad_de_clases_fuera_del_edificio_preferido(clases_lunes, aulas_preprocesadas, modelo, asignaciones)
@@ -130,7 +130,7 @@ def test_elije_aula_en_edificio_preferido(
     aulas_preprocesadas: AulasPreprocesadas,
     clases_preprocesadas: ClasesPreprocesadasPorDía,
     modelo: cp_model.CpModel,
-    asignaciones: np.ndarray
+    asignaciones: MatrizDeAsignaciones
 ):
     clases_lunes = clases_preprocesadas[Día.Lunes]
     clases_fuera_del_edificio_preferido, cota_superior = preferencias.cantidad_de_clases_fuera_del_edificio_preferido(clases_lunes, aulas_preprocesadas, modelo, asignaciones)
@@ -146,6 +146,6 @@ def test_elije_aula_en_edificio_preferido(
         pytest.fail(f'El solver terminó con status {solver.status_name(status)}. Alguien escribió mal la prueba.')
     
     # La clase se debe asignar al aula en el edificio preferido
-    asignaciones_finales = np.vectorize(solver.value)(asignaciones)
+    asignaciones_finales = asignaciones.valores(solver)
     assert sum(asignaciones_finales[0,:]) == 1 and asignaciones_finales[0, 2] == 1
     assert solver.value(clases_fuera_del_edificio_preferido) == 0
@@ -1,14 +1,21 @@
 from datetime import time
-import pytest
+import pytest, itertools, copy
 
-from asignacion_aulica.gestor_de_datos.días_y_horarios import HorariosSemanales, RangoHorario, Día
+from asignacion_aulica.gestor_de_datos.días_y_horarios import EQUIVALENTE_24_HORAS, HorariosSemanales, RangoHorario, Día
 from asignacion_aulica.gestor_de_datos.entidades import Carreras, Edificios
 from asignacion_aulica.lógica_de_asignación.preprocesamiento import (
     AulaPreprocesada,
     AulasPreprocesadas,
     ClasesPreprocesadas,
-    preprocesar_clases
+    ClasesPreprocesadasPorDía,
+    aulas_intercambiables,
+    componentes_independientes,
+    firma_del_problema,
+    motivos_de_infactibilidad,
+    preprocesar_clases,
+    separar_en_problemas_independientes
 )
+from asignacion_aulica.lógica_de_asignación.restricciones import aulas_prohibidas
 
 from mocks import MockCarrera, MockClase, MockEdificio, MockAula, MockMateria
 
@@ -22,6 +29,25 @@ def test_rango_de_aulas_por_edificio(edificios: Edificios):
     aulas_preprocesadas = AulasPreprocesadas(edificios)
     assert aulas_preprocesadas.rangos_de_aulas == rangos_esperados
 
+@pytest.mark.edificios(
+    MockEdificio(aulas=(MockAula(), MockAula())),
+    MockEdificio(aulas=(MockAula(nombre='igual'), MockAula(nombre='igual'))),
+)
+def test_índice_de_las_aulas(edificios: Edificios):
+    aulas = AulasPreprocesadas(edificios)
+    assert aulas.índice(edificios[0].aulas[1]) == 1
+    assert aulas.índice(edificios[1].aulas[0]) == 2
+    assert aulas.índice_o_none(None) is None
+
+    # Las aulas se buscan por identidad, aunque haya otras iguales
+    assert edificios[1].aulas[0] == edificios[1].aulas[1]
+    assert aulas.índice(edificios[1].aulas[1]) == 3
+
+    copia = copy.copy(edificios[0].aulas[0])
+    assert aulas.índice_o_none(copia) is None
+    with pytest.raises(ValueError):
+        aulas.índice(copia)
+
 @pytest.mark.edificios(MockEdificio(
     nombre='nombre',
     horario_lunes =     RangoHorario(time(8), time(20)),
@@ -376,3 +402,263 @@ def test_preprocesar_clases_con_edificio_preferido(carreras: Carreras, aulas_pre
     clases_preprocesadas = preprocesar_clases(carreras, aulas_preprocesadas)
     assert clases_preprocesadas[Día.Lunes].rangos_de_aulas_preferidas == []
     assert clases_preprocesadas[Día.Jueves].rangos_de_aulas_preferidas == [(slice(1, 2), slice(3, 5))]
+
+@pytest.mark.aulas(MockAula(), MockAula())
+@pytest.mark.clases(
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(8), time(10))),
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(18), time(20))),
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(9), time(11))),
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(19), time(21))),
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(10), time(12))),
+)
+def test_separar_bloques_de_horarios_que_no_se_superponen(
+    clases_preprocesadas: ClasesPreprocesadasPorDía,
+    aulas_preprocesadas: AulasPreprocesadas
+):
+    clases_lunes = clases_preprocesadas[Día.Lunes]
+    permitidas = ~aulas_prohibidas(clases_lunes, aulas_preprocesadas)
+    problemas = separar_en_problemas_independientes(clases_lunes, aulas_preprocesadas, permitidas)
+
+    assert len(problemas) == 2
+    assert problemas[0].clases == [clases_lunes.clases[i] for i in (0, 2, 4)]
+    assert problemas[1].clases == [clases_lunes.clases[i] for i in (1, 3)]
+
+@pytest.mark.aulas(
+    MockAula(equipamiento={'proyector'}),
+    MockAula(equipamiento={'computadoras'})
+)
+@pytest.mark.clases(
+    MockClase(día=Día.Lunes, equipamiento_necesario={'proyector'}),
+    MockClase(día=Día.Lunes, equipamiento_necesario={'computadoras'}),
+)
+def test_separar_clases_sin_aulas_en_común(
+    clases_preprocesadas: ClasesPreprocesadasPorDía,
+    aulas_preprocesadas: AulasPreprocesadas
+):
+    clases_lunes = clases_preprocesadas[Día.Lunes]
+    permitidas = ~aulas_prohibidas(clases_lunes, aulas_preprocesadas)
+    problemas = separar_en_problemas_independientes(clases_lunes, aulas_preprocesadas, permitidas)
+
+    assert len(problemas) == 2
+    assert problemas[0].clases == [clases_lunes.clases[0]]
+    assert problemas[1].clases == [clases_lunes.clases[1]]
+
+@pytest.mark.edificios(MockEdificio(
+    aulas=(
+        MockAula(equipamiento={'proyector'}),
+        MockAula(equipamiento={'computadoras'}),
+        MockAula()
+    ),
+    aulas_dobles={0: (1, 2)}
+))
+@pytest.mark.clases(
+    MockClase(día=Día.Lunes, equipamiento_necesario={'proyector'}),
+    MockClase(día=Día.Lunes, equipamiento_necesario={'computadoras'}),
+)
+def test_no_separar_clases_que_comparten_aula_doble(
+    clases_preprocesadas: ClasesPreprocesadasPorDía,
+    aulas_preprocesadas: AulasPreprocesadas
+):
+    clases_lunes = clases_preprocesadas[Día.Lunes]
+    permitidas = ~aulas_prohibidas(clases_lunes, aulas_preprocesadas)
+    problemas = separar_en_problemas_independientes(clases_lunes, aulas_preprocesadas, permitidas)
+
+    assert len(problemas) == 1
+    assert problemas[0].clases == clases_lunes.clases
+
+@pytest.mark.edificios(
+    MockEdificio(aulas=(MockAula(),)),
+    MockEdificio(aulas=(MockAula(),))
+)
+@pytest.mark.carreras(
+    MockCarrera(materias=(MockMateria(clases=(
+        MockClase(día=Día.Lunes, horario=RangoHorario(time(8), time(10))),
+        MockClase(día=Día.Lunes, horario=RangoHorario(time(18), time(20))),
+    )),)),
+    MockCarrera(edificio_preferido=1, materias=(MockMateria(clases=(
+        MockClase(día=Día.Lunes, horario=RangoHorario(time(18), time(20))),
+        MockClase(día=Día.Lunes, horario=RangoHorario(time(9), time(11))),
+    )),))
+)
+def test_separar_conserva_rangos_de_aulas_preferidas(
+    clases_preprocesadas: ClasesPreprocesadasPorDía,
+    aulas_preprocesadas: AulasPreprocesadas
+):
+    clases_lunes = clases_preprocesadas[Día.Lunes]
+    permitidas = ~aulas_prohibidas(clases_lunes, aulas_preprocesadas)
+    problemas = separar_en_problemas_independientes(clases_lunes, aulas_preprocesadas, permitidas)
+
+    assert len(problemas) == 2
+    assert problemas[0].clases == [clases_lunes.clases[i] for i in (0, 3)]
+    assert problemas[0].rangos_de_aulas_preferidas == [(slice(1, 2), slice(1, 2))]
+    assert problemas[1].clases == [clases_lunes.clases[i] for i in (1, 2)]
+    assert problemas[1].rangos_de_aulas_preferidas == [(slice(1, 2), slice(1, 2))]
+
+@pytest.mark.aulas(
+    MockAula(capacidad=30),
+    MockAula(capacidad=60, equipamiento={'proyector'}),
+    MockAula(capacidad=60)
+)
+@pytest.mark.clases(
+    MockClase(día=Día.Lunes, cantidad_de_alumnos=50, horario=RangoHorario(time(8), time(10))),
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(15), time(17)), equipamiento_necesario={'proyector'}),
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(9), time(11))),
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(8), time(9)), no_cambiar_asignación=True, aula_asignada=(0, 1)),
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(16), time(18))),
+)
+def test_aulas_permitidas_de_cada_componente(
+    clases_preprocesadas: ClasesPreprocesadasPorDía,
+    aulas_preprocesadas: AulasPreprocesadas
+):
+    # La matriz de cada sub-problema son las filas de sus clases en la del día
+    clases_lunes = clases_preprocesadas[Día.Lunes]
+    permitidas = ~aulas_prohibidas(clases_lunes, aulas_preprocesadas)
+    componentes = componentes_independientes(clases_lunes, aulas_preprocesadas, permitidas)
+    problemas = separar_en_problemas_independientes(clases_lunes, aulas_preprocesadas, permitidas)
+
+    assert len(componentes) == len(problemas) > 1
+    for componente, problema in zip(componentes, problemas):
+        assert problema.clases == [clases_lunes.clases[i] for i in componente]
+        assert (permitidas[componente] == ~aulas_prohibidas(problema, aulas_preprocesadas)).all()
+
+@pytest.mark.clases(
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(8), time(10))),
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(10), time(12))),
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(9), time(11))),
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(7), time(13))),
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(12), time(14))),
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(9), time(9))),
+)
+def test_pares_de_clases_que_se_superponen(clases_preprocesadas: ClasesPreprocesadasPorDía):
+    clases_lunes = clases_preprocesadas[Día.Lunes]
+
+    esperados = {
+        (i_clase1, i_clase2)
+        for i_clase1, i_clase2 in itertools.combinations(range(len(clases_lunes.clases)), 2)
+        if clases_lunes.clases[i_clase1].horario.se_superpone_con(clases_lunes.clases[i_clase2].horario)
+    }
+    pares = clases_lunes.pares_que_se_superponen
+
+    assert len(pares) == len(esperados)
+    assert set(pares) == esperados
+
+@pytest.mark.clases(
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(8), time(10))),
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(9), time(12))),
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(10), time(11))),
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(13), time(14))),
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(11), time(13))),
+)
+def test_cliques_de_superposición(clases_preprocesadas: ClasesPreprocesadasPorDía):
+    clases_lunes = clases_preprocesadas[Día.Lunes]
+    assert clases_lunes.cliques_de_superposición == [[0, 1], [1, 2], [1, 4], [3]]
+
+@pytest.mark.aulas(MockAula(capacidad=30), MockAula(capacidad=40))
+@pytest.mark.clases(
+    MockClase(día=Día.Lunes),
+    MockClase(día=Día.Martes),
+)
+def test_firma_del_problema(edificios: Edificios, carreras: Carreras):
+    def firmas() -> list[str]:
+        aulas = AulasPreprocesadas(edificios)
+        clases = preprocesar_clases(carreras, aulas)
+        return [firma_del_problema(clases[día], aulas, día) for día in Día]
+
+    firmas_originales = firmas()
+    assert firmas() == firmas_originales
+
+    # Cambiar una clase sólo cambia la firma de su día
+    carreras[0].materias[0].clases[1].cantidad_de_alumnos = 2
+    firmas_nuevas = firmas()
+    assert firmas_nuevas[Día.Martes] != firmas_originales[Día.Martes]
+    assert all(firmas_nuevas[día] == firmas_originales[día] for día in Día if día != Día.Martes)
+
+    # Cambiar un aula cambia la firma de todos los días
+    edificios[0].aulas[0].capacidad = 35
+    assert all(nueva != vieja for nueva, vieja in zip(firmas(), firmas_nuevas))
+
+    # Cambiar el aula asignada también cambia la firma
+    firmas_nuevas = firmas()
+    carreras[0].materias[0].clases[0].aula_asignada = edificios[0].aulas[1]
+    assert firmas()[Día.Lunes] != firmas_nuevas[Día.Lunes]
+
+@pytest.mark.clases(
+    MockClase(día=Día.Martes, horario=RangoHorario(time(8, 30), time(10))),
+    MockClase(día=Día.Domingo, horario=RangoHorario(time(22), EQUIVALENTE_24_HORAS)),
+)
+def test_horarios_en_minutos(clases_preprocesadas: ClasesPreprocesadasPorDía):
+    horarios = clases_preprocesadas[Día.Martes].horarios
+    assert horarios.tolist() == [(Día.Martes, 8*60 + 30, 10*60)]
+
+    domingo = clases_preprocesadas[Día.Domingo]
+    assert domingo.días.tolist() == [Día.Domingo]
+    assert domingo.inicios.tolist() == [22*60]
+    assert domingo.fines.tolist() == [24*60]
+
+@pytest.mark.edificios(
+    MockEdificio(
+        aulas=(
+            MockAula(capacidad=30),
+            MockAula(capacidad=30),
+            MockAula(capacidad=30, equipamiento={'proyector'}),
+            MockAula(capacidad=30, horario_lunes=RangoHorario(time(8), time(10))),
+            MockAula(capacidad=30),
+            MockAula(capacidad=40),
+            MockAula(capacidad=20),
+            MockAula(capacidad=20),
+            MockAula(capacidad=30),
+        ),
+        aulas_dobles={5: (6, 7)}
+    ),
+    MockEdificio(aulas=(MockAula(capacidad=30),)),
+)
+@pytest.mark.clases(
+    MockClase(día=Día.Lunes),
+    MockClase(día=Día.Lunes, aula_asignada=(0, 4), no_cambiar_asignación=True),
+)
+def test_aulas_intercambiables(
+    aulas_preprocesadas: AulasPreprocesadas,
+    clases_preprocesadas: ClasesPreprocesadasPorDía
+):
+    # Las aulas con otro equipamiento, otro horario, horarios ocupados, que son
+    # parte de un aula doble o que están en otro edificio no se agrupan. Las
+    # hijas del aula doble son iguales, pero tampoco.
+    grupos = aulas_intercambiables(clases_preprocesadas[Día.Lunes], aulas_preprocesadas)
+    assert grupos == {0: [0, 1, 8]}
+
+    # El horario de los días sin clases no importa
+    assert aulas_intercambiables(clases_preprocesadas[Día.Martes], aulas_preprocesadas) == {0: [0, 1, 3, 4, 8]}
+
+@pytest.mark.aulas(
+    MockAula(equipamiento={'proyector'}),
+    MockAula(equipamiento={'proyector', 'parlantes'}),
+    MockAula(),
+    MockAula(horario_lunes=RangoHorario(time(8), time(10))),
+)
+@pytest.mark.clases(
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(8), time(10)), equipamiento_necesario={'proyector'}),
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(9), time(11)), equipamiento_necesario={'proyector'}),
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(9), time(12)), equipamiento_necesario={'proyector', 'parlantes'}),
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(14), time(16)), equipamiento_necesario={'pizarrón'}),
+    MockClase(día=Día.Martes, horario=RangoHorario(time(9), time(10))),
+    MockClase(día=Día.Martes, horario=RangoHorario(time(9), time(10))),
+    MockClase(día=Día.Martes, horario=RangoHorario(time(9), time(10))),
+    MockClase(día=Día.Martes, horario=RangoHorario(time(9), time(10))),
+)
+def test_motivos_de_infactibilidad(
+    aulas_preprocesadas: AulasPreprocesadas,
+    clases_preprocesadas: ClasesPreprocesadasPorDía
+):
+    def motivos(día: Día) -> list[str]:
+        clases = clases_preprocesadas[día]
+        return motivos_de_infactibilidad(clases, aulas_preprocesadas, ~aulas_prohibidas(clases, aulas_preprocesadas))
+
+    # Hay aulas para todas las clases en curso, pero no para las que necesitan
+    # proyector; y ningún aula tiene pizarrón
+    assert motivos(Día.Lunes) == [
+        'La clase de materia 0 del Lunes de 14:00 a 16:00 no tiene ningún aula abierta, libre y con el equipamiento necesario.',
+        'El Lunes entre las 09:00 y las 10:00 hay 3 clases que necesitan proyector, pero sólo 2 aulas disponibles para ellas.',
+    ]
+
+    # Hay tantas clases como aulas
+    assert motivos(Día.Martes) == []
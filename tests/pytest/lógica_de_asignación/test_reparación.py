@@ -0,0 +1,89 @@
+from datetime import time
+import pytest
+
+from asignacion_aulica.gestor_de_datos.días_y_horarios import RangoHorario, Día
+from asignacion_aulica.gestor_de_datos.entidades import Carreras, Edificios
+from asignacion_aulica.lógica_de_asignación.preprocesamiento import AulasPreprocesadas, ClasesPreprocesadasPorDía
+from asignacion_aulica.lógica_de_asignación.reparación import reparar
+from asignacion_aulica.lógica_de_asignación.vecindarios import clases_en_conflicto, vecinas_de_cada_clase, vecindario
+
+from mocks import MockAula, MockClase
+
+# Las clases 0 y 1 se superponen en el aula 0. La clase 3 está en un aula más
+# grande de lo necesario, así que una asignación completa la cambiaría.
+aulas = (MockAula(capacidad=30), MockAula(capacidad=30), MockAula(capacidad=60))
+clases = (
+    MockClase(cantidad_de_alumnos=25, horario=RangoHorario(time(8), time(10)), aula_asignada=(0, 0)),
+    MockClase(cantidad_de_alumnos=25, horario=RangoHorario(time(9), time(11)), aula_asignada=(0, 0)),
+    MockClase(cantidad_de_alumnos=25, horario=RangoHorario(time(8), time(10)), aula_asignada=(0, 1)),
+    MockClase(cantidad_de_alumnos=25, horario=RangoHorario(time(14), time(16)), aula_asignada=(0, 2)),
+)
+
+@pytest.mark.aulas(*aulas)
+@pytest.mark.clases(*clases)
+def test_vecindario(
+    edificios: Edificios,
+    carreras: Carreras,
+    aulas_preprocesadas: AulasPreprocesadas,
+    clases_preprocesadas: ClasesPreprocesadasPorDía
+):
+    clases_del_lunes = clases_preprocesadas[Día.Lunes]
+    aulas_actuales = [aulas_preprocesadas.índice(clase.aula_asignada) for clase in clases_del_lunes.clases]
+
+    semillas = clases_en_conflicto(clases_del_lunes, aulas_preprocesadas, aulas_actuales)
+    assert semillas == [0, 1]
+
+    # La clase 2 se superpone con las semillas y está en un aula que les sirve
+    assert vecindario(clases_del_lunes, aulas_preprocesadas, aulas_actuales, semillas, 0) == [0, 1]
+    assert vecindario(clases_del_lunes, aulas_preprocesadas, aulas_actuales, semillas, 1) == [0, 1, 2]
+    assert vecindario(clases_del_lunes, aulas_preprocesadas, aulas_actuales, semillas, 5) == [0, 1, 2]
+
+    # Con las vecinas calculadas de antemano da lo mismo
+    vecinas = vecinas_de_cada_clase(clases_del_lunes, aulas_preprocesadas, aulas_actuales)
+    assert {i_clase: set(vecinas_de_la_clase) for i_clase, vecinas_de_la_clase in vecinas.items()} == {0: {1, 2}, 1: {0, 2}, 2: {0, 1}}
+    assert vecindario(clases_del_lunes, aulas_preprocesadas, aulas_actuales, semillas, 1, vecinas) == [0, 1, 2]
+
+@pytest.mark.aulas(*aulas)
+@pytest.mark.clases(*clases)
+def test_reparar_sólo_cambia_el_vecindario(edificios: Edificios, carreras: Carreras):
+    clases = carreras[0].materias[0].clases
+    aulas = edificios[0].aulas
+
+    resultado = reparar(edificios, carreras, radio=0)
+    assert resultado.días_sin_asignar == []
+    assert resultado.días_sin_cambios == [día for día in Día if día != Día.Lunes]
+    assert resultado.métricas.problemas[0].clases == 2
+
+    # Las clases en conflicto pasan a las aulas libres, y las demás no cambian
+    assert {clases[0].aula_asignada.nombre, clases[1].aula_asignada.nombre} == {aulas[0].nombre, aulas[2].nombre}
+    assert clases[2].aula_asignada is aulas[1]
+    assert clases[3].aula_asignada is aulas[2]
+
+    # Si no hay conflictos ni cambios no se resuelve nada
+    resultado = reparar(edificios, carreras)
+    assert resultado.días_sin_cambios == list(Día)
+    assert resultado.métricas.problemas == []
+
+    # Una clase modificada se libera aunque su aula sea válida
+    resultado = reparar(edificios, carreras, clases_modificadas=[clases[3]])
+    assert resultado.métricas.problemas[0].clases == 1
+    assert clases[3].aula_asignada in (aulas[0], aulas[1])
+
+@pytest.mark.aulas(MockAula(capacidad=30), MockAula(capacidad=30), MockAula(capacidad=30))
+@pytest.mark.clases(
+    MockClase(cantidad_de_alumnos=25, horario=RangoHorario(time(8), time(10)), aula_asignada=(0, 0)),
+    MockClase(cantidad_de_alumnos=25, horario=RangoHorario(time(14), time(16)), aula_asignada=(0, 1)),
+    MockClase(cantidad_de_alumnos=25, horario=RangoHorario(time(14), time(16)), aula_asignada=(0, 2)),
+)
+def test_reparar_después_de_quitar_un_aula(edificios: Edificios, carreras: Carreras):
+    clases = carreras[0].materias[0].clases
+    aulas = edificios[0].aulas
+
+    # La clase del aula quitada pasa a la única libre, y las demás no cambian
+    aulas.remove(clases[2].aula_asignada)
+    resultado = reparar(edificios, carreras, radio=0)
+    assert resultado.todo_ok()
+    assert resultado.métricas.problemas[0].clases == 1
+    assert clases[0].aula_asignada is aulas[0]
+    assert clases[1].aula_asignada is aulas[1]
+    assert clases[2].aula_asignada is aulas[0]
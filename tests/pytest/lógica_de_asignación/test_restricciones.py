@@ -1,28 +1,22 @@
-from ortools.sat.python import cp_model
 from datetime import time
 import numpy as np
 import pytest
 
 from asignacion_aulica.lógica_de_asignación.preprocesamiento import AulasPreprocesadas, ClasesPreprocesadasPorDía
+from asignacion_aulica.lógica_de_asignación.matriz_de_asignaciones import MatrizDeAsignaciones
 from asignacion_aulica.gestor_de_datos.días_y_horarios import RangoHorario, Día
 from asignacion_aulica.lógica_de_asignación import restricciones
 
 from mocks import MockAula, MockClase, MockEdificio
 
-def predicado_es_nand_entre_dos_variables(predicado, variable1, variable2) -> bool:
+def es_grupo_de(grupo, *variables) -> bool:
     '''
-    Devuelve `True` si `predicado` es una expresión de la forma
-    `variable1 + variable2 <= 1`, donde `variable1` y `variable2` son variables
-    booleanas de un `CpModel`.
+    Devuelve `True` si `grupo` contiene exactamente las variables dadas, en
+    cualquier orden.
     '''
-    return (
-        isinstance(predicado, cp_model.BoundedLinearExpression)
-        and len(predicado.vars) == 2
-        and variable1 in predicado.vars
-        and variable2 in predicado.vars
-        and predicado.coeffs == [1, 1]
-        and predicado.offset == 0
-        and predicado.bounds.max() == 1
+    return len(grupo) == len(variables) and all(
+        any(variable is otra for otra in grupo)
+        for variable in variables
     )
 
 @pytest.mark.aulas(MockAula())
@@ -34,15 +28,37 @@ def predicado_es_nand_entre_dos_variables(predicado, variable1, variable2) -> bo
 def test_superposición(
     aulas_preprocesadas: AulasPreprocesadas,
     clases_preprocesadas: ClasesPreprocesadasPorDía,
-    asignaciones: np.ndarray
+    asignaciones: MatrizDeAsignaciones
 ):
     clases_lunes = clases_preprocesadas[Día.Lunes]
-    predicados = list(restricciones.no_superponer_clases(clases_lunes, aulas_preprocesadas, asignaciones))
+    grupos = list(restricciones.no_superponer_clases(clases_lunes, aulas_preprocesadas, asignaciones))
 
-    # Debería generar solamente un predicado entre las primeras dos clases
-    assert len(predicados) == 1
-    predicado = predicados[0]
-    assert predicado_es_nand_entre_dos_variables(predicado, asignaciones[0,0], asignaciones[1,0])
+    # Debería generar solamente un grupo entre las primeras dos clases
+    assert len(grupos) == 1
+    assert es_grupo_de(grupos[0], asignaciones[0,0], asignaciones[1,0])
+
+@pytest.mark.aulas(MockAula(), MockAula())
+@pytest.mark.clases(
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(1), time(4))),
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(2), time(5))),
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(3), time(6))),
+    MockClase(día=Día.Lunes, horario=RangoHorario(time(5), time(7)))
+)
+@pytest.mark.asignaciones_forzadas({ 0: 0 })
+def test_superposición_por_cliques(
+    aulas_preprocesadas: AulasPreprocesadas,
+    clases_preprocesadas: ClasesPreprocesadasPorDía,
+    asignaciones: MatrizDeAsignaciones
+):
+    clases_lunes = clases_preprocesadas[Día.Lunes]
+    grupos = list(restricciones.no_superponer_clases(clases_lunes, aulas_preprocesadas, asignaciones))
+
+    # Cliques {0, 1, 2} y {2, 3}. La clase 0 no puede estar en el aula 1.
+    assert len(grupos) == 4
+    assert es_grupo_de(grupos[0], asignaciones[0,0], asignaciones[1,0], asignaciones[2,0])
+    assert es_grupo_de(grupos[1], asignaciones[1,1], asignaciones[2,1])
+    assert es_grupo_de(grupos[2], asignaciones[2,0], asignaciones[3,0])
+    assert es_grupo_de(grupos[3], asignaciones[2,1], asignaciones[3,1])
 
 @pytest.mark.clases(
     MockClase(horario=RangoHorario(time(10), time(13)), día=Día.Lunes)
@@ -60,7 +76,7 @@ def test_aulas_cerradas(
     clases_preprocesadas: ClasesPreprocesadasPorDía
 ):
     clases_lunes = clases_preprocesadas[Día.Lunes]
-    prohibidas = list(restricciones.no_asignar_en_aula_cerrada(clases_lunes, aulas_preprocesadas))
+    prohibidas = list(zip(*np.nonzero(restricciones.no_asignar_en_aula_cerrada(clases_lunes, aulas_preprocesadas))))
 
     # Debería generar restricciones con las aulas 1, 2, 4 y 5
     assert len(prohibidas) == 4
@@ -82,12 +98,30 @@ def test_equipamiento(
     clases_preprocesadas: ClasesPreprocesadasPorDía
 ):
     clases_lunes = clases_preprocesadas[Día.Lunes]
-    prohibidas = list(restricciones.asignar_aulas_con_el_equipamiento_requerido(clases_lunes, aulas_preprocesadas))
+    prohibidas = list(zip(*np.nonzero(restricciones.asignar_aulas_con_el_equipamiento_requerido(clases_lunes, aulas_preprocesadas))))
 
     # Debería generar una sola restricción con el aula 2
     assert len(prohibidas) == 1
     assert (0, 2) in prohibidas
 
+@pytest.mark.clases(
+    MockClase(equipamiento_necesario = set(('proyector', 'algo que no tiene ningún aula'))),
+    MockClase(equipamiento_necesario = set())
+)
+@pytest.mark.aulas(
+    MockAula(equipamiento = set(('proyector',))),
+    MockAula(equipamiento = set(('proyector', 'otra cosa')))
+)
+def test_equipamiento_que_no_tiene_ningún_aula(
+    aulas_preprocesadas: AulasPreprocesadas,
+    clases_preprocesadas: ClasesPreprocesadasPorDía
+):
+    clases_lunes = clases_preprocesadas[Día.Lunes]
+    prohibidas = list(zip(*np.nonzero(restricciones.asignar_aulas_con_el_equipamiento_requerido(clases_lunes, aulas_preprocesadas))))
+
+    # La primera clase no puede ir a ningún aula, la segunda a cualquiera
+    assert prohibidas == [(0, 0), (0, 1)]
+
 @pytest.mark.edificios(
     MockEdificio(
         aulas=(MockAula(),)*3,
@@ -101,12 +135,11 @@ def test_equipamiento(
 def test_aulas_dobles(
     aulas_preprocesadas: AulasPreprocesadas,
     clases_preprocesadas: ClasesPreprocesadasPorDía,
-    asignaciones: np.ndarray
+    asignaciones: MatrizDeAsignaciones
 ):
     clases_lunes = clases_preprocesadas[Día.Lunes]
-    predicados = list(restricciones.no_asignar_aula_doble_y_sus_hijas_al_mismo_tiempo(clases_lunes, aulas_preprocesadas, asignaciones))
-    
-    assert any(predicado_es_nand_entre_dos_variables(p, asignaciones[0, 0], asignaciones[1, 1]) for p in predicados)
-    assert any(predicado_es_nand_entre_dos_variables(p, asignaciones[0, 0], asignaciones[1, 2]) for p in predicados)
-    assert any(predicado_es_nand_entre_dos_variables(p, asignaciones[1, 0], asignaciones[0, 1]) for p in predicados)
-    assert any(predicado_es_nand_entre_dos_variables(p, asignaciones[1, 0], asignaciones[0, 2]) for p in predicados)
+    grupos = list(restricciones.no_asignar_aula_doble_y_sus_hijas_al_mismo_tiempo(clases_lunes, aulas_preprocesadas, asignaciones))
+
+    assert len(grupos) == 2
+    assert es_grupo_de(grupos[0], asignaciones[0, 0], asignaciones[1, 0], asignaciones[0, 1], asignaciones[1, 1])
+    assert es_grupo_de(grupos[1], asignaciones[0, 0], asignaciones[1, 0], asignaciones[0, 2], asignaciones[1, 2])
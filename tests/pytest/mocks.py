@@ -33,6 +33,7 @@ from asignacion_aulica.lógica_de_asignación.preprocesamiento import (
     AulasPreprocesadas,
     preprocesar_clases
 )
+from asignacion_aulica.lógica_de_asignación.matriz_de_asignaciones import MatrizDeAsignaciones
 
 horario_24_hs = lambda: RangoHorario(time(0), time(23, 59))
 horario_default_para_clases = lambda: RangoHorario(time(10), time(11))
@@ -212,7 +213,7 @@ def make_asignaciones(
     n_aulas: int,
     modelo: CpModel,
     asignaciones_forzadas: dict[int, int]
-) -> np.ndarray:
+) -> MatrizDeAsignaciones:
     '''
     Genera una matriz con las variables de asignación. No hay constantes, todas
     son variables que se agregan al modelo, a menos que se especifiquen
@@ -226,17 +227,16 @@ def make_asignaciones(
     aulas.
     :return: Matriz con los datos de asignaciones.
     '''
-    asignaciones = np.empty(shape=(n_clases, n_aulas), dtype=object)
-    
-    for clase, aula in np.ndindex(asignaciones.shape):
-        if clase not in asignaciones_forzadas or asignaciones_forzadas[clase] == aula:
-            asignaciones[clase, aula] = modelo.new_bool_var(f'clase_{clase}_asignada_al_aula_{aula}')
-        else:
-            asignaciones[clase, aula] = 0
+    permitidas = np.ones(shape=(n_clases, n_aulas), dtype=bool)
+    for clase, aula in asignaciones_forzadas.items():
+        permitidas[clase, :] = False
+        permitidas[clase, aula] = True
+
+    asignaciones = MatrizDeAsignaciones(permitidas, modelo)
     
     # Asegurar que cada clase se asigna a exactamente un aula
-    for clase in range(asignaciones.shape[0]):
-        modelo.add_exactly_one(asignaciones[clase,:])
+    for clase in range(n_clases):
+        modelo.add_exactly_one(asignaciones.variables_de_fila(clase))
     
     return asignaciones
 
@@ -330,7 +330,7 @@ def asignaciones(
     aulas_preprocesadas: AulasPreprocesadas,
     clases_preprocesadas: ClasesPreprocesadasPorDía,
     modelo: CpModel
-) -> np.ndarray:
+) -> MatrizDeAsignaciones:
     '''
     Genera una matriz con las variables de asignación. No hay constantes, todas
     son variables que se agregan al modelo, a menos que se especifiquen